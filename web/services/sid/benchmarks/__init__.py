@@ -0,0 +1 @@
+"""Accuracy and cost evaluations for the SID pipeline."""
@@ -0,0 +1,179 @@
+"""Measure /identify accuracy and cost at different per-speaker audio budgets.
+
+Replays labelled recordings through the same steps as ``/identify``:
+segment planning, embedding, per-speaker averaging and thresholding, with
+or without early stopping. It reports, per budget, how many speakers and
+how much speaking time were labelled correctly, together with the audio
+embedded and the time the encoder took.
+
+The manifest is a JSON-lines file with one labelled recording per line;
+paths are relative to the manifest:
+
+    {"audio": "lecture.wav", "enroll": "owner.wav", "owner_speaker": 0,
+     "segments": [{"speaker": 0, "start": 0.0, "end": 12.5}, ...]}
+
+Usage (from ``web/services/sid``):
+
+    poetry run python -m benchmarks.identify_budget manifest.jsonl
+    poetry run python -m benchmarks.identify_budget manifest.jsonl --budgets 0,30,60,120
+    poetry run python -m benchmarks.identify_budget manifest.jsonl --early-stop
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from sid_service.core.config import settings
+from sid_service.services.decoded_audio import DecodedAudio
+from sid_service.services.segment_planner import Span, plan_segments
+from sid_service.services.sequential_verifier import SequentialVerifier
+from sid_service.services.speaker_encoder import SpeakerEncoder
+
+
+@dataclass
+class BudgetResult:
+    """Totals over the manifest for one budget."""
+
+    budget_seconds: float
+    speakers: int = 0
+    speakers_correct: int = 0
+    speaking_seconds: float = 0.0
+    speaking_seconds_correct: float = 0.0
+    embedded_seconds: float = 0.0
+    encode_seconds: float = 0.0
+
+
+def _enrollment_embedding(encoder: SpeakerEncoder, path: Path) -> np.ndarray:
+    """Embed an enrollment clip the way ``/enroll`` does."""
+    with DecodedAudio.open(str(path), settings.sample_rate) as decoded:
+        return encoder.encode_waveforms([decoded.waveform], decoded.sample_rate)[0]
+
+
+def _evaluate(
+    encoder: SpeakerEncoder,
+    decoded: DecodedAudio,
+    segments: list[Span],
+    owner_speaker: int,
+    reference: np.ndarray,
+    verifier: SequentialVerifier,
+    result: BudgetResult,
+) -> None:
+    """Identify one recording's speakers at ``result.budget_seconds``."""
+    plan = plan_segments(
+        segments,
+        result.budget_seconds,
+        settings.min_audio_duration_seconds,
+        settings.identify_max_span_seconds,
+    )
+
+    async def embed(spans: list[Span]) -> np.ndarray:
+        if settings.embedding_shared_features:
+            return encoder.encode_segments(
+                decoded.waveform,
+                [(span.start, span.end) for span in spans],
+                decoded.sample_rate,
+            )
+        return encoder.encode_waveforms(
+            [decoded.segment(span.start, span.end) for span in spans], decoded.sample_rate
+        )
+
+    start = time.process_time()
+    verdicts = asyncio.run(verifier.verify(plan, reference, embed))
+    result.encode_seconds += time.process_time() - start
+    result.embedded_seconds += sum(verdict.seconds for verdict in verdicts.values())
+
+    speaking: dict[int, float] = {}
+    for segment in segments:
+        speaking[segment.speaker] = speaking.get(segment.speaker, 0.0) + segment.duration
+
+    for speaker, seconds in speaking.items():
+        verdict = verdicts.get(speaker)
+        is_owner = verdict is not None and verdict.similarity >= settings.similarity_threshold
+        correct = is_owner == (speaker == owner_speaker)
+        result.speakers += 1
+        result.speakers_correct += correct
+        result.speaking_seconds += seconds
+        result.speaking_seconds_correct += seconds if correct else 0.0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("manifest", type=Path, help="JSON-lines file of labelled recordings")
+    parser.add_argument(
+        "--budgets",
+        default="0,30,60,120",
+        help="Seconds per speaker to compare; 0 embeds every segment in full",
+    )
+    parser.add_argument(
+        "--early-stop",
+        action="store_true",
+        help="Stop embedding a speaker once the SID_IDENTIFY_EARLY_STOP_* margins are cleared",
+    )
+    parser.add_argument("--device", default="cpu", help="Device for the encoder")
+    parser.add_argument("--output", type=Path, help="Also write results as JSON")
+    args = parser.parse_args(argv)
+
+    budgets = [float(b) for b in args.budgets.split(",") if b.strip()]
+    recordings = [
+        json.loads(line) for line in args.manifest.read_text().splitlines() if line.strip()
+    ]
+    root = args.manifest.parent
+
+    encoder = SpeakerEncoder(device=args.device)
+    encoder.initialize()
+
+    verifier = SequentialVerifier(
+        threshold=settings.similarity_threshold,
+        owner_margin=settings.identify_early_stop_owner_margin,
+        other_margin=settings.identify_early_stop_other_margin,
+        min_seconds=settings.identify_early_stop_min_seconds,
+        early_stop=args.early_stop,
+    )
+    references: dict[str, np.ndarray] = {}
+    results = [BudgetResult(budget) for budget in budgets]
+
+    for recording in recordings:
+        enroll = recording["enroll"]
+        if enroll not in references:
+            references[enroll] = _enrollment_embedding(encoder, root / enroll)
+
+        segments = [Span(s["speaker"], s["start"], s["end"]) for s in recording["segments"]]
+        with DecodedAudio.open(str(root / recording["audio"]), settings.sample_rate) as decoded:
+            for result in results:
+                _evaluate(
+                    encoder,
+                    decoded,
+                    segments,
+                    recording["owner_speaker"],
+                    references[enroll],
+                    verifier,
+                    result,
+                )
+
+    print(
+        f"{'budget s':>9} {'speakers ok':>12} {'time ok':>8} "
+        f"{'embedded s':>11} {'encode CPU s':>13}"
+    )
+    for result in results:
+        print(
+            f"{result.budget_seconds:>9.0f} "
+            f"{result.speakers_correct / max(result.speakers, 1):>12.1%} "
+            f"{result.speaking_seconds_correct / max(result.speaking_seconds, 1e-9):>8.1%} "
+            f"{result.embedded_seconds:>11.0f} {result.encode_seconds:>13.1f}"
+        )
+
+    if args.output:
+        args.output.write_text(
+            json.dumps([asdict(result) for result in results], indent=2) + "\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
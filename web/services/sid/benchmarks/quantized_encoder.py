@@ -0,0 +1,228 @@
+"""Compare the dynamic int8 encoder with the float one on labelled recordings.
+
+Both exported ONNX models embed the same ``/identify`` spans of every
+recording, planned as the service plans them. The report puts accuracy next
+to cost: how far the int8 embeddings drift from the float ones (cosine
+distance per span, and the change in each speaker's score), how often the
+owner/other decision agrees, and the throughput and per-recording latency of
+each model. The float ONNX model matches the torch encoder to within float
+rounding, so it stands in for it.
+
+The manifest is the one ``identify_budget`` reads; ``owner_speaker`` is
+only used for the share of speakers each model labels correctly:
+
+    {"audio": "lecture.wav", "enroll": "owner.wav", "owner_speaker": 0,
+     "segments": [{"speaker": 0, "start": 0.0, "end": 12.5}, ...]}
+
+Usage (from ``web/services/sid``, after ``onnx_export ... --int8``):
+
+    poetry run python -m benchmarks.quantized_encoder manifest.jsonl
+    poetry run python -m benchmarks.quantized_encoder manifest.jsonl --threads 4 --repeats 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from sid_service.core.config import settings
+from sid_service.services.decoded_audio import DecodedAudio
+from sid_service.services.encoder_base import EncoderBase
+from sid_service.services.onnx_encoder import OnnxSpeakerEncoder
+from sid_service.services.segment_planner import Span, plan_segments
+
+
+@dataclass
+class ModelResult:
+    """Cost and accuracy of one model over the manifest."""
+
+    model_path: str
+    speakers: int = 0
+    speakers_correct: int = 0
+    embedded_seconds: float = 0.0
+    encode_seconds: float = 0.0
+    encode_cpu_seconds: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list)
+
+
+@dataclass
+class DriftResult:
+    """Differences between the int8 and float models over the manifest."""
+
+    span_distances: list[float] = field(default_factory=list)
+    score_differences: list[float] = field(default_factory=list)
+    decisions: int = 0
+    decisions_agreeing: int = 0
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity."""
+    return (a * b).sum(axis=-1) / (np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1))
+
+
+def _load(model_path: str, threads: int) -> EncoderBase:
+    encoder = OnnxSpeakerEncoder(
+        model_path,
+        max_batch_samples=settings.embedding_max_batch_samples,
+        window_seconds=settings.embedding_window_seconds,
+        window_overlap=settings.embedding_window_overlap,
+    )
+    encoder.use_threads(threads)
+    encoder.initialize()
+    # The first run of a session is slower; keep it out of the timings
+    encoder.encode_waveforms([np.zeros(3 * 16000, dtype=np.float32)])
+    return encoder
+
+
+def _enrollment_embedding(encoder: EncoderBase, path: Path) -> np.ndarray:
+    """Embed an enrollment clip the way ``/enroll`` does."""
+    with DecodedAudio.open(str(path), settings.sample_rate) as decoded:
+        return encoder.encode_waveforms([decoded.waveform], decoded.sample_rate)[0]
+
+
+def _embed(
+    encoder: EncoderBase,
+    decoded: DecodedAudio,
+    spans: list[Span],
+    repeats: int,
+    result: ModelResult,
+) -> np.ndarray:
+    """Embed one recording's spans ``repeats`` times, recording each latency."""
+    waveforms = [decoded.segment(span.start, span.end) for span in spans]
+    for _ in range(repeats):
+        start, start_cpu = time.perf_counter(), time.process_time()
+        embeddings = encoder.encode_waveforms(waveforms, decoded.sample_rate)
+        elapsed = time.perf_counter() - start
+        result.encode_seconds += elapsed
+        result.encode_cpu_seconds += time.process_time() - start_cpu
+        result.latencies_ms.append(1000 * elapsed)
+    result.embedded_seconds += repeats * sum(span.duration for span in spans)
+    return embeddings
+
+
+def _scores(spans: list[Span], embeddings: np.ndarray, reference: np.ndarray) -> dict[int, float]:
+    """Each speaker's mean embedding scored against the reference, as ``/identify`` does."""
+    speakers = np.array([span.speaker for span in spans])
+    return {
+        int(speaker): float(_cosine(embeddings[speakers == speaker].mean(axis=0), reference))
+        for speaker in np.unique(speakers)
+    }
+
+
+def _row(label: str, values: list[str]) -> str:
+    return f"{label:<22}" + "".join(f"{value:>12}" for value in values)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("manifest", type=Path, help="JSON-lines file of labelled recordings")
+    parser.add_argument(
+        "--float", dest="float_model", default=settings.onnx_model_path, help="Float model"
+    )
+    parser.add_argument("--int8", default=settings.onnx_int8_model_path, help="Int8 model")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=settings.identify_max_seconds_per_speaker,
+        help="Seconds embedded per speaker; 0 embeds every segment in full",
+    )
+    parser.add_argument("--threads", type=int, default=1, help="Intra-op threads per model")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per recording")
+    parser.add_argument("--output", type=Path, help="Also write results as JSON")
+    args = parser.parse_args(argv)
+
+    recordings = [
+        json.loads(line) for line in args.manifest.read_text().splitlines() if line.strip()
+    ]
+    root = args.manifest.parent
+
+    encoders = {
+        "float": _load(args.float_model, args.threads),
+        "int8": _load(args.int8, args.threads),
+    }
+    results = {
+        "float": ModelResult(args.float_model),
+        "int8": ModelResult(args.int8),
+    }
+    drift = DriftResult()
+    references: dict[tuple[str, str], np.ndarray] = {}
+
+    for recording in recordings:
+        segments = [Span(s["speaker"], s["start"], s["end"]) for s in recording["segments"]]
+        plan = plan_segments(
+            segments,
+            args.budget,
+            settings.min_audio_duration_seconds,
+            settings.identify_max_span_seconds,
+        )
+        spans = [span for speaker_spans in plan.values() for span in speaker_spans]
+        if not spans:
+            continue
+
+        embeddings: dict[str, np.ndarray] = {}
+        scores: dict[str, dict[int, float]] = {}
+        with DecodedAudio.open(str(root / recording["audio"]), settings.sample_rate) as decoded:
+            for name, encoder in encoders.items():
+                key = (name, recording["enroll"])
+                if key not in references:
+                    references[key] = _enrollment_embedding(encoder, root / recording["enroll"])
+                embeddings[name] = _embed(encoder, decoded, spans, args.repeats, results[name])
+                scores[name] = _scores(spans, embeddings[name], references[key])
+
+        for name, result in results.items():
+            for speaker, score in scores[name].items():
+                is_owner = score >= settings.similarity_threshold
+                result.speakers += 1
+                result.speakers_correct += is_owner == (speaker == recording["owner_speaker"])
+
+        drift.span_distances.extend(
+            (1.0 - _cosine(embeddings["float"], embeddings["int8"])).tolist()
+        )
+        for speaker, score in scores["float"].items():
+            quantized = scores["int8"][speaker]
+            drift.score_differences.append(abs(quantized - score))
+            drift.decisions += 1
+            drift.decisions_agreeing += (quantized >= settings.similarity_threshold) == (
+                score >= settings.similarity_threshold
+            )
+
+    rows = {
+        "embedded audio s": lambda r: f"{r.embedded_seconds:.0f}",
+        "speed x realtime": lambda r: f"{r.embedded_seconds / max(r.encode_seconds, 1e-9):.1f}",
+        "encode CPU s": lambda r: f"{r.encode_cpu_seconds:.1f}",
+        "latency p50 ms": lambda r: f"{np.percentile(r.latencies_ms or [0], 50):.0f}",
+        "latency p95 ms": lambda r: f"{np.percentile(r.latencies_ms or [0], 95):.0f}",
+        "speakers correct": lambda r: f"{r.speakers_correct / max(r.speakers, 1):.1%}",
+    }
+    print(_row("", list(results)))
+    for label, cell in rows.items():
+        print(_row(label, [cell(result) for result in results.values()]))
+
+    distances = np.array(drift.span_distances or [0.0])
+    print()
+    print(
+        f"span cosine distance   mean {distances.mean():.2e}  "
+        f"p99 {np.percentile(distances, 99):.2e}  max {distances.max():.2e}  "
+        f"({len(drift.span_distances)} spans)"
+    )
+    print(f"score difference       max {max(drift.score_differences, default=0.0):.2e}")
+    print(
+        f"decisions agreeing     {drift.decisions_agreeing / max(drift.decisions, 1):.1%} "
+        f"({drift.decisions_agreeing}/{drift.decisions} speakers)"
+    )
+
+    if args.output:
+        report = {
+            "models": {name: asdict(result) for name, result in results.items()},
+            "drift": asdict(drift),
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
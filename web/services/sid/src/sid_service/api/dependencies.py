@@ -1,25 +1,31 @@
 """FastAPI dependencies for dependency injection."""
 
+from sid_service.services.batcher import EmbeddingBatcher
+from sid_service.services.encoder_pool import EncoderPool
+from sid_service.services.executors import WorkerPools
 from sid_service.services.profile_store import ProfileStore
-from sid_service.services.speaker_encoder import SpeakerEncoder
+from sid_service.services.speaker_index import SpeakerIndex
 
 # Global singleton instances
-_speaker_encoder: SpeakerEncoder | None = None
+_encoder_pool: EncoderPool | None = None
 _profile_store: ProfileStore | None = None
+_worker_pools: WorkerPools | None = None
+_embedding_batcher: EmbeddingBatcher | None = None
+_speaker_index: SpeakerIndex | None = None
 
 
-def get_speaker_encoder() -> SpeakerEncoder:
+def get_encoder_pool() -> EncoderPool:
     """
-    Dependency to get the speaker encoder instance.
+    Dependency to get the pool of speaker encoder replicas.
 
     This returns the global singleton instance that is initialized
     at application startup.
     """
-    if _speaker_encoder is None:
+    if _encoder_pool is None:
         raise RuntimeError(
-            "Speaker encoder not initialized. Application startup may have failed."
+            "Encoder pool not initialized. Application startup may have failed."
         )
-    return _speaker_encoder
+    return _encoder_pool
 
 
 def get_profile_store() -> ProfileStore:
@@ -36,14 +42,14 @@ def get_profile_store() -> ProfileStore:
     return _profile_store
 
 
-def set_speaker_encoder(encoder: SpeakerEncoder) -> None:
+def set_encoder_pool(pool: EncoderPool) -> None:
     """
-    Set the global speaker encoder instance.
+    Set the global encoder pool instance.
 
     Called during application startup.
     """
-    global _speaker_encoder
-    _speaker_encoder = encoder
+    global _encoder_pool
+    _encoder_pool = pool
 
 
 def set_profile_store(store: ProfileStore) -> None:
@@ -54,3 +60,75 @@ def set_profile_store(store: ProfileStore) -> None:
     """
     global _profile_store
     _profile_store = store
+
+
+def get_worker_pools() -> WorkerPools:
+    """
+    Dependency to get the decode and inference worker pools.
+
+    This returns the global singleton instance that is created
+    at application startup.
+    """
+    if _worker_pools is None:
+        raise RuntimeError(
+            "Worker pools not initialized. Application startup may have failed."
+        )
+    return _worker_pools
+
+
+def set_worker_pools(pools: WorkerPools) -> None:
+    """
+    Set the global worker pools instance.
+
+    Called during application startup.
+    """
+    global _worker_pools
+    _worker_pools = pools
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """
+    Dependency to get the cross-request embedding batcher.
+
+    This returns the global singleton instance that is created
+    at application startup.
+    """
+    if _embedding_batcher is None:
+        raise RuntimeError(
+            "Embedding batcher not initialized. Application startup may have failed."
+        )
+    return _embedding_batcher
+
+
+def set_embedding_batcher(batcher: EmbeddingBatcher) -> None:
+    """
+    Set the global embedding batcher instance.
+
+    Called during application startup.
+    """
+    global _embedding_batcher
+    _embedding_batcher = batcher
+
+
+def get_speaker_index() -> SpeakerIndex:
+    """
+    Dependency to get the 1:N speaker search index.
+
+    This returns the global singleton instance that is built
+    at application startup.
+    """
+    if _speaker_index is None:
+        raise RuntimeError(
+            "Speaker index not initialized. Application startup may have failed."
+        )
+    return _speaker_index
+
+
+def set_speaker_index(index: SpeakerIndex) -> None:
+    """
+    Set the global speaker index instance.
+
+    Called during application startup.
+    """
+    global _speaker_index
+    _speaker_index = index
@@ -10,6 +10,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from sid_service.services.executors import ExecutorBusyError
+
 logger = structlog.get_logger(__name__)
 
 
@@ -81,6 +83,15 @@ async def exception_handler(request: Request, exc: Exception) -> JSONResponse:
     )
 
 
+async def busy_handler(request: Request, exc: ExecutorBusyError) -> JSONResponse:
+    """Reject requests while a worker pool's queue is full."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 def add_middleware(app: FastAPI) -> None:
     """Add all middleware to the FastAPI application."""
     # CORS middleware
@@ -95,5 +106,8 @@ def add_middleware(app: FastAPI) -> None:
     # Request logging middleware
     app.add_middleware(RequestLoggingMiddleware)
 
+    # Overloaded worker pools
+    app.add_exception_handler(ExecutorBusyError, busy_handler)
+
     # Global exception handler
     app.add_exception_handler(Exception, exception_handler)
@@ -2,21 +2,22 @@
 
 import os
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from sid_service import __version__
-from sid_service.api.dependencies import get_profile_store, get_speaker_encoder
+from sid_service.api.dependencies import get_encoder_pool, get_profile_store
 from sid_service.core.config import settings
 from sid_service.models.responses import HealthResponse
+from sid_service.services.encoder_pool import EncoderPool
 from sid_service.services.profile_store import ProfileStore
-from sid_service.services.speaker_encoder import SpeakerEncoder
 
 router = APIRouter(tags=["Health"])
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check(
-    encoder: SpeakerEncoder = Depends(get_speaker_encoder),
+    encoder: EncoderPool = Depends(get_encoder_pool),
     store: ProfileStore = Depends(get_profile_store),
 ) -> HealthResponse:
     """
@@ -40,7 +41,7 @@ async def health_check(
 
 @router.get("/health/ready")
 async def readiness_check(
-    encoder: SpeakerEncoder = Depends(get_speaker_encoder),
+    encoder: EncoderPool = Depends(get_encoder_pool),
 ) -> dict:
     """
     Kubernetes readiness probe.
@@ -61,3 +62,13 @@ async def liveness_check() -> dict:
     Returns 200 if the service is alive.
     """
     return {"status": "alive"}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus metrics endpoint.
+
+    Exposes counters and gauges in the Prometheus text format.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
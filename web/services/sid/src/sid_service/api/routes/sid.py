@@ -1,23 +1,40 @@
 """Speaker identification endpoints."""
 
-import os
-import tempfile
+import io
 
+import numpy as np
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 
-from sid_service.api.dependencies import get_profile_store, get_speaker_encoder
+from sid_service.api.dependencies import (
+    get_embedding_batcher,
+    get_encoder_pool,
+    get_profile_store,
+    get_speaker_index,
+    get_worker_pools,
+)
 from sid_service.core.config import settings
 from sid_service.core.logging import get_logger
+from sid_service.core.metrics import IDENTIFY_SPANS
 from sid_service.models.requests import IdentifyParams, IdentifySegment
 from sid_service.models.responses import (
     EnrollResponse,
     IdentifiedSegment,
     IdentifyResponse,
     ProfileInfoResponse,
+    SearchResponse,
+    SpeakerMatch,
+    SpeakerSearchResult,
 )
-from sid_service.services.audio_utils import AudioUtils
+from sid_service.services.audio_format import HEADER_SIZE
+from sid_service.services.audio_utils import AudioReader, AudioUtils
+from sid_service.services.batcher import EmbeddingBatcher
+from sid_service.services.decoded_audio import DecodedAudio
+from sid_service.services.encoder_pool import EncoderPool
+from sid_service.services.executors import WorkerPools
 from sid_service.services.profile_store import ProfileStore
-from sid_service.services.speaker_encoder import SpeakerEncoder
+from sid_service.services.segment_planner import plan_segments
+from sid_service.services.sequential_verifier import SequentialVerifier
+from sid_service.services.speaker_index import SpeakerIndex
 
 router = APIRouter(prefix="/api/v1/sid", tags=["Speaker Identification"])
 logger = get_logger(__name__)
@@ -27,8 +44,13 @@ logger = get_logger(__name__)
 async def enroll_speaker(
     user_id: str = Form(..., min_length=1, max_length=128),
     audio: UploadFile = File(...),
-    encoder: SpeakerEncoder = Depends(get_speaker_encoder),
+    append: bool = Form(
+        False, description="Add this clip to the existing profile instead of replacing it"
+    ),
     store: ProfileStore = Depends(get_profile_store),
+    pools: WorkerPools = Depends(get_worker_pools),
+    batcher: EmbeddingBatcher = Depends(get_embedding_batcher),
+    index: SpeakerIndex = Depends(get_speaker_index),
 ) -> EnrollResponse:
     """
     Enroll a speaker's voice profile.
@@ -36,31 +58,31 @@ async def enroll_speaker(
     Upload an audio file (WAV, MP3, FLAC, etc.) with at least 10 seconds
     of clear speech from the speaker. The audio will be processed to
     create a unique voice profile for future identification.
+
+    With ``append=true`` the clip is folded into the user's existing
+    profile (a running mean weighted by audio duration) instead of
+    replacing it, so profiles can improve as users add recordings.
     """
+    audio_bytes = await audio.read()
+
     # Validate file format
-    if audio.filename and not AudioUtils.validate_audio_format(audio.filename):
+    if not AudioUtils.validate_audio_format(audio.filename or "", audio_bytes[:HEADER_SIZE]):
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported audio format. Supported: WAV, MP3, FLAC, OGG, M4A",
         )
 
-    # Save uploaded file temporarily
-    audio_bytes = await audio.read()
-    temp_path = None
-
-    try:
-        # Get file extension from filename
-        suffix = ".wav"
-        if audio.filename:
-            suffix = os.path.splitext(audio.filename)[1] or ".wav"
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as f:
-            f.write(audio_bytes)
-            temp_path = f.name
-
-        # Get audio info
-        audio_info = AudioUtils.get_audio_info(temp_path)
-        duration = audio_info["duration_seconds"]
+    # Decode exactly once, in memory; the duration is the decoded length
+    with await pools.decode.run(
+        DecodedAudio.from_bytes,
+        audio_bytes,
+        audio.filename or "",
+        target_sample_rate=batcher.sample_rate,
+        mmap_threshold_seconds=settings.decode_mmap_threshold_seconds,
+        temp_dir=settings.temp_dir,
+        decoder=settings.audio_decoder,
+    ) as decoded:
+        duration = decoded.duration
 
         # Validate duration
         if duration < settings.min_audio_duration_seconds:
@@ -81,32 +103,38 @@ async def enroll_speaker(
             "Enrolling speaker",
             user_id=user_id,
             duration_seconds=duration,
+            append=append,
         )
 
-        # Extract embedding
-        embedding = encoder.encode_file(temp_path)
+        # The encoder embeds long clips as the mean of bounded windows
+        (embedding,) = await batcher.embed([decoded.waveform])
 
-        # Save profile
-        store.save(user_id, embedding)
-
-        logger.info(
-            "Speaker enrolled successfully",
-            user_id=user_id,
-            embedding_shape=embedding.shape,
+    # Save profile
+    if append:
+        embedding, total_seconds, clip_count = await pools.decode.run(
+            store.add_clip, user_id, embedding, duration
         )
+    else:
+        total_seconds, clip_count = duration, 1
+        await pools.decode.run(store.save, user_id, embedding, duration)
+    index.upsert(user_id, embedding)
 
-        return EnrollResponse(
-            success=True,
-            user_id=user_id,
-            audio_duration_seconds=duration,
-            embedding_dimension=embedding.shape[0],
-            message=message,
-        )
+    logger.info(
+        "Speaker enrolled successfully",
+        user_id=user_id,
+        embedding_shape=embedding.shape,
+        clip_count=clip_count,
+    )
 
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+    return EnrollResponse(
+        success=True,
+        user_id=user_id,
+        audio_duration_seconds=duration,
+        total_audio_seconds=total_seconds,
+        clip_count=clip_count,
+        embedding_dimension=embedding.shape[0],
+        message=message,
+    )
 
 
 @router.post("/identify", response_model=IdentifyResponse)
@@ -114,8 +142,10 @@ async def identify_speakers(
     user_id: str = Form(..., min_length=1, max_length=128),
     segments: str = Form(..., description="JSON array of segments"),
     audio: UploadFile = File(...),
-    encoder: SpeakerEncoder = Depends(get_speaker_encoder),
+    encoder: EncoderPool = Depends(get_encoder_pool),
     store: ProfileStore = Depends(get_profile_store),
+    pools: WorkerPools = Depends(get_worker_pools),
+    batcher: EmbeddingBatcher = Depends(get_embedding_batcher),
 ) -> IdentifyResponse:
     """
     Identify speakers in audio segments.
@@ -137,88 +167,113 @@ async def identify_speakers(
         )
 
     # Load user profile
-    reference_embedding = store.load(user_id)
+    reference_embedding = await pools.decode.run(store.load, user_id)
     if reference_embedding is None:
         raise HTTPException(
             status_code=404,
             detail=f"No voice profile found for user: {user_id}",
         )
 
+    audio_bytes = await audio.read()
+
     # Validate file format
-    if audio.filename and not AudioUtils.validate_audio_format(audio.filename):
+    if not AudioUtils.validate_audio_format(audio.filename or "", audio_bytes[:HEADER_SIZE]):
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported audio format. Supported: WAV, MP3, FLAC, OGG, M4A",
         )
-
-    # Save uploaded file temporarily
-    audio_bytes = await audio.read()
-    temp_path = None
+    filename = audio.filename or ""
+    reader = None
+    decoded = None
 
     try:
-        suffix = ".wav"
-        if audio.filename:
-            suffix = os.path.splitext(audio.filename)[1] or ".wav"
+        # Embed at most a fixed budget of clean audio per speaker, however
+        # long the recording is
+        plan = await pools.decode.run(
+            plan_segments,
+            parsed_segments,
+            settings.identify_max_seconds_per_speaker,
+            settings.min_audio_duration_seconds,
+            settings.identify_max_span_seconds,
+        )
+        usable_segments = [span for spans in plan.values() for span in spans]
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as f:
-            f.write(audio_bytes)
-            temp_path = f.name
+        # Compressed formats cannot be seeked without decoding them anyway
+        sparse = False
+        if not AudioUtils._needs_conversion(filename, audio_bytes[:HEADER_SIZE]):
+            reader = await pools.decode.run(
+                AudioReader, io.BytesIO(audio_bytes), batcher.sample_rate
+            )
+            covered_seconds = sum(span.duration for span in usable_segments)
+            sparse = covered_seconds < settings.sparse_read_max_coverage * reader.duration
+
+        if not sparse:
+            # Decode once; every segment below is a view into this buffer
+            decoded = await pools.decode.run(
+                DecodedAudio.from_bytes,
+                audio_bytes,
+                filename,
+                target_sample_rate=batcher.sample_rate,
+                mmap_threshold_seconds=settings.decode_mmap_threshold_seconds,
+                temp_dir=settings.temp_dir,
+                decoder=settings.audio_decoder,
+            )
 
         logger.info(
             "Identifying speakers",
             user_id=user_id,
             num_segments=len(parsed_segments),
+            planned_segments=len(usable_segments),
+            planned_seconds=round(sum(span.duration for span in usable_segments), 1),
+            sparse_read=sparse,
         )
 
-        # Process each unique speaker
-        speaker_embeddings: dict[int, list] = {}
+        # Sparse segment lists seek to each segment instead of decoding it all
+        source = reader if sparse else decoded
 
-        for segment in parsed_segments:
-            if segment.speaker not in speaker_embeddings:
-                speaker_embeddings[segment.speaker] = []
-
-            # Extract audio segment
-            segment_audio = AudioUtils.extract_segment(
-                temp_path,
-                segment.start,
-                segment.end,
+        async def embed(spans: list) -> np.ndarray:
+            if settings.embedding_shared_features and decoded is not None:
+                return await pools.inference.run(
+                    encoder.encode_segments,
+                    decoded.waveform,
+                    [(span.start, span.end) for span in spans],
+                    decoded.sample_rate,
+                )
+            waveforms = await pools.decode.run(
+                lambda: [source.segment(span.start, span.end) for span in spans]
             )
+            return await batcher.embed(waveforms)
+
+        # Embed each speaker's spans, batched with other requests' segments;
+        # with early stopping, only until the speaker's decision is clear
+        verifier = SequentialVerifier(
+            threshold=settings.similarity_threshold,
+            owner_margin=settings.identify_early_stop_owner_margin,
+            other_margin=settings.identify_early_stop_other_margin,
+            min_seconds=settings.identify_early_stop_min_seconds,
+            early_stop=settings.identify_early_stop,
+        )
+        verdicts = await verifier.verify(plan, reference_embedding, embed)
 
-            # Check if segment is long enough
-            segment_duration = segment.end - segment.start
-            if segment_duration >= settings.min_audio_duration_seconds:
-                embedding = encoder.encode_waveform(segment_audio)
-                speaker_embeddings[segment.speaker].append(embedding)
+        embedded = sum(verdict.count for verdict in verdicts.values())
+        IDENTIFY_SPANS.labels(result="embedded").inc(embedded)
+        IDENTIFY_SPANS.labels(result="skipped").inc(len(usable_segments) - embedded)
 
-        # Average embeddings per speaker and compare
+        # Compare each speaker's mean embedding against the reference
         speaker_identities: dict[int, tuple[str, float]] = {}
 
-        for speaker_id, embeddings in speaker_embeddings.items():
-            if embeddings:
-                # Average all embeddings for this speaker
-                import numpy as np
-
-                avg_embedding = np.mean(embeddings, axis=0)
-
-                # Compare against reference
-                is_owner, confidence = encoder.verify(
-                    avg_embedding,
-                    reference_embedding,
-                    settings.similarity_threshold,
-                )
-
-                identity = "owner" if is_owner else "other"
-                speaker_identities[speaker_id] = (identity, confidence)
-
-                logger.debug(
-                    "Speaker identified",
-                    speaker_id=speaker_id,
-                    identity=identity,
-                    confidence=confidence,
-                )
-            else:
-                # Not enough audio for this speaker
-                speaker_identities[speaker_id] = ("other", 0.0)
+        for speaker_id, verdict in verdicts.items():
+            identity = "owner" if verdict.similarity >= settings.similarity_threshold else "other"
+            speaker_identities[speaker_id] = (identity, verdict.similarity)
+
+            logger.debug(
+                "Speaker identified",
+                speaker_id=speaker_id,
+                identity=identity,
+                confidence=verdict.similarity,
+                embedded_spans=verdict.count,
+                skipped_spans=len(verdict.pending),
+            )
 
         # Build response
         identified_segments = []
@@ -260,19 +315,157 @@ async def identify_speakers(
         )
 
     finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+        if decoded is not None:
+            decoded.close()
+        if reader is not None:
+            reader.close()
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search_speakers(
+    audio: UploadFile = File(...),
+    segments: str | None = Form(
+        None, description="Optional JSON array of segments; each speaker is searched separately"
+    ),
+    top_k: int = Form(settings.search_top_k, ge=1, le=100),
+    encoder: EncoderPool = Depends(get_encoder_pool),
+    pools: WorkerPools = Depends(get_worker_pools),
+    batcher: EmbeddingBatcher = Depends(get_embedding_batcher),
+    index: SpeakerIndex = Depends(get_speaker_index),
+) -> SearchResponse:
+    """
+    Find which enrolled users are speaking in a recording.
+
+    Without segments the whole recording is treated as one speaker. With
+    segments (from diarization), each speaker's segments are averaged into
+    one embedding and searched separately. Every speaker gets its top-k
+    most similar enrolled users, and the best one is reported as the match
+    if it reaches the similarity threshold.
+    """
+    import json
+
+    parsed_segments = None
+    if segments:
+        try:
+            parsed_segments = [IdentifySegment(**s) for s in json.loads(segments)]
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid segments JSON: {e}",
+            )
+
+    audio_bytes = await audio.read()
+
+    # Validate file format
+    if not AudioUtils.validate_audio_format(audio.filename or "", audio_bytes[:HEADER_SIZE]):
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported audio format. Supported: WAV, MP3, FLAC, OGG, M4A",
+        )
+    decoded = None
+
+    try:
+        decoded = await pools.decode.run(
+            DecodedAudio.from_bytes,
+            audio_bytes,
+            audio.filename or "",
+            target_sample_rate=batcher.sample_rate,
+            mmap_threshold_seconds=settings.decode_mmap_threshold_seconds,
+            temp_dir=settings.temp_dir,
+            decoder=settings.audio_decoder,
+        )
+
+        if parsed_segments is None:
+            parsed_segments = [IdentifySegment(speaker=0, start=0.0, end=decoded.duration)]
+
+        # Collect every segment long enough for a reliable embedding
+        speaking_seconds: dict[int, float] = {}
+        segment_speakers: list[int] = []
+        segment_bounds: list[tuple[float, float]] = []
+
+        for segment in parsed_segments:
+            segment_duration = segment.end - segment.start
+            speaking_seconds[segment.speaker] = (
+                speaking_seconds.get(segment.speaker, 0.0) + segment_duration
+            )
+            if segment_duration >= settings.min_audio_duration_seconds:
+                segment_speakers.append(segment.speaker)
+                segment_bounds.append((segment.start, segment.end))
+
+        logger.info(
+            "Searching speakers",
+            num_speakers=len(speaking_seconds),
+            num_segments=len(segment_bounds),
+            profiles=index.size,
+        )
+
+        if settings.embedding_shared_features:
+            embeddings = await pools.inference.run(
+                encoder.encode_segments, decoded.waveform, segment_bounds, decoded.sample_rate
+            )
+        else:
+            embeddings = await batcher.embed(
+                [decoded.segment(start, end) for start, end in segment_bounds]
+            )
+
+        # One query per speaker: the mean of its segment embeddings
+        speakers = sorted(set(segment_speakers))
+        queries = [
+            np.mean(
+                [e for s, e in zip(segment_speakers, embeddings) if s == speaker], axis=0
+            )
+            for speaker in speakers
+        ]
+        matches = {}
+        if queries:
+            results = await pools.decode.run(index.search, np.stack(queries), top_k)
+            matches = dict(zip(speakers, results))
+
+        speaker_results = []
+        for speaker, seconds in speaking_seconds.items():
+            speaker_matches = [
+                SpeakerMatch(user_id=m.user_id, score=m.score) for m in matches.get(speaker, [])
+            ]
+            best = speaker_matches[0] if speaker_matches else None
+            speaker_results.append(
+                SpeakerSearchResult(
+                    speaker=speaker,
+                    speaking_seconds=seconds,
+                    user_id=(
+                        best.user_id
+                        if best and best.score >= settings.similarity_threshold
+                        else None
+                    ),
+                    matches=speaker_matches,
+                )
+            )
+
+        logger.info(
+            "Speaker search complete",
+            matched=[r.user_id for r in speaker_results if r.user_id],
+        )
+
+        return SearchResponse(
+            success=True,
+            speakers=speaker_results,
+            profiles_searched=index.size,
+        )
+
+    finally:
+        if decoded is not None:
+            decoded.close()
 
 
 @router.get("/profiles/{user_id}", response_model=ProfileInfoResponse)
 async def get_profile(
     user_id: str,
     store: ProfileStore = Depends(get_profile_store),
+    pools: WorkerPools = Depends(get_worker_pools),
 ) -> ProfileInfoResponse:
     """
     Get information about a user's voice profile.
     """
-    profile_info = store.get_profile_info(user_id)
+    profile_info = await pools.decode.run(store.get_profile_info, user_id)
 
     if profile_info is None:
         return ProfileInfoResponse(
@@ -285,6 +478,10 @@ async def get_profile(
         user_id=user_id,
         embedding_dimension=profile_info["embedding_dimension"],
         created_at=profile_info["created_at"],
+        clip_count=profile_info.get("clip_count"),
+        modified_at=profile_info.get("modified_at"),
+        model_version=profile_info.get("model_version"),
+        audio_duration_seconds=profile_info.get("audio_duration_seconds"),
     )
 
 
@@ -292,11 +489,14 @@ async def get_profile(
 async def delete_profile(
     user_id: str,
     store: ProfileStore = Depends(get_profile_store),
+    pools: WorkerPools = Depends(get_worker_pools),
+    index: SpeakerIndex = Depends(get_speaker_index),
 ) -> dict:
     """
     Delete a user's voice profile.
     """
-    deleted = store.delete(user_id)
+    deleted = await pools.decode.run(store.delete, user_id)
+    index.remove(user_id)
 
     if not deleted:
         raise HTTPException(
@@ -1,5 +1,7 @@
 """Application configuration using Pydantic Settings."""
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -33,15 +35,193 @@ class Settings(BaseSettings):
         description="Minimum audio duration for reliable embedding extraction",
     )
     sample_rate: int = Field(default=16000)
+    identify_max_seconds_per_speaker: float = Field(
+        default=0.0,
+        ge=0.0,
+        description=(
+            "Most audio embedded per diarized speaker in /identify; 0 embeds every "
+            "segment in full. Set only after benchmarks/identify_budget.py has shown "
+            "the budget keeps accuracy on labelled recordings"
+        ),
+    )
+    identify_max_span_seconds: float = Field(
+        default=10.0,
+        gt=0.0,
+        description=(
+            "Longest single span embedded; longer segments are cut into pieces of this length"
+        ),
+    )
+    identify_early_stop: bool = Field(
+        default=False,
+        description=(
+            "Embed each speaker's spans longest first and stop once the decision "
+            "clears the margins below"
+        ),
+    )
+    identify_early_stop_owner_margin: float = Field(
+        default=0.15,
+        ge=0.0,
+        description="Similarity above the threshold at which a speaker is settled as owner",
+    )
+    identify_early_stop_other_margin: float = Field(
+        default=0.15,
+        ge=0.0,
+        description="Similarity below the threshold at which a speaker is settled as other",
+    )
+    identify_early_stop_min_seconds: float = Field(
+        default=3.0,
+        ge=0.0,
+        description="Least audio embedded for a speaker before early stopping applies",
+    )
+    embedding_max_batch_samples: int = Field(
+        default=960_000,
+        ge=16000,
+        description="Max padded samples (batch size x longest segment) per embedding batch",
+    )
+    embedding_window_seconds: float = Field(
+        default=10.0,
+        ge=0.0,
+        description=(
+            "Longer segments are embedded as the mean of overlapping windows of this "
+            "length (0 embeds every segment in one pass)"
+        ),
+    )
+    embedding_window_overlap: float = Field(
+        default=0.25,
+        ge=0.0,
+        lt=1.0,
+        description="Fraction of each embedding window shared with the next one",
+    )
+    embedding_shared_features: bool = Field(
+        default=False,
+        description=(
+            "Compute filterbank features once per stretch of overlapping or adjacent "
+            "segments and embed each segment from its slice"
+        ),
+    )
+    embedding_batch_max_size: int = Field(
+        default=64,
+        ge=1,
+        description="Max segments, across requests, per scheduled embedding batch",
+    )
+    embedding_batch_max_delay_ms: float = Field(
+        default=5.0,
+        ge=0.0,
+        description="Longest a segment waits for others to join its embedding batch",
+    )
+
+    # Speaker search
+    search_top_k: int = Field(
+        default=5,
+        ge=1,
+        le=100,
+        description="Default number of matches returned per speaker by /search",
+    )
+    search_ivf_min_profiles: int = Field(
+        default=50_000,
+        ge=1,
+        description="Profiles from which the search index is partitioned (IVF) instead of exact",
+    )
+    search_ivf_probes: int = Field(
+        default=8,
+        ge=1,
+        description="IVF partitions scanned per search query",
+    )
+    search_refresh_seconds: float = Field(
+        default=60.0,
+        gt=0.0,
+        description="Age after which the search index is rebuilt from the profile store",
+    )
 
     # Profile Storage
     profiles_dir: str = Field(default="./data/profiles")
+    profile_backend: Literal["files", "matrix", "sqlite"] = Field(
+        default="files",
+        description=(
+            "One .npy file per profile, one memory-mapped embedding matrix, "
+            "or a SQLite database in WAL mode"
+        ),
+    )
+    profile_matrix_dtype: Literal["float32", "float16"] = Field(
+        default="float32",
+        description="Storage type of the embedding matrix (matrix backend)",
+    )
+    profile_cache_size: int = Field(
+        default=10_000,
+        ge=0,
+        description="Profiles kept in memory (0 disables the cache)",
+    )
+    profile_cache_ttl_seconds: float = Field(
+        default=1.0,
+        ge=0.0,
+        description="How long cached profile state is trusted before storage is re-checked",
+    )
 
     # Processing
     max_file_size_mb: int = Field(default=2048)
     temp_dir: str = Field(default="/tmp/sid-uploads")
+    decode_mmap_threshold_seconds: float = Field(
+        default=1800.0,
+        ge=0.0,
+        description="Recordings at least this long are decoded to a memory-mapped file",
+    )
+    audio_decoder: Literal["auto", "pyav", "ffmpeg"] = Field(
+        default="auto",
+        description=(
+            "Decoder for MP3/M4A/AAC/WebM: in-process PyAV ('av' extra), an ffmpeg "
+            "subprocess, or 'auto' for PyAV when installed with ffmpeg as fallback"
+        ),
+    )
+    sparse_read_max_coverage: float = Field(
+        default=0.25,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Identify reads each segment by seeking when the segments cover less "
+            "than this fraction of the recording, instead of decoding all of it"
+        ),
+    )
     chunk_size: int = Field(default=8192)
 
+    # Encoder backend
+    encoder_backend: Literal["torch", "onnx", "onnx-int8"] = Field(
+        default="torch",
+        description=(
+            "SpeechBrain on PyTorch, or ONNX Runtime running a model written by "
+            "sid_service.services.onnx_export ('onnx' extra), in float or dynamic int8"
+        ),
+    )
+    onnx_model_path: str = Field(
+        default="./data/models/ecapa-voxceleb.onnx",
+        description="Exported ECAPA-TDNN model used by the onnx backend",
+    )
+    onnx_int8_model_path: str = Field(
+        default="./data/models/ecapa-voxceleb.int8.onnx",
+        description="Dynamic int8 model used by the onnx-int8 backend",
+    )
+
+    # Worker pools
+    decode_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Threads for decoding, ffmpeg and file IO",
+    )
+    encoder_replicas: int = Field(
+        default=2,
+        ge=1,
+        description="Model replicas, each serving one embedding job at a time",
+    )
+    encoder_threads: int = Field(
+        default=0,
+        ge=0,
+        description="Torch threads per model replica (0 = split CPU cores evenly)",
+    )
+    max_pending_jobs: int = Field(
+        default=32,
+        ge=0,
+        description="Jobs each pool may queue before new requests get 503",
+    )
+
     # Observability
     log_level: str = Field(default="INFO")
     log_format: str = Field(default="json")
@@ -0,0 +1,20 @@
+"""Prometheus metrics for the SID service."""
+
+from prometheus_client import Counter, Gauge
+
+PROFILE_CACHE_LOOKUPS = Counter(
+    "sid_profile_cache_lookups_total",
+    "Profile store cache lookups",
+    ["result"],
+)
+
+PROFILE_CACHE_ENTRIES = Gauge(
+    "sid_profile_cache_entries",
+    "Profiles currently held in the profile store cache",
+)
+
+IDENTIFY_SPANS = Counter(
+    "sid_identify_spans_total",
+    "Planned /identify spans, by whether they were embedded or skipped by early stopping",
+    ["result"],
+)
@@ -8,17 +8,51 @@ import uvicorn
 from fastapi import FastAPI
 
 from sid_service import __version__
-from sid_service.api.dependencies import set_profile_store, set_speaker_encoder
+from sid_service.api.dependencies import (
+    set_embedding_batcher,
+    set_encoder_pool,
+    set_profile_store,
+    set_speaker_index,
+    set_worker_pools,
+)
 from sid_service.api.middleware import add_middleware
 from sid_service.api.routes import health_router, sid_router
 from sid_service.core.config import settings
 from sid_service.core.logging import setup_logging
-from sid_service.services.profile_store import ProfileStore
-from sid_service.services.speaker_encoder import SpeakerEncoder
+from sid_service.services.batcher import EmbeddingBatcher
+from sid_service.services.encoder_base import MODEL_SOURCE
+from sid_service.services.encoder_pool import EncoderPool
+from sid_service.services.executors import WorkerPools
+from sid_service.services.matrix_profile_store import MatrixProfileStore
+from sid_service.services.profile_store import FileProfileStore, ProfileStore
+from sid_service.services.speaker_index import SpeakerIndex
+from sid_service.services.sqlite_profile_store import SQLiteProfileStore
 
 logger = structlog.get_logger(__name__)
 
 
+def create_profile_store() -> ProfileStore:
+    """Create the profile store backend selected in the settings."""
+    if settings.profile_backend == "sqlite":
+        # Torch and ONNX embeddings differ slightly, so record which one made each row
+        return SQLiteProfileStore(
+            settings.profiles_dir, model_version=f"{MODEL_SOURCE}:{settings.encoder_backend}"
+        )
+
+    if settings.profile_backend == "matrix":
+        return MatrixProfileStore(
+            settings.profiles_dir,
+            dtype=settings.profile_matrix_dtype,
+            refresh_interval_seconds=settings.profile_cache_ttl_seconds,
+        )
+
+    return FileProfileStore(
+        settings.profiles_dir,
+        cache_size=settings.profile_cache_size,
+        cache_ttl_seconds=settings.profile_cache_ttl_seconds,
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifecycle management."""
@@ -32,14 +66,54 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     )
 
     # Initialize profile store
-    store = ProfileStore(settings.profiles_dir)
+    store = create_profile_store()
     store.initialize()
     set_profile_store(store)
 
-    # Initialize speaker encoder (this loads the ECAPA-TDNN model)
-    encoder = SpeakerEncoder()
-    encoder.initialize()
-    set_speaker_encoder(encoder)
+    # Index every profile for 1:N search
+    index = SpeakerIndex(
+        store,
+        ivf_min_profiles=settings.search_ivf_min_profiles,
+        ivf_probes=settings.search_ivf_probes,
+        refresh_seconds=settings.search_refresh_seconds,
+    )
+    index.rebuild()
+    set_speaker_index(index)
+
+    # Initialize the encoder replicas (each loads the ECAPA-TDNN model)
+    encoders = EncoderPool.create(
+        settings.encoder_replicas,
+        threads_per_replica=settings.encoder_threads,
+        max_batch_samples=settings.embedding_max_batch_samples,
+        window_seconds=settings.embedding_window_seconds,
+        window_overlap=settings.embedding_window_overlap,
+        backend=settings.encoder_backend,
+        onnx_model_path=(
+            settings.onnx_int8_model_path
+            if settings.encoder_backend == "onnx-int8"
+            else settings.onnx_model_path
+        ),
+    )
+    encoders.initialize()
+    set_encoder_pool(encoders)
+
+    # Worker pools for decoding/IO and inference, off the event loop
+    pools = WorkerPools(
+        decode_workers=settings.decode_workers,
+        inference_workers=encoders.size,
+        max_pending_jobs=settings.max_pending_jobs,
+    )
+    set_worker_pools(pools)
+
+    # Shared embedding batches across concurrent requests
+    batcher = EmbeddingBatcher(
+        encoders,
+        pools.inference,
+        max_batch_size=settings.embedding_batch_max_size,
+        max_delay_ms=settings.embedding_batch_max_delay_ms,
+        sample_rate=settings.sample_rate,
+    )
+    set_embedding_batcher(batcher)
 
     logger.info("SID service ready to accept requests")
 
@@ -47,6 +121,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Shutdown
     logger.info("Shutting down SID service")
+    await batcher.close()
+    pools.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -7,6 +7,9 @@ from .responses import (
     IdentifiedSegment,
     IdentifyResponse,
     ProfileInfoResponse,
+    SearchResponse,
+    SpeakerMatch,
+    SpeakerSearchResult,
 )
 
 __all__ = [
@@ -17,5 +20,8 @@ __all__ = [
     "IdentifyResponse",
     "IdentifiedSegment",
     "ProfileInfoResponse",
+    "SearchResponse",
+    "SpeakerMatch",
+    "SpeakerSearchResult",
     "HealthResponse",
 ]
@@ -14,6 +14,14 @@ class EnrollResponse(BaseModel):
         ...,
         description="Duration of audio used for enrollment",
     )
+    total_audio_seconds: float = Field(
+        ...,
+        description="Enrollment audio behind the profile, across all clips",
+    )
+    clip_count: int = Field(
+        default=1,
+        description="Number of enrollment clips behind the profile",
+    )
     embedding_dimension: int = Field(
         default=192,
         description="Dimension of the speaker embedding",
@@ -60,6 +68,36 @@ class IdentifyResponse(BaseModel):
     )
 
 
+class SpeakerMatch(BaseModel):
+    """An enrolled user matched by speaker search."""
+
+    user_id: str = Field(..., description="Enrolled user ID")
+    score: float = Field(..., description="Cosine similarity to the speaker's voice")
+
+
+class SpeakerSearchResult(BaseModel):
+    """Search results for one speaker in the audio."""
+
+    speaker: int = Field(..., description="Speaker ID from diarization (0 if no segments given)")
+    speaking_seconds: float = Field(..., description="Total duration of the speaker's segments")
+    user_id: str | None = Field(
+        default=None,
+        description="Best match if its score reaches the similarity threshold, else null",
+    )
+    matches: list[SpeakerMatch] = Field(
+        ...,
+        description="Most similar enrolled users, best first",
+    )
+
+
+class SearchResponse(BaseModel):
+    """Response from 1:N speaker search."""
+
+    success: bool = Field(..., description="Whether the search was successful")
+    speakers: list[SpeakerSearchResult] = Field(..., description="Results per speaker")
+    profiles_searched: int = Field(..., description="Number of enrolled profiles searched")
+
+
 class ProfileInfoResponse(BaseModel):
     """Response with profile information."""
 
@@ -73,6 +111,22 @@ class ProfileInfoResponse(BaseModel):
         default=None,
         description="Unix timestamp when profile was created",
     )
+    clip_count: int | None = Field(
+        default=None,
+        description="Number of enrollment clips behind the profile, if recorded",
+    )
+    modified_at: float | None = Field(
+        default=None,
+        description="Unix timestamp when profile was last replaced",
+    )
+    model_version: str | None = Field(
+        default=None,
+        description="Embedding model and encoder backend the profile was created with, if recorded",
+    )
+    audio_duration_seconds: float | None = Field(
+        default=None,
+        description="Enrollment audio behind the profile, across all clips, if recorded",
+    )
 
 
 class HealthResponse(BaseModel):
@@ -1,7 +1,48 @@
 """Service layer for speaker identification."""
 
-from .audio_utils import AudioUtils
-from .profile_store import ProfileStore
-from .speaker_encoder import SpeakerEncoder
+from .audio_utils import AudioReader, AudioUtils
+from .batcher import EmbeddingBatcher
+from .decoded_audio import DecodedAudio
+from .encoder_base import EncoderBase
+from .encoder_pool import EncoderPool
+from .matrix_profile_store import MatrixProfileStore
+from .profile_store import FileProfileStore, ProfileStore
+from .segment_planner import Span, plan_segments
+from .sequential_verifier import SequentialVerifier, SpeakerVerdict
+from .speaker_index import SearchMatch, SpeakerIndex
+from .sqlite_profile_store import SQLiteProfileStore
 
-__all__ = ["SpeakerEncoder", "ProfileStore", "AudioUtils"]
+__all__ = [
+    "SpeakerEncoder",
+    "OnnxSpeakerEncoder",
+    "EncoderBase",
+    "EncoderPool",
+    "EmbeddingBatcher",
+    "ProfileStore",
+    "FileProfileStore",
+    "MatrixProfileStore",
+    "SQLiteProfileStore",
+    "AudioUtils",
+    "AudioReader",
+    "DecodedAudio",
+    "SpeakerIndex",
+    "SearchMatch",
+    "Span",
+    "plan_segments",
+    "SequentialVerifier",
+    "SpeakerVerdict",
+]
+
+
+def __getattr__(name: str):
+    # The encoder backends import torch/SpeechBrain or ONNX Runtime, so they
+    # are only loaded when asked for
+    if name == "SpeakerEncoder":
+        from .speaker_encoder import SpeakerEncoder
+
+        return SpeakerEncoder
+    if name == "OnnxSpeakerEncoder":
+        from .onnx_encoder import OnnxSpeakerEncoder
+
+        return OnnxSpeakerEncoder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,32 +1,98 @@
 """Audio processing utilities."""
 
+import functools
+import io
+import math
 import os
 import subprocess
 import tempfile
-from pathlib import Path
+import threading
+from collections.abc import Iterator
+from typing import BinaryIO
 
 import numpy as np
 import soundfile as sf
 
 from ..core.logging import get_logger
+from .audio_format import HEADER_SIZE, NATIVE_FORMATS, detect_format, read_header
 
-logger = get_logger(__name__)
+try:
+    import av
+except ImportError:  # optional, installed with the "av" extra
+    av = None
 
-# Supported audio formats
-SUPPORTED_FORMATS = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+logger = get_logger(__name__)
 
-# Formats that need ffmpeg conversion (not supported by libsndfile)
-NEEDS_CONVERSION = {".m4a", ".aac", ".mp3", ".webm"}
+# Samples read from ffmpeg's stdout per block (one minute at 16kHz)
+_FFMPEG_BLOCK_SAMPLES = 16000 * 60
+
+# Resampling filter: zero crossings of the sinc on each side, cutoff as a
+# share of the lower Nyquist frequency, and output frames computed at once
+_RESAMPLE_ZERO_CROSSINGS = 6
+_RESAMPLE_ROLLOFF = 0.99
+_RESAMPLE_BLOCK_FRAMES = 4096
+
+# Decoders for formats libsndfile cannot read: "auto" prefers PyAV when it
+# is installed and falls back to an ffmpeg subprocess
+DECODERS = ("auto", "pyav", "ffmpeg")
+
+
+@functools.lru_cache(maxsize=16)
+def _sinc_resample_kernel(orig: int, new: int) -> tuple[np.ndarray, int]:
+    """
+    Polyphase filters for resampling by ``new / orig`` (already reduced).
+
+    Returns:
+        Tuple of (one row of filter taps per output phase, input padding)
+    """
+    base_freq = min(orig, new) * _RESAMPLE_ROLLOFF
+    width = math.ceil(_RESAMPLE_ZERO_CROSSINGS * orig / base_freq)
+    idx = np.arange(-width, width + orig, dtype=np.float64) / orig
+    # Output phases are float32 in torchaudio too, which keeps the filters identical
+    t = ((np.arange(0, -new, -1) / new).astype(np.float32)[:, None] + idx) * base_freq
+    t = np.clip(t, -_RESAMPLE_ZERO_CROSSINGS, _RESAMPLE_ZERO_CROSSINGS)
+
+    window = np.cos(t * np.pi / _RESAMPLE_ZERO_CROSSINGS / 2) ** 2
+    t *= np.pi
+    with np.errstate(invalid="ignore"):
+        kernel = np.where(t == 0, 1.0, np.sin(t) / t)
+    kernel *= window * base_freq / orig
+    return kernel.astype(np.float32), width
+
+
+def _feed_stdin(stdin: BinaryIO, audio_bytes: bytes) -> None:
+    """Write the input to ffmpeg and close its stdin so it sees end of file."""
+    try:
+        stdin.write(audio_bytes)
+    except (BrokenPipeError, OSError):
+        # ffmpeg exited early; its exit status reports why
+        pass
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
 
 
 class AudioUtils:
     """Utilities for audio processing and manipulation."""
 
     @staticmethod
-    def _needs_conversion(audio_path: str) -> bool:
-        """Check if the file format needs ffmpeg conversion."""
-        suffix = Path(audio_path).suffix.lower()
-        return suffix in NEEDS_CONVERSION
+    def _needs_conversion(audio_path: str, header: bytes | None = None) -> bool:
+        """
+        Check if audio needs PyAV/ffmpeg rather than libsndfile.
+
+        The container is sniffed from the leading bytes, so a mislabelled
+        file still goes to the right decoder; the extension is only a
+        fallback. Unrecognised audio is left to ffmpeg, which probes it.
+
+        Args:
+            audio_path: Path (or name) of the audio file
+            header: Leading bytes of the audio; read from ``audio_path`` if None
+        """
+        if header is None:
+            header = read_header(audio_path) if os.path.isfile(audio_path) else b""
+        return detect_format(header[:HEADER_SIZE], audio_path) not in NATIVE_FORMATS
 
     @staticmethod
     def convert_to_wav(audio_path: str) -> str:
@@ -65,6 +131,190 @@ class AudioUtils:
                 os.remove(output_path)
             raise RuntimeError(f"ffmpeg conversion failed: {e.stderr}") from e
 
+    @staticmethod
+    def iter_ffmpeg(
+        source: str | bytes, target_sample_rate: int = 16000
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode audio with ffmpeg, streaming raw float32 PCM from its stdout.
+
+        Bytes are piped to ffmpeg's stdin, so neither the input nor the
+        output touches the disk. Each block is read from the pipe straight
+        into a NumPy buffer.
+
+        Args:
+            source: Path to the audio file, or the encoded audio itself
+            target_sample_rate: Sample rate ffmpeg resamples to
+
+        Yields:
+            Consecutive mono float32 blocks at ``target_sample_rate``
+
+        Raises:
+            RuntimeError: If ffmpeg is missing or cannot decode the input
+        """
+        from_pipe = isinstance(source, (bytes, bytearray, memoryview))
+        cmd = [
+            "ffmpeg",
+            "-loglevel", "error",
+            "-i", "pipe:0" if from_pipe else source,
+            "-f", "f32le",
+            "-acodec", "pcm_f32le",
+            "-ac", "1",
+            "-ar", str(target_sample_rate),
+            "pipe:1",
+        ]
+
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if from_pipe else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError(
+                "ffmpeg not found. Install ffmpeg to decode non-WAV formats."
+            ) from e
+
+        # ffmpeg writes output while it reads input, so feed it from a thread
+        feeder = None
+        if from_pipe:
+            feeder = threading.Thread(
+                target=_feed_stdin, args=(process.stdin, source), daemon=True
+            )
+            feeder.start()
+
+        try:
+            while True:
+                block = np.empty(_FFMPEG_BLOCK_SAMPLES, dtype=np.float32)
+                buffer = memoryview(block).cast("B")
+                filled = 0
+                while filled < len(buffer):
+                    count = process.stdout.readinto(buffer[filled:])
+                    if not count:
+                        break
+                    filled += count
+
+                samples = filled // block.itemsize
+                if samples:
+                    yield block[:samples]
+                if filled < len(buffer):
+                    break
+
+            if feeder is not None:
+                feeder.join()
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise RuntimeError(
+                    f"ffmpeg decode failed: {stderr.decode(errors='replace').strip()}"
+                )
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+    @staticmethod
+    def iter_pyav(
+        container: "av.container.InputContainer", target_sample_rate: int = 16000
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode the first audio stream of an open PyAV container in-process.
+
+        One resampler converts the whole stream to mono float32 at the
+        target rate, so no ffmpeg process is started.
+
+        Args:
+            container: Container opened with ``av.open``; closed when done
+            target_sample_rate: Sample rate to resample to
+
+        Yields:
+            Consecutive mono float32 blocks at ``target_sample_rate``
+
+        Raises:
+            RuntimeError: If the container has no audio or cannot be decoded
+        """
+        with container:
+            if not container.streams.audio:
+                raise RuntimeError("No audio stream found")
+
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format="flt", layout="mono", rate=target_sample_rate)
+            try:
+                for frame in container.decode(stream):
+                    for resampled in resampler.resample(frame):
+                        yield resampled.to_ndarray().reshape(-1)
+                # Flush samples buffered inside the resampler
+                for resampled in resampler.resample(None):
+                    yield resampled.to_ndarray().reshape(-1)
+            except av.error.FFmpegError as e:
+                raise RuntimeError(f"PyAV decode failed: {e}") from e
+
+    @staticmethod
+    def iter_decode(
+        source: str | bytes, target_sample_rate: int = 16000, decoder: str = "auto"
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode a format libsndfile cannot read, with PyAV or ffmpeg.
+
+        Args:
+            source: Path to the audio file, or the encoded audio itself
+            target_sample_rate: Sample rate to resample to
+            decoder: One of ``DECODERS``
+
+        Yields:
+            Consecutive mono float32 blocks at ``target_sample_rate``
+
+        Raises:
+            RuntimeError: If the audio cannot be decoded, or ``decoder`` is
+                "pyav" and PyAV is not installed
+        """
+        if decoder == "pyav" and av is None:
+            raise RuntimeError("PyAV is not installed; install the 'av' extra")
+
+        if decoder != "ffmpeg" and av is not None:
+            try:
+                container = av.open(
+                    io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+                )
+            except av.error.FFmpegError as e:
+                if decoder == "pyav":
+                    raise RuntimeError(f"PyAV could not open the audio: {e}") from e
+                logger.debug("PyAV could not open audio, falling back to ffmpeg", error=str(e))
+            else:
+                yield from AudioUtils.iter_pyav(container, target_sample_rate)
+                return
+
+        yield from AudioUtils.iter_ffmpeg(source, target_sample_rate)
+
+    @staticmethod
+    def decode(
+        source: str | bytes, target_sample_rate: int = 16000, decoder: str = "auto"
+    ) -> np.ndarray:
+        """
+        Decode a format libsndfile cannot read into memory; see ``iter_decode``.
+
+        Args:
+            source: Path to the audio file, or the encoded audio itself
+            target_sample_rate: Sample rate to resample to
+            decoder: One of ``DECODERS``
+
+        Returns:
+            Mono float32 waveform at ``target_sample_rate``
+        """
+        blocks = list(AudioUtils.iter_decode(source, target_sample_rate, decoder))
+        if len(blocks) == 1:
+            waveform = blocks[0]
+        else:
+            waveform = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+        logger.debug(
+            "Decoded compressed audio",
+            duration_seconds=len(waveform) / target_sample_rate,
+        )
+        return waveform
+
     @staticmethod
     def get_audio_duration(audio_path: str) -> float:
         """
@@ -76,16 +326,11 @@ class AudioUtils:
         Returns:
             Duration in seconds
         """
-        wav_path = None
-        try:
-            if AudioUtils._needs_conversion(audio_path):
-                wav_path = AudioUtils.convert_to_wav(audio_path)
-                audio_path = wav_path
-            info = sf.info(audio_path)
-            return info.duration
-        finally:
-            if wav_path and os.path.exists(wav_path):
-                os.remove(wav_path)
+        if AudioUtils._needs_conversion(audio_path):
+            # Compressed formats are decoded; the sample count is exact
+            waveform = AudioUtils.decode(audio_path)
+            return len(waveform) / 16000
+        return sf.info(audio_path).duration
 
     @staticmethod
     def load_audio(
@@ -101,35 +346,59 @@ class AudioUtils:
         Returns:
             Tuple of (waveform, sample_rate)
         """
-        wav_path = None
-        try:
-            # Convert if needed (ffmpeg handles resampling to 16kHz)
-            if AudioUtils._needs_conversion(audio_path):
-                wav_path = AudioUtils.convert_to_wav(audio_path)
-                audio_path = wav_path
+        # ffmpeg decodes to mono at the target rate directly
+        if AudioUtils._needs_conversion(audio_path):
+            return AudioUtils.decode(audio_path, target_sample_rate), target_sample_rate
 
-            waveform, sample_rate = sf.read(audio_path)
+        waveform, sample_rate = sf.read(audio_path, dtype="float32")
 
-            # Convert stereo to mono
-            if waveform.ndim > 1:
-                waveform = np.mean(waveform, axis=1)
+        # Convert stereo to mono
+        if waveform.ndim > 1:
+            waveform = np.mean(waveform, axis=1)
 
-            # Resample if needed (usually already done by ffmpeg)
-            if sample_rate != target_sample_rate:
-                import torch
-                import torchaudio
+        if sample_rate != target_sample_rate:
+            waveform = AudioUtils.resample(waveform, sample_rate, target_sample_rate)
+            sample_rate = target_sample_rate
 
-                waveform_tensor = torch.from_numpy(waveform).unsqueeze(0).float()
-                resampler = torchaudio.transforms.Resample(
-                    orig_freq=sample_rate, new_freq=target_sample_rate
-                )
-                waveform = resampler(waveform_tensor).squeeze().numpy()
-                sample_rate = target_sample_rate
+        return waveform, sample_rate
 
-            return waveform, sample_rate
-        finally:
-            if wav_path and os.path.exists(wav_path):
-                os.remove(wav_path)
+    @staticmethod
+    def resample(
+        waveform: np.ndarray, orig_sample_rate: int, target_sample_rate: int
+    ) -> np.ndarray:
+        """
+        Resample a mono waveform with a windowed-sinc polyphase filter.
+
+        This is torchaudio's default ``Resample`` (Hann-windowed sinc, six
+        zero crossings, 0.99 rolloff) in NumPy, so the ONNX backend can
+        resample without importing torch.
+
+        Args:
+            waveform: Mono audio samples
+            orig_sample_rate: Sample rate of ``waveform``
+            target_sample_rate: Desired sample rate
+
+        Returns:
+            Resampled float32 waveform
+        """
+        waveform = np.asarray(waveform, dtype=np.float32)
+        if orig_sample_rate == target_sample_rate:
+            return waveform
+
+        gcd = math.gcd(orig_sample_rate, target_sample_rate)
+        orig, new = orig_sample_rate // gcd, target_sample_rate // gcd
+        kernel, width = _sinc_resample_kernel(orig, new)
+
+        # Output frame i holds the ``new`` samples computed from the input
+        # window starting at ``i * orig``
+        padded = np.pad(waveform, (width, width + orig))
+        windows = np.lib.stride_tricks.sliding_window_view(padded, kernel.shape[1])[::orig]
+        frames = [
+            windows[start : start + _RESAMPLE_BLOCK_FRAMES] @ kernel.T
+            for start in range(0, len(windows), _RESAMPLE_BLOCK_FRAMES)
+        ]
+        resampled = np.concatenate(frames).reshape(-1)
+        return resampled[: math.ceil(new * len(waveform) / orig)]
 
     @staticmethod
     def extract_segment(
@@ -137,29 +406,26 @@ class AudioUtils:
         start_seconds: float,
         end_seconds: float,
         target_sample_rate: int = 16000,
+        decoder: str = "auto",
     ) -> np.ndarray:
         """
         Extract a segment from an audio file.
 
+        Only the requested frames are read; see ``AudioReader`` for reading
+        many segments from the same file.
+
         Args:
             audio_path: Path to the audio file
             start_seconds: Start time in seconds
             end_seconds: End time in seconds
             target_sample_rate: Target sample rate
+            decoder: Decoder for compressed formats, see ``iter_decode``
 
         Returns:
-            Audio segment as numpy array
+            Audio segment as a float32 numpy array
         """
-        waveform, sample_rate = AudioUtils.load_audio(audio_path, target_sample_rate)
-
-        start_sample = int(start_seconds * target_sample_rate)
-        end_sample = int(end_seconds * target_sample_rate)
-
-        # Clamp to valid range
-        start_sample = max(0, start_sample)
-        end_sample = min(len(waveform), end_sample)
-
-        return waveform[start_sample:end_sample]
+        with AudioReader(audio_path, target_sample_rate, decoder) as reader:
+            return reader.segment(start_seconds, end_seconds)
 
     @staticmethod
     def save_temp_audio(audio_bytes: bytes, suffix: str = ".wav") -> str:
@@ -178,10 +444,15 @@ class AudioUtils:
             return f.name
 
     @staticmethod
-    def validate_audio_format(filename: str) -> bool:
-        """Check if the file has a supported audio format."""
-        suffix = Path(filename).suffix.lower()
-        return suffix in SUPPORTED_FORMATS
+    def validate_audio_format(filename: str, header: bytes = b"") -> bool:
+        """
+        Check if the file is in a supported audio format.
+
+        Args:
+            filename: Name of the file, used if ``header`` is not recognised
+            header: Leading bytes of the file
+        """
+        return detect_format(header[:HEADER_SIZE], filename) is not None
 
     @staticmethod
     def get_audio_info(audio_path: str) -> dict:
@@ -194,23 +465,133 @@ class AudioUtils:
         Returns:
             Dict with audio info (duration, sample_rate, channels, etc.)
         """
-        wav_path = None
-        try:
-            original_path = audio_path
-            if AudioUtils._needs_conversion(audio_path):
-                wav_path = AudioUtils.convert_to_wav(audio_path)
-                audio_path = wav_path
-
-            info = sf.info(audio_path)
+        if AudioUtils._needs_conversion(audio_path):
+            # Describes the decoded stream: 16kHz mono float32
+            frames = len(AudioUtils.decode(audio_path))
             return {
-                "duration_seconds": info.duration,
-                "sample_rate": info.samplerate,
-                "channels": info.channels,
-                "frames": info.frames,
-                "format": info.format,
-                "subtype": info.subtype,
-                "original_path": original_path,
+                "duration_seconds": frames / 16000,
+                "sample_rate": 16000,
+                "channels": 1,
+                "frames": frames,
+                "format": (detect_format(read_header(audio_path), audio_path) or "").upper(),
+                "subtype": "FLOAT",
+                "original_path": audio_path,
             }
-        finally:
-            if wav_path and os.path.exists(wav_path):
-                os.remove(wav_path)
+
+        info = sf.info(audio_path)
+        return {
+            "duration_seconds": info.duration,
+            "sample_rate": info.samplerate,
+            "channels": info.channels,
+            "frames": info.frames,
+            "format": info.format,
+            "subtype": info.subtype,
+            "original_path": audio_path,
+        }
+
+
+class AudioReader:
+    """
+    Random access to segments of an audio file without decoding all of it.
+
+    Formats libsndfile reads natively (WAV, FLAC, OGG) are opened in place
+    and each segment is a seek plus a read of just its frames. Other formats
+    cannot seek to a frame, so they are decoded once by PyAV or ffmpeg into
+    a memory-mapped temporary file, which is kept for the reader's lifetime
+    and deleted on ``close()``.
+    """
+
+    def __init__(
+        self,
+        audio: str | BinaryIO,
+        target_sample_rate: int = 16000,
+        decoder: str = "auto",
+        temp_dir: str | None = None,
+    ) -> None:
+        """
+        Open an audio file for segment reads.
+
+        Args:
+            audio: Path to the audio file, or a seekable file object in a
+                format libsndfile reads natively
+            target_sample_rate: Sample rate segments are returned at
+            decoder: Decoder for compressed formats, see ``AudioUtils.iter_decode``
+            temp_dir: Directory for the decoded copy of a compressed file
+        """
+        self._file = None
+        self._decoded = None
+        if isinstance(audio, str) and AudioUtils._needs_conversion(audio):
+            # Imported here because decoded_audio builds on this module
+            from .decoded_audio import DecodedAudio
+
+            self._decoded = DecodedAudio.open(
+                audio,
+                target_sample_rate,
+                mmap_threshold_seconds=0.0,
+                temp_dir=temp_dir,
+                decoder=decoder,
+            )
+        else:
+            self._file = sf.SoundFile(audio)
+
+        self.sample_rate = target_sample_rate
+        # SoundFile keeps a read position, so seek+read must not interleave
+        self._lock = threading.Lock()
+
+    @property
+    def native_sample_rate(self) -> int:
+        """Sample rate of the file being read (the decoded rate for compressed files)."""
+        if self._decoded is not None:
+            return self._decoded.sample_rate
+        return self._file.samplerate
+
+    @property
+    def duration(self) -> float:
+        """Duration of the recording in seconds."""
+        if self._decoded is not None:
+            return self._decoded.duration
+        return self._file.frames / self._file.samplerate
+
+    def segment(self, start_seconds: float, end_seconds: float) -> np.ndarray:
+        """
+        Read one segment of the recording.
+
+        Args:
+            start_seconds: Start time in seconds
+            end_seconds: End time in seconds
+
+        Returns:
+            Mono float32 samples of the (clamped) range at ``sample_rate``
+        """
+        if self._decoded is not None:
+            # A copy, since the memory map goes away on close()
+            return np.array(self._decoded.segment(start_seconds, end_seconds))
+
+        native_rate = self._file.samplerate
+        start_frame = max(0, int(start_seconds * native_rate))
+        end_frame = min(self._file.frames, int(end_seconds * native_rate))
+        if end_frame <= start_frame:
+            return np.zeros(0, dtype=np.float32)
+
+        with self._lock:
+            self._file.seek(start_frame)
+            block = self._file.read(end_frame - start_frame, dtype="float32", always_2d=True)
+
+        waveform = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1)
+        if native_rate != self.sample_rate:
+            waveform = AudioUtils.resample(waveform, native_rate, self.sample_rate)
+
+        return np.ascontiguousarray(waveform, dtype=np.float32)
+
+    def close(self) -> None:
+        """Close the file and delete the decoded copy, if any."""
+        if self._file is not None:
+            self._file.close()
+        if self._decoded is not None:
+            self._decoded.close()
+
+    def __enter__(self) -> "AudioReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,202 @@
+"""Cross-request dynamic batching of speaker embedding jobs."""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .encoder_pool import EncoderPool
+from .executors import BoundedExecutor
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Item:
+    """One waveform waiting to be embedded."""
+
+    waveform: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class EmbeddingBatcher:
+    """
+    Collects waveforms from concurrent requests into shared forward passes.
+
+    Requests submit their waveforms with ``embed()`` and await the results.
+    A scheduler task closes a batch once it holds ``max_batch_size``
+    waveforms or its oldest waveform has waited ``max_delay_ms``, whichever
+    comes first, and only while a model replica is free to run it. Batches
+    are filled round-robin across requests, so one request with hundreds of
+    segments cannot starve the others; ``SpeakerEncoder.encode_waveforms``
+    then splits each batch into length buckets.
+
+    When idle, a request waits at most ``max_delay_ms`` before its
+    waveforms are sent to the model, so single-request latency stays close
+    to that of a direct call.
+    """
+
+    def __init__(
+        self,
+        encoders: EncoderPool,
+        executor: BoundedExecutor,
+        max_batch_size: int = 64,
+        max_delay_ms: float = 5.0,
+        sample_rate: int = 16000,
+    ) -> None:
+        """
+        Create the batcher.
+
+        Args:
+            encoders: Encoder replicas that run the batches
+            executor: Pool the forward passes run on
+            max_batch_size: Most waveforms per batch
+            max_delay_ms: Longest a waveform waits for others to join its batch
+            sample_rate: Sample rate of every submitted waveform
+        """
+        self._encoders = encoders
+        self._executor = executor
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay_ms / 1000
+        self.sample_rate = sample_rate
+
+        # Pending waveforms per request, in the order requests are served
+        self._queues: dict[int, deque[_Item]] = {}
+        self._request_ids = itertools.count()
+        self._arrived: asyncio.Event | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._task: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of waveforms waiting for a batch."""
+        return sum(len(items) for items in self._queues.values())
+
+    async def embed(self, waveforms: list[np.ndarray]) -> np.ndarray:
+        """
+        Embed one request's waveforms as part of shared batches.
+
+        Args:
+            waveforms: Mono waveforms at ``sample_rate``
+
+        Returns:
+            Array of shape (len(waveforms), 192), in input order
+
+        Raises:
+            ExecutorBusyError: If the inference pool rejected a batch
+        """
+        if not waveforms:
+            return np.zeros((0, 192), dtype=np.float32)
+
+        self._ensure_running()
+        loop = asyncio.get_running_loop()
+        items = deque(_Item(waveform, loop.create_future()) for waveform in waveforms)
+        self._queues[next(self._request_ids)] = items
+        self._arrived.set()
+
+        # Cancelling this call cancels the futures, and the scheduler skips them
+        results = await asyncio.gather(*(item.future for item in items))
+        return np.stack(results)
+
+    async def close(self) -> None:
+        """Stop the scheduler and fail any waveforms still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for items in self._queues.values():
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError("Embedding batcher closed"))
+        self._queues.clear()
+
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def _ensure_running(self) -> None:
+        """Start the scheduler on the running event loop if needed."""
+        if self._task is not None and not self._task.done():
+            return
+
+        self._arrived = asyncio.Event()
+        self._slots = asyncio.Semaphore(self._encoders.size)
+        self._task = asyncio.create_task(self._schedule())
+
+    async def _schedule(self) -> None:
+        """Form batches and hand them to free replicas until cancelled."""
+        while True:
+            await self._arrived.wait()
+            await self._slots.acquire()
+
+            # Give other requests up to max_delay to join the batch
+            while self._queues and self.pending < self._max_batch_size:
+                oldest = min(items[0].enqueued_at for items in self._queues.values())
+                remaining = oldest + self._max_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except TimeoutError:
+                    break
+
+            batch = self._take_batch()
+            if not self._queues:
+                self._arrived.clear()
+
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    def _take_batch(self) -> list[_Item]:
+        """Take up to ``max_batch_size`` waveforms, one request at a time."""
+        batch: list[_Item] = []
+        while self._queues and len(batch) < self._max_batch_size:
+            for request_id in list(self._queues):
+                items = self._queues.pop(request_id)
+                while items and items[0].future.done():
+                    items.popleft()
+                if items:
+                    batch.append(items.popleft())
+                if items:
+                    # Served requests move to the back of the line
+                    self._queues[request_id] = items
+                if len(batch) == self._max_batch_size:
+                    break
+        return batch
+
+    async def _run_batch(self, batch: list[_Item]) -> None:
+        """Embed one batch on a replica and route each row to its request."""
+        try:
+            embeddings = await self._executor.run(
+                self._encoders.encode_waveforms,
+                [item.waveform for item in batch],
+                self.sample_rate,
+            )
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for item, embedding in zip(batch, embeddings):
+            if not item.future.done():
+                item.future.set_result(embedding)
+
+        logger.debug(
+            "Embedding batch complete",
+            batch_size=len(batch),
+            waited_ms=round((time.monotonic() - batch[0].enqueued_at) * 1000, 1),
+        )
@@ -0,0 +1,260 @@
+"""Decode-once audio sessions for repeated segment access."""
+
+import io
+import os
+import tempfile
+from collections.abc import Iterable
+
+import numpy as np
+import soundfile as sf
+
+from ..core.logging import get_logger
+from .audio_format import HEADER_SIZE
+from .audio_utils import AudioUtils
+
+logger = get_logger(__name__)
+
+# Frames read per block when streaming a decoded file into a memory map
+_BLOCK_FRAMES = 16000 * 60
+
+
+class DecodedAudio:
+    """
+    A recording decoded once to mono float32 at the model sample rate.
+
+    Segments are returned as views into the decoded buffer, so extracting
+    many segments costs nothing beyond the single decode. Long recordings
+    are written to a memory-mapped temp file instead of being held in
+    memory; call ``close()`` (or use the session as a context manager) to
+    release it.
+    """
+
+    def __init__(
+        self,
+        waveform: np.ndarray,
+        sample_rate: int,
+        backing_path: str | None = None,
+    ) -> None:
+        """
+        Wrap an already decoded waveform.
+
+        Args:
+            waveform: Mono float32 samples
+            sample_rate: Sample rate of ``waveform``
+            backing_path: Memory-map file to delete on close, if any
+        """
+        self._waveform = waveform
+        self.sample_rate = sample_rate
+        self._backing_path = backing_path
+
+    @classmethod
+    def open(
+        cls,
+        audio_path: str,
+        target_sample_rate: int = 16000,
+        mmap_threshold_seconds: float | None = None,
+        temp_dir: str | None = None,
+        decoder: str = "auto",
+    ) -> "DecodedAudio":
+        """
+        Decode an audio file once.
+
+        Formats libsndfile cannot read are decoded by PyAV or ffmpeg, which
+        also resample them to ``target_sample_rate``.
+
+        Args:
+            audio_path: Path to the audio file
+            target_sample_rate: Sample rate to decode to
+            mmap_threshold_seconds: Recordings at least this long are
+                memory-mapped instead of held in memory; None disables it
+            temp_dir: Directory for memory-map files
+            decoder: Decoder for compressed formats, see ``AudioUtils.iter_decode``
+
+        Returns:
+            The decoded session
+        """
+        if AudioUtils._needs_conversion(audio_path):
+            blocks = AudioUtils.iter_decode(audio_path, target_sample_rate, decoder)
+            return cls._from_blocks(blocks, target_sample_rate, mmap_threshold_seconds, temp_dir)
+
+        with sf.SoundFile(audio_path) as source:
+            return cls._from_soundfile(
+                source, target_sample_rate, mmap_threshold_seconds, temp_dir
+            )
+
+    @classmethod
+    def from_bytes(
+        cls,
+        audio_bytes: bytes,
+        filename: str,
+        target_sample_rate: int = 16000,
+        mmap_threshold_seconds: float | None = None,
+        temp_dir: str | None = None,
+        decoder: str = "auto",
+    ) -> "DecodedAudio":
+        """
+        Decode an uploaded recording once, without writing it to disk.
+
+        Formats libsndfile reads natively are decoded from memory; others
+        are decoded in-process by PyAV or piped through ffmpeg, which also
+        resample them.
+
+        Args:
+            audio_bytes: The encoded audio
+            filename: Name of the upload, used if its bytes are not recognised
+            target_sample_rate: Sample rate to decode to
+            mmap_threshold_seconds: Recordings at least this long are
+                memory-mapped instead of held in memory; None disables it
+            temp_dir: Directory for memory-map files
+            decoder: Decoder for compressed formats, see ``AudioUtils.iter_decode``
+
+        Returns:
+            The decoded session
+        """
+        if AudioUtils._needs_conversion(filename, audio_bytes[:HEADER_SIZE]):
+            blocks = AudioUtils.iter_decode(audio_bytes, target_sample_rate, decoder)
+            return cls._from_blocks(blocks, target_sample_rate, mmap_threshold_seconds, temp_dir)
+
+        with sf.SoundFile(io.BytesIO(audio_bytes)) as source:
+            return cls._from_soundfile(
+                source, target_sample_rate, mmap_threshold_seconds, temp_dir
+            )
+
+    @classmethod
+    def _from_soundfile(
+        cls,
+        source: sf.SoundFile,
+        target_sample_rate: int,
+        mmap_threshold_seconds: float | None,
+        temp_dir: str | None,
+    ) -> "DecodedAudio":
+        """Decode an open file, memory-mapping it if it is long enough."""
+        duration = source.frames / source.samplerate
+        use_mmap = (
+            mmap_threshold_seconds is not None
+            and duration >= mmap_threshold_seconds
+            and source.samplerate == target_sample_rate
+        )
+
+        if use_mmap and source.frames > 0:
+            blocks = (
+                block.mean(axis=1)
+                for block in source.blocks(
+                    blocksize=_BLOCK_FRAMES, dtype="float32", always_2d=True
+                )
+            )
+            return cls._stream_to_mmap(blocks, source.samplerate, temp_dir)
+
+        waveform = source.read(dtype="float32", always_2d=True).mean(axis=1)
+        if source.samplerate != target_sample_rate:
+            waveform = AudioUtils.resample(waveform, source.samplerate, target_sample_rate)
+
+        return cls(np.ascontiguousarray(waveform, dtype=np.float32), target_sample_rate)
+
+    @classmethod
+    def _from_blocks(
+        cls,
+        blocks: Iterable[np.ndarray],
+        sample_rate: int,
+        mmap_threshold_seconds: float | None,
+        temp_dir: str | None,
+    ) -> "DecodedAudio":
+        """
+        Collect streamed blocks, spilling to a memory map past the threshold.
+
+        The total length of a piped decode is only known at its end, so
+        blocks are held in memory until they reach
+        ``mmap_threshold_seconds`` and then moved to the memory-map file
+        together with the rest of the stream.
+        """
+        blocks = iter(blocks)
+        held: list[np.ndarray] = []
+        held_samples = 0
+        limit = None if mmap_threshold_seconds is None else mmap_threshold_seconds * sample_rate
+
+        for block in blocks:
+            held.append(block)
+            held_samples += len(block)
+            if limit is not None and held_samples >= limit:
+                return cls._stream_to_mmap(
+                    (block for source in (held, blocks) for block in source),
+                    sample_rate,
+                    temp_dir,
+                )
+
+        waveform = np.concatenate(held) if held else np.zeros(0, dtype=np.float32)
+        return cls(waveform, sample_rate)
+
+    @classmethod
+    def _stream_to_mmap(
+        cls, blocks: Iterable[np.ndarray], sample_rate: int, temp_dir: str | None
+    ) -> "DecodedAudio":
+        """Write mono float32 blocks to a file and memory-map it."""
+        if temp_dir:
+            os.makedirs(temp_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".f32", dir=temp_dir) as f:
+            backing_path = f.name
+            try:
+                for block in blocks:
+                    f.write(np.ascontiguousarray(block, dtype=np.float32).data)
+            except BaseException:
+                f.close()
+                os.remove(backing_path)
+                raise
+
+        num_samples = os.path.getsize(backing_path) // 4
+        if num_samples == 0:
+            os.remove(backing_path)
+            return cls(np.zeros(0, dtype=np.float32), sample_rate)
+
+        waveform = np.memmap(backing_path, dtype=np.float32, mode="r+", shape=(num_samples,))
+        logger.debug(
+            "Decoded audio to memory map",
+            path=backing_path,
+            duration_seconds=num_samples / sample_rate,
+        )
+        return cls(waveform, sample_rate, backing_path)
+
+    @property
+    def num_samples(self) -> int:
+        """Number of decoded samples."""
+        return len(self._waveform)
+
+    @property
+    def duration(self) -> float:
+        """Duration of the recording in seconds."""
+        return self.num_samples / self.sample_rate
+
+    @property
+    def waveform(self) -> np.ndarray:
+        """The whole decoded recording."""
+        return self._waveform
+
+    def segment(self, start_seconds: float, end_seconds: float) -> np.ndarray:
+        """
+        Return a segment of the recording without copying it.
+
+        Args:
+            start_seconds: Start time in seconds
+            end_seconds: End time in seconds
+
+        Returns:
+            View of the samples in the (clamped) range
+        """
+        start_sample = max(0, int(start_seconds * self.sample_rate))
+        end_sample = min(self.num_samples, int(end_seconds * self.sample_rate))
+
+        return self._waveform[start_sample:max(start_sample, end_sample)]
+
+    def close(self) -> None:
+        """Release the decoded buffer and delete its memory-map file, if any."""
+        self._waveform = np.zeros(0, dtype=np.float32)
+        if self._backing_path and os.path.exists(self._backing_path):
+            os.remove(self._backing_path)
+        self._backing_path = None
+
+    def __enter__(self) -> "DecodedAudio":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
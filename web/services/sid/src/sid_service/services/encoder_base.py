@@ -0,0 +1,198 @@
+"""Backend-independent parts of the speaker encoders."""
+
+import numpy as np
+
+# HuggingFace source of the ECAPA-TDNN model, recorded with stored profiles
+MODEL_SOURCE = "speechbrain/spkrec-ecapa-voxceleb"
+
+# Largest fraction of a batch's longest waveform that shorter members may pad
+_MAX_PADDING = 0.2
+
+
+def window_bounds(
+    num_samples: int, window_samples: int, min_samples: int = 0, hop_samples: int = 0
+) -> list[tuple[int, int]]:
+    """
+    Split ``num_samples`` into windows of ``window_samples``.
+
+    Without a hop, windows are consecutive and a final remainder shorter
+    than ``min_samples`` is joined to the window before it, so no window is
+    too short for a reliable embedding (unless the whole range is). With a
+    hop, windows start every ``hop_samples`` and the last one ends exactly
+    at ``num_samples``, so every window has the same length.
+
+    Returns:
+        (start, end) sample offsets of each window
+    """
+    if hop_samples:
+        if num_samples <= window_samples:
+            return [(0, num_samples)] if num_samples else []
+        starts = [*range(0, num_samples - window_samples, hop_samples)]
+        starts.append(num_samples - window_samples)
+        return [(start, start + window_samples) for start in starts]
+
+    starts = list(range(0, num_samples, window_samples))
+    bounds = [(start, min(start + window_samples, num_samples)) for start in starts]
+    if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] < min_samples:
+        bounds[-2:] = [(bounds[-2][0], num_samples)]
+    return bounds
+
+
+class EncoderBase:
+    """
+    Windowing, batching and scoring shared by every speaker encoder backend.
+
+    Subclasses load a model in ``initialize`` and implement the embedding
+    methods; waveforms are split into windows and grouped into batches
+    here, so every backend sees the same forward passes.
+    """
+
+    def __init__(
+        self,
+        max_batch_samples: int = 960_000,
+        window_seconds: float = 10.0,
+        window_overlap: float = 0.25,
+    ) -> None:
+        """
+        Initialize the shared settings.
+
+        Args:
+            max_batch_samples: Upper bound on padded samples (batch size x longest
+                waveform) per forward pass in ``encode_waveforms``
+            window_seconds: Longest waveform embedded in one piece; 0 embeds
+                every waveform whole
+            window_overlap: Fraction of each window shared with the next one
+        """
+        self._max_batch_samples = max_batch_samples
+        self._window_samples = int(window_seconds * 16000)
+        self._hop_samples = max(1, int(self._window_samples * (1 - window_overlap)))
+        self._initialized = False
+
+    def initialize(self) -> None:
+        """Load the model."""
+        raise NotImplementedError
+
+    @property
+    def is_initialized(self) -> bool:
+        """Check if the model is loaded."""
+        return self._initialized
+
+    def use_threads(self, threads: int) -> None:
+        """Limit inference in the calling thread to ``threads`` CPU threads."""
+
+    def encode_waveforms(
+        self, waveforms: list[np.ndarray], sample_rate: int = 16000
+    ) -> np.ndarray:
+        """Extract speaker embeddings from many mono waveforms."""
+        raise NotImplementedError
+
+    def encode_segments(
+        self,
+        waveform: np.ndarray,
+        bounds: list[tuple[float, float]],
+        sample_rate: int = 16000,
+    ) -> np.ndarray:
+        """
+        Extract embeddings of many segments of one recording.
+
+        Args:
+            waveform: Mono waveform of the whole recording (1D numpy array)
+            bounds: (start, end) of each segment in seconds
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            Array of shape (len(bounds), 192), in input order
+        """
+        return self.encode_waveforms(
+            [waveform[int(start * sample_rate) : int(end * sample_rate)] for start, end in bounds],
+            sample_rate,
+        )
+
+    def _windows(self, num_samples: int) -> list[tuple[int, int]]:
+        """Windows a waveform of ``num_samples`` at 16 kHz is embedded in."""
+        if not self._window_samples or num_samples <= self._window_samples:
+            return [(0, num_samples)]
+        return window_bounds(num_samples, self._window_samples, hop_samples=self._hop_samples)
+
+    @staticmethod
+    def _pool(embeddings: np.ndarray, owners: list[int], count: int) -> np.ndarray:
+        """Average the embeddings of pieces that belong to the same waveform."""
+        if len(owners) == count:
+            return embeddings
+
+        # Windows of a waveform all have the same length, so a plain mean
+        sums = np.zeros((count, embeddings.shape[1]), dtype=np.float64)
+        np.add.at(sums, owners, embeddings)
+        counts = np.bincount(owners, minlength=count)
+        return (sums / counts[:, None]).astype(np.float32)
+
+    def _length_buckets(self, lengths: list[int]) -> list[list[int]]:
+        """
+        Group waveform indices into batches of similar length.
+
+        Indices are taken longest first. A batch is closed once adding the
+        next waveform would push its padded size (count x longest) over
+        ``max_batch_samples`` or make padding more than ``_MAX_PADDING``
+        of the batch's longest waveform. A waveform longer than the limit
+        gets a batch of its own.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+
+        batches: list[list[int]] = []
+        for index in order:
+            if batches:
+                batch = batches[-1]
+                longest = lengths[batch[0]]
+                if (
+                    longest * (len(batch) + 1) <= self._max_batch_samples
+                    and lengths[index] >= longest * (1 - _MAX_PADDING)
+                ):
+                    batch.append(index)
+                    continue
+            batches.append([index])
+
+        return batches
+
+    def compute_similarity(
+        self, embedding1: np.ndarray, embedding2: np.ndarray
+    ) -> float:
+        """
+        Compute cosine similarity between two speaker embeddings.
+
+        Args:
+            embedding1: First speaker embedding
+            embedding2: Second speaker embedding
+
+        Returns:
+            Cosine similarity score between -1 and 1 (higher = more similar)
+        """
+        # Normalize embeddings
+        norm1 = np.linalg.norm(embedding1)
+        norm2 = np.linalg.norm(embedding2)
+
+        if norm1 == 0 or norm2 == 0:
+            return 0.0
+
+        # Compute cosine similarity
+        similarity = np.dot(embedding1, embedding2) / (norm1 * norm2)
+
+        return float(similarity)
+
+    def verify(
+        self, embedding: np.ndarray, reference_embedding: np.ndarray, threshold: float
+    ) -> tuple[bool, float]:
+        """
+        Verify if an embedding matches a reference embedding.
+
+        Args:
+            embedding: Embedding to verify
+            reference_embedding: Reference embedding to compare against
+            threshold: Similarity threshold for verification
+
+        Returns:
+            Tuple of (is_match, similarity_score)
+        """
+        similarity = self.compute_similarity(embedding, reference_embedding)
+        is_match = similarity >= threshold
+
+        return is_match, similarity
@@ -0,0 +1,180 @@
+"""A pool of speaker encoder replicas for parallel CPU inference."""
+
+import os
+import queue
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .encoder_base import EncoderBase
+
+logger = get_logger(__name__)
+
+
+class EncoderPool:
+    """
+    Hands out one of several speaker encoder replicas per inference call.
+
+    Each replica runs on at most ``threads_per_replica`` threads, so N
+    concurrent requests each get a fixed share of the CPU instead of one
+    request spreading over every core while the rest wait for the model.
+    A caller that finds no free replica blocks until one is returned.
+    """
+
+    def __init__(self, replicas: list[EncoderBase], threads_per_replica: int = 0) -> None:
+        """
+        Create the pool.
+
+        Args:
+            replicas: Encoders to hand out; each is used by one caller at a time
+            threads_per_replica: Intra-op threads per replica; 0 splits
+                the CPU cores evenly between the replicas
+        """
+        if not replicas:
+            raise ValueError("EncoderPool needs at least one replica")
+
+        self._replicas = replicas
+        self._threads = threads_per_replica or max(1, (os.cpu_count() or 1) // len(replicas))
+        self._free: queue.SimpleQueue[EncoderBase] = queue.SimpleQueue()
+        for replica in replicas:
+            self._free.put(replica)
+
+    @classmethod
+    def create(
+        cls,
+        num_replicas: int,
+        threads_per_replica: int = 0,
+        device: str | None = None,
+        max_batch_samples: int = 960_000,
+        window_seconds: float = 10.0,
+        window_overlap: float = 0.25,
+        backend: str = "torch",
+        onnx_model_path: str | None = None,
+    ) -> "EncoderPool":
+        """
+        Create a pool of freshly constructed encoders.
+
+        Args:
+            num_replicas: Number of model replicas
+            threads_per_replica: Threads per replica, 0 for an even split
+            device: Device for every replica ("cuda", "cpu", or None for
+                auto-detect); torch backend only
+            max_batch_samples: Passed to each encoder
+            window_seconds: Passed to each encoder
+            window_overlap: Passed to each encoder
+            backend: "torch" for SpeechBrain, or "onnx" / "onnx-int8" for
+                ONNX Runtime
+            onnx_model_path: Exported model for the onnx backends
+
+        Returns:
+            The pool; call ``initialize()`` to load the models
+        """
+        # Backends are imported on demand: the torch one pulls in torch and
+        # SpeechBrain, which the onnx one is there to avoid
+        if backend in ("onnx", "onnx-int8"):
+            from .onnx_encoder import OnnxSpeakerEncoder
+
+            def make() -> EncoderBase:
+                return OnnxSpeakerEncoder(
+                    onnx_model_path,
+                    max_batch_samples=max_batch_samples,
+                    window_seconds=window_seconds,
+                    window_overlap=window_overlap,
+                )
+
+        else:
+            from .speaker_encoder import SpeakerEncoder
+
+            def make() -> EncoderBase:
+                return SpeakerEncoder(
+                    device=device,
+                    max_batch_samples=max_batch_samples,
+                    window_seconds=window_seconds,
+                    window_overlap=window_overlap,
+                )
+
+        return cls([make() for _ in range(num_replicas)], threads_per_replica)
+
+    def initialize(self) -> None:
+        """Load the model into every replica."""
+        for replica in self._replicas:
+            replica.use_threads(self._threads)
+            replica.initialize()
+
+        logger.info(
+            "Encoder pool ready",
+            replicas=len(self._replicas),
+            threads_per_replica=self._threads,
+        )
+
+    @property
+    def is_initialized(self) -> bool:
+        """Check if every replica has its model loaded."""
+        return all(replica.is_initialized for replica in self._replicas)
+
+    @property
+    def size(self) -> int:
+        """Number of replicas."""
+        return len(self._replicas)
+
+    @property
+    def threads_per_replica(self) -> int:
+        """Torch threads each replica runs on."""
+        return self._threads
+
+    @contextmanager
+    def replica(self) -> Iterator[EncoderBase]:
+        """
+        Check out a replica for the duration of the ``with`` block.
+
+        Torch's thread count is per calling thread, so it is (re)applied
+        here for whichever worker thread ends up running the replica.
+        """
+        encoder = self._free.get()
+        try:
+            encoder.use_threads(self._threads)
+            yield encoder
+        finally:
+            self._free.put(encoder)
+
+    def encode_file(self, audio_path: str) -> np.ndarray:
+        """Extract a speaker embedding from an audio file on a free replica."""
+        with self.replica() as encoder:
+            return encoder.encode_file(audio_path)
+
+    def encode_waveform(self, waveform: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+        """Extract a speaker embedding from a waveform on a free replica."""
+        with self.replica() as encoder:
+            return encoder.encode_waveform(waveform, sample_rate)
+
+    def encode_waveforms(
+        self, waveforms: list[np.ndarray], sample_rate: int = 16000
+    ) -> np.ndarray:
+        """Extract speaker embeddings from many waveforms on a free replica."""
+        with self.replica() as encoder:
+            return encoder.encode_waveforms(waveforms, sample_rate)
+
+    def encode_segments(
+        self,
+        waveform: np.ndarray,
+        bounds: list[tuple[float, float]],
+        sample_rate: int = 16000,
+    ) -> np.ndarray:
+        """Extract embeddings of segments of one recording on a free replica."""
+        with self.replica() as encoder:
+            return encoder.encode_segments(waveform, bounds, sample_rate)
+
+    def encode_windows(
+        self, waveform: np.ndarray, sample_rate: int = 16000
+    ) -> tuple[np.ndarray, list[tuple[float, float]]]:
+        """Extract per-window embeddings of a waveform on a free replica."""
+        with self.replica() as encoder:
+            return encoder.encode_windows(waveform, sample_rate)
+
+    def verify(
+        self, embedding: np.ndarray, reference_embedding: np.ndarray, threshold: float
+    ) -> tuple[bool, float]:
+        """Verify an embedding against a reference (no replica needed)."""
+        return self._replicas[0].verify(embedding, reference_embedding, threshold)
@@ -0,0 +1,113 @@
+"""Bounded worker pools that keep blocking work off the event loop."""
+
+import asyncio
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a pool already has as many jobs as it may queue."""
+
+    def __init__(self, pool: str) -> None:
+        super().__init__(f"The {pool} pool is busy, try again later")
+        self.pool = pool
+
+
+class BoundedExecutor:
+    """
+    A thread pool with a cap on running plus queued jobs.
+
+    Jobs beyond the cap are rejected immediately instead of piling up, so a
+    burst of uploads cannot grow memory without bound. A slot is held until
+    the job actually finishes, even if the request awaiting it goes away.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        """
+        Create the pool.
+
+        Args:
+            name: Pool name used in thread names, logs and errors
+            max_workers: Number of worker threads
+            max_pending: Jobs that may wait for a free worker
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"sid-{name}",
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run ``func(*args, **kwargs)`` on the pool and await its result.
+
+        Raises:
+            ExecutorBusyError: If the pool's queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Worker pool full, rejecting job", pool=self.name)
+            raise ExecutorBusyError(self.name)
+
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for running ones to finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class WorkerPools:
+    """
+    The service's worker pools.
+
+    Decoding, ffmpeg and file IO run on the decode pool; embedding
+    extraction runs on the inference pool. Keeping them apart stops a queue
+    of slow model passes from delaying the cheap IO that other requests
+    are waiting on, and vice versa.
+    """
+
+    def __init__(
+        self,
+        decode_workers: int,
+        inference_workers: int,
+        max_pending_jobs: int,
+    ) -> None:
+        """
+        Create both pools.
+
+        Args:
+            decode_workers: Threads for decoding and file IO
+            inference_workers: Threads for embedding extraction
+            max_pending_jobs: Jobs each pool may queue beyond its workers
+        """
+        self.decode = BoundedExecutor("decode", decode_workers, max_pending_jobs)
+        self.inference = BoundedExecutor("inference", inference_workers, max_pending_jobs)
+
+        logger.info(
+            "Worker pools started",
+            decode_workers=decode_workers,
+            inference_workers=inference_workers,
+            max_pending_jobs=max_pending_jobs,
+        )
+
+    def shutdown(self) -> None:
+        """Shut down both pools."""
+        self.decode.shutdown()
+        self.inference.shutdown()
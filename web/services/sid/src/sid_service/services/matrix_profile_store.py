@@ -0,0 +1,477 @@
+"""Voice profile storage in a single memory-mapped embedding matrix."""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .profile_store import ProfileStore, merge_clip
+
+logger = get_logger(__name__)
+
+# File naming the live generation of the matrix and its log
+_CURRENT = "CURRENT"
+_LOCK = "profiles.lock"
+
+# Rows allocated when the matrix first grows, and rows of garbage tolerated
+# before a write triggers compaction
+_MIN_CAPACITY = 1024
+_MIN_COMPACT_ROWS = 1024
+
+
+@dataclass
+class _Row:
+    """Where a user's embedding lives in the matrix."""
+
+    row: int
+    created_at: float
+    modified_at: float
+    audio_duration_seconds: float | None = None
+    clip_count: int = 1
+
+
+class MatrixProfileStore(ProfileStore):
+    """
+    Stores every profile as one row of a memory-mapped embedding matrix.
+
+    The directory holds, per generation, a raw ``rows x dimension`` matrix
+    file and an append-only log of ``put``/``del`` records that maps user IDs
+    to rows. Enrolling appends a row and then its log record, so readers
+    never see a half-written embedding; a lookup is a dict hit plus a row
+    read from the mapped matrix. Every process on a host maps the same file
+    and so shares one copy in the page cache.
+
+    Writers serialize on an exclusive ``flock``. Other processes pick up new
+    log records at most ``refresh_interval_seconds`` later. Replaced and
+    deleted profiles leave dead rows behind; once they outnumber the live
+    ones, the live rows are copied into a new generation and ``CURRENT`` is
+    switched to it atomically.
+    """
+
+    def __init__(
+        self,
+        profiles_dir: str,
+        dimension: int = 192,
+        dtype: str = "float32",
+        refresh_interval_seconds: float = 1.0,
+    ) -> None:
+        """
+        Initialize the profile store.
+
+        Args:
+            profiles_dir: Directory holding the matrix, log and lock files
+            dimension: Embedding dimension
+            dtype: Storage type of the matrix, "float32" or "float16"
+            refresh_interval_seconds: How often reads check the log for
+                records written by other processes; 0 checks every time
+        """
+        self._dir = Path(profiles_dir)
+        self._dimension = dimension
+        self._dtype = np.dtype(dtype)
+        self._refresh_interval = refresh_interval_seconds
+
+        self._lock = threading.RLock()
+        self._generation: int | None = None
+        self._index: dict[str, _Row] = {}
+        self._rows_used = 0
+        self._log_offset = 0
+        self._matrix: np.memmap | None = None
+        self._checked_at = 0.0
+
+    def initialize(self) -> None:
+        """Create the first generation if the directory is empty and load it."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+        with self._lock, self._file_lock():
+            if not (self._dir / _CURRENT).exists():
+                self._matrix_path(0).touch()
+                self._log_path(0).touch()
+                self._write_current(0)
+            self._refresh(force=True)
+
+        logger.info(
+            "Profile store initialized",
+            path=str(self._dir),
+            backend="matrix",
+            profiles=len(self._index),
+            dtype=self._dtype.name,
+        )
+
+    @property
+    def _row_bytes(self) -> int:
+        return self._dimension * self._dtype.itemsize
+
+    def _matrix_path(self, generation: int) -> Path:
+        return self._dir / f"embeddings.{generation}.{self._dtype.name}"
+
+    def _log_path(self, generation: int) -> Path:
+        return self._dir / f"index.{generation}.log"
+
+    def _write_current(self, generation: int) -> None:
+        """Point ``CURRENT`` at a generation atomically."""
+        temp_path = self._dir / f"{_CURRENT}.tmp"
+        temp_path.write_text(str(generation))
+        os.replace(temp_path, self._dir / _CURRENT)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the exclusive cross-process writer lock."""
+        with open(self._dir / _LOCK, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, force: bool = False) -> None:
+        """Catch up with records and compactions from other processes."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self._refresh_interval:
+                return
+
+            for attempt in range(2):
+                generation = int((self._dir / _CURRENT).read_text())
+                if generation != self._generation:
+                    self._generation = generation
+                    self._index = {}
+                    self._rows_used = 0
+                    self._log_offset = 0
+                    self._matrix = None
+
+                try:
+                    self._replay()
+                    break
+                except FileNotFoundError:
+                    # Compacted away between reading CURRENT and the log
+                    if attempt:
+                        raise
+                    self._generation = None
+
+            self._checked_at = now
+
+    def _replay(self) -> None:
+        """Apply log records written since the last replay."""
+        with open(self._log_path(self._generation), "rb") as log:
+            log.seek(self._log_offset)
+            data = log.read()
+
+        # A trailing line without a newline is a record still being written
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            record = json.loads(line)
+            if record["op"] == "put":
+                self._index[record["user_id"]] = _Row(
+                    record["row"],
+                    record["created_at"],
+                    record["modified_at"],
+                    record.get("audio_duration_seconds"),
+                    record.get("clip_count", 1),
+                )
+                self._rows_used = max(self._rows_used, record["row"] + 1)
+            else:
+                self._index.pop(record["user_id"], None)
+        self._log_offset += end
+
+        if self._rows_used and (self._matrix is None or len(self._matrix) < self._rows_used):
+            self._map()
+
+    def _map(self) -> None:
+        """Map the whole matrix file of the current generation."""
+        path = self._matrix_path(self._generation)
+        rows = path.stat().st_size // self._row_bytes
+        self._matrix = np.memmap(path, dtype=self._dtype, mode="r+", shape=(rows, self._dimension))
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grow the matrix file (by doubling) to hold at least ``rows`` rows."""
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if capacity >= rows:
+            return
+
+        path = self._matrix_path(self._generation)
+        capacity = max(capacity, path.stat().st_size // self._row_bytes)
+        if capacity < rows:
+            os.truncate(path, max(_MIN_CAPACITY, capacity * 2, rows) * self._row_bytes)
+        self._map()
+
+    def _append(self, record: dict) -> None:
+        """Append one record to the log with a single write, then apply it."""
+        line = (json.dumps(record) + "\n").encode()
+        fd = os.open(self._log_path(self._generation), os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self._replay()
+
+    def save(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float | None = None,
+        clip_count: int = 1,
+    ) -> None:
+        """
+        Save a user's voice profile as a new row of the matrix.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Speaker embedding to save
+            audio_duration_seconds: Total enrollment audio behind the embedding
+            clip_count: Number of enrollment clips behind the embedding
+
+        Raises:
+            ValueError: If the embedding does not have the store's dimension
+        """
+        self._check_shape(embedding)
+
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+            row = self._put(user_id, embedding, audio_duration_seconds, clip_count)
+
+        logger.info(
+            "Profile saved",
+            user_id=user_id,
+            row=row,
+            embedding_shape=embedding.shape,
+        )
+
+    def add_clip(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float,
+    ) -> tuple[np.ndarray, float, int]:
+        """
+        Fold one more enrollment clip into a profile under the writer lock.
+
+        Unlike the base implementation, the profile is read, merged and
+        rewritten while holding the ``flock``, so concurrent updates from
+        other worker processes cannot interleave with this one.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Embedding of the new clip
+            audio_duration_seconds: Duration of the new clip
+
+        Returns:
+            Tuple of (updated embedding, total audio seconds, clip count)
+
+        Raises:
+            ValueError: If the embedding does not have the store's dimension
+        """
+        self._check_shape(embedding)
+
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+
+            current = info = None
+            entry = self._index.get(user_id)
+            if entry is not None:
+                current = np.array(self._matrix[entry.row], dtype=np.float32)
+                info = {
+                    "audio_duration_seconds": entry.audio_duration_seconds,
+                    "clip_count": entry.clip_count,
+                }
+
+            merged = merge_clip(current, info, embedding, audio_duration_seconds)
+            self._put(user_id, *merged)
+
+        logger.info("Profile updated", user_id=user_id, clip_count=merged[2])
+        return merged
+
+    def _check_shape(self, embedding: np.ndarray) -> None:
+        if embedding.shape != (self._dimension,):
+            raise ValueError(
+                f"Expected an embedding of shape ({self._dimension},), got {embedding.shape}"
+            )
+
+    def _put(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float | None,
+        clip_count: int,
+    ) -> int:
+        """Write a profile as a new row; the caller holds both locks and has refreshed."""
+        row = self._rows_used
+        self._ensure_capacity(row + 1)
+        self._matrix[row] = embedding.astype(self._dtype)
+        self._matrix.flush()
+
+        now = time.time()
+        previous = self._index.get(user_id)
+        self._append(
+            {
+                "op": "put",
+                "user_id": user_id,
+                "row": row,
+                "created_at": previous.created_at if previous else now,
+                "modified_at": now,
+                "audio_duration_seconds": audio_duration_seconds,
+                "clip_count": clip_count,
+            }
+        )
+        self._maybe_compact()
+        return row
+
+    def load(self, user_id: str) -> np.ndarray | None:
+        """
+        Load a user's voice profile.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            Speaker embedding (float32) or None if not found
+        """
+        self._refresh()
+
+        with self._lock:
+            entry = self._index.get(user_id)
+            if entry is None:
+                logger.debug("Profile not found", user_id=user_id)
+                return None
+            return np.array(self._matrix[entry.row], dtype=np.float32)
+
+    def delete(self, user_id: str) -> bool:
+        """
+        Delete a user's voice profile.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            True if profile was deleted, False if not found
+        """
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+
+            if user_id not in self._index:
+                logger.debug("Profile not found for deletion", user_id=user_id)
+                return False
+
+            self._append({"op": "del", "user_id": user_id})
+            self._maybe_compact()
+
+        logger.info("Profile deleted", user_id=user_id)
+        return True
+
+    def list_users(self) -> list[str]:
+        """List all enrolled user IDs."""
+        self._refresh()
+
+        with self._lock:
+            return list(self._index)
+
+    def get_profile_info(self, user_id: str) -> dict | None:
+        """
+        Get information about a user's profile.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            Profile info dict or None if not found
+        """
+        self._refresh()
+
+        with self._lock:
+            entry = self._index.get(user_id)
+        if entry is None:
+            return None
+
+        return {
+            "user_id": user_id,
+            "embedding_dimension": self._dimension,
+            "audio_duration_seconds": entry.audio_duration_seconds,
+            "clip_count": entry.clip_count,
+            "created_at": entry.created_at,
+            "modified_at": entry.modified_at,
+            "file_size_bytes": self._row_bytes,
+        }
+
+    def load_all(self) -> tuple[list[str], np.ndarray]:
+        """
+        Load every profile with a single gather from the mapped matrix.
+
+        Returns:
+            Tuple of (user IDs, float32 matrix with one embedding per row)
+        """
+        self._refresh()
+
+        with self._lock:
+            users = list(self._index.items())
+            if not users:
+                return [], np.zeros((0, self._dimension), dtype=np.float32)
+            rows = [entry.row for _, entry in users]
+            matrix = self._matrix[rows].astype(np.float32)
+
+        return [user_id for user_id, _ in users], matrix
+
+    def _maybe_compact(self) -> None:
+        """Compact once dead rows outnumber live ones (and the minimum)."""
+        dead_rows = self._rows_used - len(self._index)
+        if dead_rows > max(_MIN_COMPACT_ROWS, len(self._index)):
+            self._compact()
+
+    def compact(self) -> None:
+        """Copy the live rows into a new generation and switch to it."""
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+            self._compact()
+
+    def _compact(self) -> None:
+        """Compact; the caller holds both locks and has just refreshed."""
+        old_generation = self._generation
+        generation = old_generation + 1
+        users = list(self._index.items())
+
+        matrix_path = self._matrix_path(generation)
+        capacity = max(_MIN_CAPACITY, len(users))
+        with open(matrix_path, "wb") as f:
+            f.truncate(capacity * self._row_bytes)
+
+        if users:
+            matrix = np.memmap(
+                matrix_path, dtype=self._dtype, mode="r+", shape=(capacity, self._dimension)
+            )
+            matrix[: len(users)] = self._matrix[[entry.row for _, entry in users]]
+            matrix.flush()
+            del matrix
+
+        with open(self._log_path(generation), "w") as log:
+            for row, (user_id, entry) in enumerate(users):
+                record = {
+                    "op": "put",
+                    "user_id": user_id,
+                    "row": row,
+                    "created_at": entry.created_at,
+                    "modified_at": entry.modified_at,
+                    "audio_duration_seconds": entry.audio_duration_seconds,
+                    "clip_count": entry.clip_count,
+                }
+                log.write(json.dumps(record) + "\n")
+            log.flush()
+            os.fsync(log.fileno())
+
+        self._write_current(generation)
+        self._refresh(force=True)
+
+        # Processes still on the old generation keep their open mappings
+        self._matrix_path(old_generation).unlink(missing_ok=True)
+        self._log_path(old_generation).unlink(missing_ok=True)
+
+        logger.info(
+            "Profile matrix compacted",
+            generation=generation,
+            profiles=len(users),
+        )
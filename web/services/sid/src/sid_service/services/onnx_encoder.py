@@ -0,0 +1,178 @@
+"""Speaker embedding extraction with ONNX Runtime."""
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .audio_utils import AudioUtils
+from .encoder_base import EncoderBase
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional, installed with the "onnx" extra
+    ort = None
+
+logger = get_logger(__name__)
+
+
+class OnnxSpeakerEncoder(EncoderBase):
+    """
+    Extracts ECAPA-TDNN speaker embeddings from an exported ONNX model.
+
+    The model, written by ``onnx_export``, contains the whole pipeline from
+    waveform to embedding, so neither torch nor SpeechBrain is loaded.
+    Windowing and length-bucketed batching are the same as in
+    ``SpeakerEncoder``, and embeddings match it to within float rounding.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        max_batch_samples: int = 960_000,
+        window_seconds: float = 10.0,
+        window_overlap: float = 0.25,
+    ) -> None:
+        """
+        Initialize the encoder.
+
+        Args:
+            model_path: Path of the exported ``.onnx`` model
+            max_batch_samples: Upper bound on padded samples (batch size x longest
+                waveform) per forward pass in ``encode_waveforms``
+            window_seconds: Longest waveform embedded in one piece; 0 embeds
+                every waveform whole
+            window_overlap: Fraction of each window shared with the next one
+        """
+        super().__init__(max_batch_samples, window_seconds, window_overlap)
+        self._model_path = model_path
+        self._session = None
+        self._threads = 0
+
+    def initialize(self) -> None:
+        """Create the ONNX Runtime session."""
+        if self._initialized:
+            return
+        if ort is None:
+            raise RuntimeError("ONNX Runtime is not installed; install the 'onnx' extra")
+
+        logger.info("Loading ECAPA-TDNN ONNX model", path=self._model_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self._threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            self._model_path, options, providers=["CPUExecutionProvider"]
+        )
+
+        self._initialized = True
+        logger.info("ECAPA-TDNN ONNX model loaded successfully")
+
+    def use_threads(self, threads: int) -> None:
+        """Set the session's thread count; only takes effect before ``initialize``."""
+        self._threads = threads
+
+    def encode_file(self, audio_path: str) -> np.ndarray:
+        """
+        Extract speaker embedding from an audio file.
+
+        Args:
+            audio_path: Path to the audio file (WAV, MP3, FLAC, M4A, etc.)
+
+        Returns:
+            192-dimensional numpy array representing the speaker embedding
+        """
+        waveform, sample_rate = AudioUtils.load_audio(audio_path, target_sample_rate=16000)
+        return self.encode_waveform(waveform, sample_rate)
+
+    def encode_waveform(self, waveform: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+        """
+        Extract speaker embedding from a waveform array.
+
+        Args:
+            waveform: Audio waveform as numpy array (1D or 2D with shape [channels, samples])
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            192-dimensional numpy array representing the speaker embedding
+        """
+        if waveform.ndim > 1:
+            waveform = waveform.mean(axis=0)
+        return self.encode_waveforms([waveform], sample_rate)[0]
+
+    def encode_waveforms(
+        self, waveforms: list[np.ndarray], sample_rate: int = 16000
+    ) -> np.ndarray:
+        """
+        Extract speaker embeddings from many mono waveforms in batched passes.
+
+        Args:
+            waveforms: Mono audio waveforms (1D numpy arrays), may differ in length
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            Array of shape (len(waveforms), 192), in input order
+        """
+        signals = [self._to_16k(waveform, sample_rate) for waveform in waveforms]
+
+        pieces: list[np.ndarray] = []
+        owners: list[int] = []
+        for index, signal in enumerate(signals):
+            for start, end in self._windows(len(signal)):
+                pieces.append(signal[start:end])
+                owners.append(index)
+
+        embeddings = self._pool(self._embed_signals(pieces), owners, len(signals))
+
+        logger.debug(
+            "Batched embeddings extracted",
+            count=len(signals),
+            total_samples=sum(len(signal) for signal in signals),
+        )
+
+        return embeddings
+
+    def encode_windows(
+        self, waveform: np.ndarray, sample_rate: int = 16000
+    ) -> tuple[np.ndarray, list[tuple[float, float]]]:
+        """
+        Extract one embedding per window of a mono waveform.
+
+        Args:
+            waveform: Mono audio waveform (1D numpy array)
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            Tuple of (embeddings of shape (num_windows, 192), (start, end)
+            of each window in seconds)
+        """
+        signal = self._to_16k(waveform, sample_rate)
+        bounds = self._windows(len(signal))
+        embeddings = self._embed_signals([signal[start:end] for start, end in bounds])
+        return embeddings, [(start / 16000, end / 16000) for start, end in bounds]
+
+    def _to_16k(self, waveform: np.ndarray, sample_rate: int) -> np.ndarray:
+        """A float32 copy of the waveform at the model's 16 kHz."""
+        if not self._initialized:
+            raise RuntimeError("OnnxSpeakerEncoder not initialized. Call initialize() first.")
+        if sample_rate != 16000:
+            waveform = AudioUtils.resample(waveform, sample_rate, 16000)
+        return np.asarray(waveform, dtype=np.float32)
+
+    def _embed_signals(self, signals: list[np.ndarray]) -> np.ndarray:
+        """Embed 16 kHz signals whole, in length-bucketed batches."""
+        embeddings = np.zeros((len(signals), 192), dtype=np.float32)
+
+        for batch in self._length_buckets([len(signal) for signal in signals]):
+            longest = max(len(signals[index]) for index in batch)
+            padded = np.zeros((len(batch), longest), dtype=np.float32)
+            lengths = np.zeros(len(batch), dtype=np.int64)
+            for row, index in enumerate(batch):
+                padded[row, : len(signals[index])] = signals[index]
+                lengths[row] = len(signals[index])
+
+            (batch_embeddings,) = self._session.run(
+                None, {"waveforms": padded, "lengths": lengths}
+            )
+            embeddings[batch] = batch_embeddings
+
+        return embeddings
@@ -0,0 +1,249 @@
+"""Export the ECAPA-TDNN pipeline to ONNX for the onnx encoder backend.
+
+The exported graph takes a zero-padded batch of 16 kHz waveforms and their
+lengths in samples, and runs the whole SpeechBrain pipeline: STFT, mel
+filterbank, sentence mean normalization and the embedding model. Padding is
+masked exactly as ``SpeakerEncoder`` masks it, so a batch gives the same
+embeddings as its members would one at a time.
+
+``--int8`` also writes a copy with dynamic int8 weights for the convolutions
+of the embedding model, served by ``SID_ENCODER_BACKEND=onnx-int8``.
+
+Usage (from ``web/services/sid``, with the torch dependencies installed):
+
+    poetry run python -m sid_service.services.onnx_export data/models/ecapa-voxceleb.onnx
+    poetry run python -m sid_service.services.onnx_export data/models/ecapa-voxceleb.onnx \\
+        --int8 data/models/ecapa-voxceleb.int8.onnx
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import torch
+from speechbrain.lobes.models import ECAPA_TDNN
+from torch.nn import functional
+
+from ..core.logging import get_logger
+from .speaker_encoder import SpeakerEncoder
+
+logger = get_logger(__name__)
+
+# Largest cosine distance between torch and ONNX embeddings accepted by the check
+DEFAULT_TOLERANCE = 1e-4
+
+
+def _length_to_mask(
+    length: torch.Tensor, max_len: int, dtype: torch.dtype | None = None, device=None
+) -> torch.Tensor:
+    """SpeechBrain's ``length_to_mask``, broadcasting instead of expanding.
+
+    The original expands to ``len(length)``, which tracing records as a
+    constant and so fixes the batch size of the exported graph.
+    """
+    positions = torch.arange(max_len, device=length.device, dtype=length.dtype)
+    return (positions.unsqueeze(0) < length.unsqueeze(1)).to(dtype or length.dtype)
+
+
+class _EcapaGraph(torch.nn.Module):
+    """Filterbank features, mean normalization and ECAPA-TDNN in one module."""
+
+    def __init__(self, encoder: SpeakerEncoder) -> None:
+        super().__init__()
+        mods = encoder._model.mods
+        fbank = mods.compute_features
+        stft = fbank.compute_STFT
+        filters = fbank.compute_fbanks
+        norm = mods.mean_var_norm
+
+        if (
+            fbank.deltas
+            or fbank.context
+            or not stft.center
+            or stft.pad_mode != "constant"
+            or stft.normalized_stft
+            or not filters.log_mel
+            or norm.norm_type != "sentence"
+            or norm.std_norm
+        ):
+            raise ValueError("Feature pipeline differs from the one this export reproduces")
+
+        # STFT as a strided convolution with the windowed DFT basis
+        n_fft = stft.n_fft
+        left = (n_fft - stft.win_length) // 2
+        window = functional.pad(stft.window.float(), (left, n_fft - stft.win_length - left))
+        frequencies = torch.arange(n_fft // 2 + 1, dtype=torch.float64)[:, None]
+        angles = 2 * math.pi * frequencies * torch.arange(n_fft, dtype=torch.float64) / n_fft
+        basis = torch.cat([torch.cos(angles), -torch.sin(angles)]) * window.double()
+        self.register_buffer("dft", basis.float().unsqueeze(1))
+        self.n_fft = n_fft
+        self.hop = stft.hop_length
+        self.bins = n_fft // 2 + 1
+
+        # The filterbank is fixed at inference, so bake its matrix in
+        columns = filters.all_freqs_mat.shape[1]
+        fbank_matrix = filters._create_fbank_matrix(
+            filters.f_central.repeat(columns, 1).transpose(0, 1),
+            filters.band.repeat(columns, 1).transpose(0, 1),
+        )
+        self.register_buffer("fbank_matrix", fbank_matrix.float())
+        self.multiplier = float(filters.multiplier)
+        self.amin = float(filters.amin)
+        self.db_offset = float(filters.multiplier * filters.db_multiplier)
+        self.top_db = float(filters.top_db)
+
+        self.embedding_model = mods.embedding_model
+
+    def forward(self, waveforms: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+        padded = functional.pad(waveforms.unsqueeze(1), (self.n_fft // 2, self.n_fft // 2))
+        spectrum = functional.conv1d(padded, self.dft, stride=self.hop)
+        power = spectrum[:, : self.bins] ** 2 + spectrum[:, self.bins :] ** 2
+        fbanks = torch.matmul(power.transpose(1, 2), self.fbank_matrix)
+
+        decibels = self.multiplier * torch.log10(torch.clamp(fbanks, min=self.amin))
+        decibels = decibels - self.db_offset
+        decibels = torch.max(decibels, decibels.amax(dim=(1, 2), keepdim=True) - self.top_db)
+
+        # Frames past each waveform's own end are padding: left out of the
+        # mean and zeroed, as SpeakerEncoder pads its normalized features
+        valid = torch.div(lengths, self.hop, rounding_mode="floor") + 1
+        frames = torch.arange(decibels.shape[1], device=waveforms.device)
+        mask = (frames.unsqueeze(0) < valid.unsqueeze(1)).unsqueeze(2).float()
+        mean = (decibels * mask).sum(dim=1, keepdim=True) / valid.view(-1, 1, 1).float()
+        features = (decibels - mean) * mask
+
+        relative = (valid.float() - 0.5) / decibels.shape[1]
+        return self.embedding_model(features, relative).squeeze(1)
+
+
+def export_onnx(encoder: SpeakerEncoder, output_path: str, opset: int = 17) -> None:
+    """
+    Export an initialized encoder's model to ONNX.
+
+    Args:
+        encoder: Loaded torch encoder
+        output_path: Where to write the ``.onnx`` file
+        opset: ONNX opset version
+    """
+    graph = _EcapaGraph(encoder).eval()
+    waveforms = torch.zeros(2, 32000)
+    lengths = torch.tensor([32000, 24000], dtype=torch.int64)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with torch.no_grad(), mock.patch.object(ECAPA_TDNN, "length_to_mask", _length_to_mask):
+        torch.onnx.export(
+            graph,
+            (waveforms, lengths),
+            output_path,
+            input_names=["waveforms", "lengths"],
+            output_names=["embeddings"],
+            dynamic_axes={
+                "waveforms": {0: "batch", 1: "samples"},
+                "lengths": {0: "batch"},
+                "embeddings": {0: "batch"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    logger.info("Exported ECAPA-TDNN to ONNX", path=output_path, opset=opset)
+
+
+def quantize_onnx(model_path: str, output_path: str) -> None:
+    """
+    Write a copy of an exported model with dynamic int8 convolutions.
+
+    Weights of the embedding model's convolutions are stored as 8-bit
+    integers and activations are quantized on the fly per batch. The
+    STFT and filterbank stay in float: their outputs span a wide dynamic
+    range that per-tensor int8 scales would flatten.
+
+    Args:
+        model_path: Float model written by ``export_onnx``
+        output_path: Where to write the quantized ``.onnx`` file
+    """
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model = onnx.load(model_path)
+    frontend = [
+        node.name for node in model.graph.node if not node.name.startswith("/embedding_model/")
+    ]
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    quantize_dynamic(
+        model_path,
+        output_path,
+        op_types_to_quantize=["Conv", "MatMul"],
+        nodes_to_exclude=frontend,
+        # Unsigned weights: ONNX Runtime's CPU ConvInteger kernel is several
+        # times slower with signed ones
+        weight_type=QuantType.QUInt8,
+    )
+
+    logger.info("Wrote dynamic int8 model", path=output_path, source=model_path)
+
+
+def check_parity(encoder: SpeakerEncoder, onnx_path: str, seed: int = 0) -> float:
+    """
+    Compare torch and ONNX embeddings of random waveforms of mixed lengths.
+
+    Returns:
+        The largest cosine distance between the two backends' embeddings
+    """
+    from .onnx_encoder import OnnxSpeakerEncoder
+
+    onnx_encoder = OnnxSpeakerEncoder(onnx_path)
+    onnx_encoder.initialize()
+
+    rng = np.random.default_rng(seed)
+    waveforms = [
+        (0.1 * rng.standard_normal(int(seconds * 16000))).astype(np.float32)
+        for seconds in (0.5, 1.0, 2.3, 3.0, 3.1, 7.9, 15.0)
+    ]
+    expected = encoder.encode_waveforms(waveforms)
+    actual = onnx_encoder.encode_waveforms(waveforms)
+
+    cosine = (expected * actual).sum(axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+    return float(1.0 - cosine.min())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("output", help="Path of the .onnx file to write")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Largest cosine distance from the torch embeddings accepted",
+    )
+    parser.add_argument("--int8", help="Also write a dynamic int8 copy of the model here")
+    args = parser.parse_args(argv)
+
+    encoder = SpeakerEncoder(device="cpu")
+    encoder.initialize()
+    export_onnx(encoder, args.output, args.opset)
+
+    distance = check_parity(encoder, args.output)
+    print(f"Largest cosine distance from torch embeddings: {distance:.2e}")
+    if distance > args.tolerance:
+        print(f"Parity check failed (tolerance {args.tolerance:.0e})", file=sys.stderr)
+        return 1
+
+    if args.int8:
+        quantize_onnx(args.output, args.int8)
+        # Int8 drift is reported, not checked: judge it on real recordings
+        # with benchmarks.quantized_encoder
+        distance = check_parity(encoder, args.int8)
+        print(f"Largest cosine distance of the int8 model: {distance:.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,243 @@
-"""Voice profile storage using file-based storage."""
+"""Voice profile storage."""
 
+import fcntl
+import json
 import os
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
 
 from ..core.logging import get_logger
+from ..core.metrics import PROFILE_CACHE_ENTRIES, PROFILE_CACHE_LOOKUPS
 
 logger = get_logger(__name__)
 
+# Serializes read-merge-write profile updates within this process
+_update_lock = threading.Lock()
 
-class ProfileStore:
+
+@dataclass
+class _CachedProfile:
+    """A loaded profile and the file state it was loaded from."""
+
+    embedding: np.ndarray
+    stat: os.stat_result
+    checked_at: float
+    metadata: dict
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Whether ``stat`` still describes the file this entry was loaded from."""
+        return (
+            stat.st_ino == self.stat.st_ino
+            and stat.st_mtime_ns == self.stat.st_mtime_ns
+            and stat.st_size == self.stat.st_size
+        )
+
+
+class ProfileStore(ABC):
+    """
+    Interface of the voice profile storage backends.
+
+    A profile is one speaker embedding per user ID, plus how much audio
+    (seconds and clips) it was built from. Backends must be safe to call
+    from several threads at once.
+    """
+
+    def initialize(self) -> None:
+        """Prepare the backing storage."""
+
+    def exists(self, user_id: str) -> bool:
+        """Check if a user has an enrolled profile."""
+        return self.get_profile_info(user_id) is not None
+
+    @abstractmethod
+    def save(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float | None = None,
+        clip_count: int = 1,
+    ) -> None:
+        """
+        Save a user's voice profile, replacing any existing one.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Speaker embedding to save
+            audio_duration_seconds: Total enrollment audio behind the embedding
+            clip_count: Number of enrollment clips behind the embedding
+        """
+
+    @abstractmethod
+    def load(self, user_id: str) -> np.ndarray | None:
+        """Load a user's voice profile, or None if not found."""
+
+    def add_clip(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float,
+    ) -> tuple[np.ndarray, float, int]:
+        """
+        Fold one more enrollment clip into a user's profile.
+
+        The profile becomes the running mean of all clips' embeddings,
+        weighted by their audio duration, so earlier audio never has to be
+        processed again. A profile saved without a duration is weighted
+        like the new clip. Without an existing profile this is a plain save.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Embedding of the new clip
+            audio_duration_seconds: Duration of the new clip
+
+        Returns:
+            Tuple of (updated embedding, total audio seconds, clip count)
+        """
+        with _update_lock:
+            current = self.load(user_id)
+            info = self.get_profile_info(user_id) if current is not None else None
+            merged = merge_clip(current, info, embedding, audio_duration_seconds)
+            self.save(user_id, *merged)
+        return merged
+
+    def save_many(self, profiles: dict[str, np.ndarray]) -> None:
+        """Save several profiles, replacing existing ones."""
+        for user_id, embedding in profiles.items():
+            self.save(user_id, embedding)
+
+    def load_many(self, user_ids: list[str]) -> dict[str, np.ndarray]:
+        """Load several profiles; users without one are left out."""
+        profiles = {}
+        for user_id in user_ids:
+            embedding = self.load(user_id)
+            if embedding is not None:
+                profiles[user_id] = embedding
+        return profiles
+
+    @abstractmethod
+    def delete(self, user_id: str) -> bool:
+        """Delete a user's voice profile; False if not found."""
+
+    @abstractmethod
+    def list_users(self) -> list[str]:
+        """List all enrolled user IDs."""
+
+    @abstractmethod
+    def get_profile_info(self, user_id: str) -> dict | None:
+        """Get information about a user's profile, or None if not found."""
+
+    def load_all(self) -> tuple[list[str], np.ndarray]:
+        """
+        Load every profile at once.
+
+        Returns:
+            Tuple of (user IDs, matrix with one embedding per row in the same order)
+        """
+        user_ids = []
+        embeddings = []
+        for user_id in self.list_users():
+            embedding = self.load(user_id)
+            if embedding is not None:
+                user_ids.append(user_id)
+                embeddings.append(np.asarray(embedding, dtype=np.float32))
+
+        if not embeddings:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return user_ids, np.stack(embeddings)
+
+
+def merge_clip(
+    current: np.ndarray | None,
+    info: dict | None,
+    embedding: np.ndarray,
+    audio_duration_seconds: float,
+) -> tuple[np.ndarray, float, int]:
+    """
+    Combine a profile with a new clip as a duration-weighted running mean.
+
+    Args:
+        current: Existing profile embedding, or None
+        info: Existing profile info (``audio_duration_seconds``, ``clip_count``)
+        embedding: Embedding of the new clip
+        audio_duration_seconds: Duration of the new clip
+
+    Returns:
+        Tuple of (merged embedding, total audio seconds, clip count)
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    if current is None or current.shape != embedding.shape:
+        return embedding, audio_duration_seconds, 1
+
+    info = info or {}
+    seconds = info.get("audio_duration_seconds") or audio_duration_seconds
+    total = seconds + audio_duration_seconds
+    merged = (current * seconds + embedding * audio_duration_seconds) / total
+
+    return merged.astype(np.float32), total, (info.get("clip_count") or 1) + 1
+
+
+def _encode_user_id(user_id: str) -> str:
+    """
+    Turn a user ID into a file name that decodes back to the same ID.
+
+    Letters, digits, ``-`` and ``_`` are kept, so simple IDs keep the file
+    names they always had; every other character is percent-encoded, which
+    also rules out path traversal.
+    """
+    return "".join(
+        c if c.isalnum() or c in "-_" else "".join(f"%{byte:02X}" for byte in c.encode())
+        for c in user_id
+    )
+
+
+def _decode_user_id(name: str) -> str:
+    """Invert ``_encode_user_id``."""
+    return urllib.parse.unquote(name)
+
+
+class FileProfileStore(ProfileStore):
     """
     File-based storage for speaker voice profiles (embeddings).
 
-    Profiles are stored as NumPy arrays in .npy files, organized by user ID.
+    Profiles are stored as NumPy arrays in .npy files, organized by user ID,
+    with their audio duration and clip count in a ``.json`` file alongside.
+
+    Loaded profiles are kept in a bounded LRU cache. Saves and deletes
+    through this store update the cache directly; changes made by other
+    workers are caught by comparing the file's inode, mtime and size,
+    which is re-checked at most once per ``cache_ttl_seconds`` per profile.
+    Cached embeddings are read-only. Clip updates hold a per-user ``flock``.
     """
 
-    def __init__(self, profiles_dir: str) -> None:
+    def __init__(
+        self,
+        profiles_dir: str,
+        cache_size: int = 10_000,
+        cache_ttl_seconds: float = 1.0,
+    ) -> None:
         """
         Initialize the profile store.
 
         Args:
             profiles_dir: Directory to store voice profiles
+            cache_size: Most profiles kept in memory; 0 disables the cache
+            cache_ttl_seconds: How long a cached profile is trusted before
+                its file is checked for changes again; 0 checks every time
         """
         self._profiles_dir = Path(profiles_dir)
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl_seconds
+        self._cache: OrderedDict[str, _CachedProfile] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def initialize(self) -> None:
         """Create the profiles directory if it doesn't exist."""
@@ -33,24 +246,177 @@ class ProfileStore:
 
     def _get_profile_path(self, user_id: str) -> Path:
         """Get the file path for a user's profile."""
-        # Sanitize user_id to prevent path traversal
-        safe_user_id = "".join(c for c in user_id if c.isalnum() or c in "-_")
-        return self._profiles_dir / f"{safe_user_id}.npy"
+        return self._profiles_dir / f"{_encode_user_id(user_id)}.npy"
+
+    @staticmethod
+    def _metadata_path(profile_path: Path) -> Path:
+        return profile_path.with_suffix(".json")
+
+    def _read_metadata(self, profile_path: Path) -> dict:
+        try:
+            return json.loads(self._metadata_path(profile_path).read_text())
+        except FileNotFoundError:
+            return {}
+
+    def _write_atomic(self, path: Path, write) -> None:
+        """Write a file under a temporary name and rename it into place."""
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, "wb") as f:
+            write(f)
+        os.replace(temp_path, path)
+
+    def _lookup(self, user_id: str) -> _CachedProfile | None:
+        """
+        Return a user's profile from the cache, loading it if needed.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            The cached profile or None if not found
+        """
+        profile_path = self._get_profile_path(user_id)
+        key = profile_path.stem
+        now = time.monotonic()
+
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry.checked_at < self._cache_ttl:
+                self._cache.move_to_end(key)
+                PROFILE_CACHE_LOOKUPS.labels("hit").inc()
+                return entry
+
+        try:
+            stat = profile_path.stat()
+        except FileNotFoundError:
+            self._invalidate(key)
+            PROFILE_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+
+        if entry is not None and entry.matches(stat):
+            entry.checked_at = now
+            with self._cache_lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+            PROFILE_CACHE_LOOKUPS.labels("hit").inc()
+            return entry
+
+        PROFILE_CACHE_LOOKUPS.labels("miss").inc()
+        embedding = np.load(profile_path)
+        return self._remember(key, embedding, stat, self._read_metadata(profile_path))
+
+    def _remember(
+        self, key: str, embedding: np.ndarray, stat: os.stat_result, metadata: dict
+    ) -> _CachedProfile:
+        """Cache a profile, evicting the least recently used ones over the limit."""
+        embedding.flags.writeable = False
+        entry = _CachedProfile(embedding, stat, time.monotonic(), metadata)
+        if self._cache_size <= 0:
+            return entry
+
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+            PROFILE_CACHE_ENTRIES.set(len(self._cache))
+        return entry
+
+    def _invalidate(self, key: str) -> None:
+        """Drop a profile from the cache."""
+        with self._cache_lock:
+            if self._cache.pop(key, None) is not None:
+                PROFILE_CACHE_ENTRIES.set(len(self._cache))
 
     def exists(self, user_id: str) -> bool:
         """Check if a user has an enrolled profile."""
         return self._get_profile_path(user_id).exists()
 
-    def save(self, user_id: str, embedding: np.ndarray) -> None:
+    @contextmanager
+    def _user_lock(self, profile_path: Path) -> Iterator[None]:
+        """
+        Hold an exclusive cross-process lock on one user's profile.
+
+        ``delete`` removes the lock file while holding it, so a waiter may
+        end up locking a file that is no longer at the path; it then starts
+        over on the current file.
+        """
+        lock_path = profile_path.with_suffix(".lock")
+        while True:
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    try:
+                        current = os.path.samestat(os.fstat(lock_file.fileno()), os.stat(lock_path))
+                    except FileNotFoundError:
+                        current = False
+                    if current:
+                        yield
+                        return
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def add_clip(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float,
+    ) -> tuple[np.ndarray, float, int]:
+        """
+        Fold one more enrollment clip into a profile under a per-user lock.
+
+        Unlike the base implementation, the profile is read from disk,
+        merged and rewritten while holding an exclusive ``flock`` on the
+        user's ``.lock`` file, so concurrent updates from other worker
+        processes cannot interleave with this one.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Embedding of the new clip
+            audio_duration_seconds: Duration of the new clip
+
+        Returns:
+            Tuple of (updated embedding, total audio seconds, clip count)
+        """
+        profile_path = self._get_profile_path(user_id)
+        with self._user_lock(profile_path):
+            # Another worker may have written the profile since it was cached
+            self._invalidate(profile_path.stem)
+            entry = self._lookup(user_id)
+            current = info = None
+            if entry is not None:
+                current, info = entry.embedding, entry.metadata
+            merged = merge_clip(current, info, embedding, audio_duration_seconds)
+            self.save(user_id, *merged)
+
+        return merged
+
+    def save(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float | None = None,
+        clip_count: int = 1,
+    ) -> None:
         """
         Save a user's voice profile.
 
+        Files are written under a temporary name and renamed into place,
+        so concurrent readers see either the old or the new profile.
+
         Args:
             user_id: Unique identifier for the user
             embedding: Speaker embedding to save
+            audio_duration_seconds: Total enrollment audio behind the embedding
+            clip_count: Number of enrollment clips behind the embedding
         """
         profile_path = self._get_profile_path(user_id)
-        np.save(profile_path, embedding)
+        metadata = {"audio_duration_seconds": audio_duration_seconds, "clip_count": clip_count}
+        self._write_atomic(
+            self._metadata_path(profile_path), lambda f: f.write(json.dumps(metadata).encode())
+        )
+        self._write_atomic(profile_path, lambda f: np.save(f, embedding))
+        self._remember(profile_path.stem, np.array(embedding), profile_path.stat(), metadata)
         logger.info(
             "Profile saved",
             user_id=user_id,
@@ -68,19 +434,13 @@ class ProfileStore:
         Returns:
             Speaker embedding or None if not found
         """
-        profile_path = self._get_profile_path(user_id)
+        entry = self._lookup(user_id)
 
-        if not profile_path.exists():
+        if entry is None:
             logger.debug("Profile not found", user_id=user_id)
             return None
 
-        embedding = np.load(profile_path)
-        logger.debug(
-            "Profile loaded",
-            user_id=user_id,
-            embedding_shape=embedding.shape,
-        )
-        return embedding
+        return entry.embedding
 
     def delete(self, user_id: str) -> bool:
         """
@@ -94,11 +454,17 @@ class ProfileStore:
         """
         profile_path = self._get_profile_path(user_id)
 
-        if not profile_path.exists():
-            logger.debug("Profile not found for deletion", user_id=user_id)
-            return False
+        with self._user_lock(profile_path):
+            self._invalidate(profile_path.stem)
+            profile_path.with_suffix(".lock").unlink()
+
+            if not profile_path.exists():
+                logger.debug("Profile not found for deletion", user_id=user_id)
+                return False
+
+            os.remove(profile_path)
+            self._metadata_path(profile_path).unlink(missing_ok=True)
 
-        os.remove(profile_path)
         logger.info("Profile deleted", user_id=user_id)
         return True
 
@@ -107,7 +473,7 @@ class ProfileStore:
         if not self._profiles_dir.exists():
             return []
 
-        return [p.stem for p in self._profiles_dir.glob("*.npy")]
+        return [_decode_user_id(p.stem) for p in self._profiles_dir.glob("*.npy")]
 
     def get_profile_info(self, user_id: str) -> dict | None:
         """
@@ -119,17 +485,18 @@ class ProfileStore:
         Returns:
             Profile info dict or None if not found
         """
-        profile_path = self._get_profile_path(user_id)
+        entry = self._lookup(user_id)
 
-        if not profile_path.exists():
+        if entry is None:
             return None
 
-        embedding = np.load(profile_path)
-        stat = profile_path.stat()
+        stat = entry.stat
 
         return {
             "user_id": user_id,
-            "embedding_dimension": embedding.shape[0],
+            "embedding_dimension": entry.embedding.shape[0],
+            "audio_duration_seconds": entry.metadata.get("audio_duration_seconds"),
+            "clip_count": entry.metadata.get("clip_count"),
             "created_at": stat.st_ctime,
             "modified_at": stat.st_mtime,
             "file_size_bytes": stat.st_size,
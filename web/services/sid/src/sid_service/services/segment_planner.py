@@ -0,0 +1,169 @@
+"""Choosing which parts of a diarized recording to embed for each speaker."""
+
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Protocol
+
+
+class _Segment(Protocol):
+    speaker: int
+    start: float
+    end: float
+
+
+@dataclass
+class Span:
+    """A stretch of one speaker's audio, in seconds."""
+
+    speaker: int
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _single_speaker_spans(segments: list[_Segment]) -> list[Span]:
+    """
+    Split the segments into spans where exactly one speaker is talking.
+
+    Overlapping speech is dropped, and touching segments of the same
+    speaker are joined into one span.
+    """
+    events = []
+    for segment in segments:
+        if segment.end > segment.start:
+            events.append((segment.start, 1, segment.speaker))
+            events.append((segment.end, -1, segment.speaker))
+    # Ends sort before starts at the same instant, so touching is not overlap
+    events.sort()
+
+    # Open segments per speaker, and the speakers with at least one open
+    open_segments: dict[int, int] = defaultdict(int)
+    talking: set[int] = set()
+    spans: list[Span] = []
+    previous = None
+    for time, delta, speaker in events:
+        if previous is not None and time > previous and len(talking) == 1:
+            (alone,) = talking
+            if spans and spans[-1].speaker == alone and spans[-1].end == previous:
+                spans[-1] = Span(alone, spans[-1].start, time)
+            else:
+                spans.append(Span(alone, previous, time))
+
+        open_segments[speaker] += delta
+        if open_segments[speaker]:
+            talking.add(speaker)
+        else:
+            talking.discard(speaker)
+        previous = time
+
+    return spans
+
+
+def _centre(span: Span, length: float) -> Span:
+    """The middle ``length`` seconds of a span, away from its boundaries."""
+    if span.duration <= length:
+        return span
+    start = span.start + (span.duration - length) / 2
+    return Span(span.speaker, start, start + length)
+
+
+def _pieces(span: Span, max_span_seconds: float) -> list[Span]:
+    """Cut a long span into consecutive pieces of ``max_span_seconds``, centred."""
+    count = int(span.duration // max_span_seconds)
+    if count <= 1:
+        return [span]
+    start = span.start + (span.duration - count * max_span_seconds) / 2
+    return [
+        Span(span.speaker, start + i * max_span_seconds, start + (i + 1) * max_span_seconds)
+        for i in range(count)
+    ]
+
+
+def _select(
+    candidates: list[Span], budget_seconds: float, max_span_seconds: float, min_seconds: float
+) -> list[Span]:
+    """Pick long spans spread over the speaker's part of the recording."""
+    # One time bin per span the budget can hold; each bin offers its
+    # longest remaining span in turn
+    num_bins = max(1, math.ceil(budget_seconds / max_span_seconds))
+    first = min(span.start for span in candidates)
+    width = (max(span.end for span in candidates) - first) / num_bins or 1.0
+
+    bins: list[list[Span]] = [[] for _ in range(num_bins)]
+    for span in (piece for span in candidates for piece in _pieces(span, max_span_seconds)):
+        middle = (span.start + span.end) / 2
+        bins[min(num_bins - 1, int((middle - first) / width))].append(span)
+    for spans in bins:
+        spans.sort(key=lambda span: span.duration)
+
+    chosen = []
+    remaining = budget_seconds
+    while remaining >= min_seconds and any(bins):
+        for spans in bins:
+            if not spans or remaining < min_seconds:
+                continue
+            span = _centre(spans.pop(), min(max_span_seconds, remaining))
+            chosen.append(span)
+            remaining -= span.duration
+
+    return chosen
+
+
+def plan_segments(
+    segments: Iterable[_Segment],
+    budget_seconds: float,
+    min_seconds: float,
+    max_span_seconds: float = 10.0,
+) -> dict[int, list[Span]]:
+    """
+    Choose the audio to embed for each speaker, within a per-speaker budget.
+
+    Only speech where the speaker talks alone is used, unless a speaker
+    never does, in which case their own segments are used as given. Spans
+    shorter than ``min_seconds`` are skipped and long ones are cut into
+    pieces of ``max_span_seconds``. The budget is then spread over the
+    speaker's part of the recording, longest spans first.
+
+    Args:
+        segments: Diarized segments with ``speaker``, ``start`` and ``end``
+        budget_seconds: Most audio embedded per speaker; 0 keeps every
+            segment of at least ``min_seconds`` as it is
+        min_seconds: Shortest span worth embedding
+        max_span_seconds: Longest single span
+
+    Returns:
+        Chosen spans per speaker, in time order; speakers without enough
+        audio are left out
+    """
+    segments = list(segments)
+    max_span_seconds = max(max_span_seconds, min_seconds)
+    if not budget_seconds:
+        plan: dict[int, list[Span]] = defaultdict(list)
+        for segment in segments:
+            if segment.end - segment.start >= min_seconds:
+                plan[segment.speaker].append(Span(segment.speaker, segment.start, segment.end))
+        return dict(plan)
+
+    clean: dict[int, list[Span]] = defaultdict(list)
+    for span in _single_speaker_spans(segments):
+        if span.duration >= min_seconds:
+            clean[span.speaker].append(span)
+
+    raw: dict[int, list[Span]] = defaultdict(list)
+    for segment in segments:
+        if segment.end - segment.start >= min_seconds:
+            raw[segment.speaker].append(Span(segment.speaker, segment.start, segment.end))
+
+    plan = {}
+    for speaker in sorted({segment.speaker for segment in segments}):
+        candidates = clean.get(speaker) or raw.get(speaker)
+        if candidates:
+            chosen = _select(candidates, budget_seconds, max_span_seconds, min_seconds)
+            plan[speaker] = sorted(chosen, key=lambda span: span.start)
+
+    return plan
@@ -0,0 +1,131 @@
+"""Per-speaker verification that stops embedding once a decision is clear."""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from .segment_planner import Span
+
+
+@dataclass
+class SpeakerVerdict:
+    """Running evidence for one diarized speaker."""
+
+    speaker: int
+    pending: list[Span]
+    total: np.ndarray | None = None
+    count: int = 0
+    seconds: float = 0.0
+    similarity: float = 0.0
+    settled: bool = False
+
+    def add(self, spans: list[Span], embeddings: np.ndarray, reference: np.ndarray) -> None:
+        """Fold newly embedded spans into the running mean and rescore it."""
+        batch_sum = embeddings.sum(axis=0)
+        self.total = batch_sum if self.total is None else self.total + batch_sum
+        self.count += len(spans)
+        self.seconds += sum(span.duration for span in spans)
+        self.similarity = _cosine(self.total / self.count, reference)
+
+
+def _cosine(embedding: np.ndarray, reference: np.ndarray) -> float:
+    norm = np.linalg.norm(embedding) * np.linalg.norm(reference)
+    return float(np.dot(embedding, reference) / norm) if norm else 0.0
+
+
+class SequentialVerifier:
+    """
+    Scores each speaker against a reference, embedding as little as needed.
+
+    Every speaker's spans are embedded in priority order (longest first) in
+    rounds that double in size: one span per speaker, then two, then four.
+    All speakers still undecided share each round's batch. After each round
+    a speaker's running mean embedding is compared with the reference, and
+    the speaker is settled once the similarity is at least ``owner_margin``
+    above the threshold or ``other_margin`` below it, with at least
+    ``min_seconds`` of audio behind it. Speakers that never settle use all
+    of their spans, exactly as without early stopping.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        owner_margin: float,
+        other_margin: float,
+        min_seconds: float = 0.0,
+        early_stop: bool = True,
+    ) -> None:
+        """
+        Create the verifier.
+
+        Args:
+            threshold: Similarity from which a speaker is the owner
+            owner_margin: Distance above the threshold that settles "owner"
+            other_margin: Distance below the threshold that settles "other"
+            min_seconds: Least audio embedded before a speaker can settle
+            early_stop: False embeds every span in a single round
+        """
+        self.threshold = threshold
+        self.owner_margin = owner_margin
+        self.other_margin = other_margin
+        self.min_seconds = min_seconds
+        self.early_stop = early_stop
+
+    def is_settled(self, verdict: SpeakerVerdict) -> bool:
+        """Whether a speaker's evidence is far enough from the threshold."""
+        if verdict.count == 0 or verdict.seconds < self.min_seconds:
+            return False
+        return (
+            verdict.similarity >= self.threshold + self.owner_margin
+            or verdict.similarity < self.threshold - self.other_margin
+        )
+
+    async def verify(
+        self,
+        plan: dict[int, list[Span]],
+        reference: np.ndarray,
+        embed: Callable[[list[Span]], Awaitable[np.ndarray]],
+    ) -> dict[int, SpeakerVerdict]:
+        """
+        Score every planned speaker against the reference.
+
+        Args:
+            plan: Spans to embed per speaker
+            reference: Reference embedding of the enrolled user
+            embed: Returns the embeddings of a list of spans, in order
+
+        Returns:
+            The verdict for each speaker in ``plan``
+        """
+        verdicts = {
+            speaker: SpeakerVerdict(
+                speaker, sorted(spans, key=lambda span: span.duration, reverse=True)
+            )
+            for speaker, spans in plan.items()
+        }
+
+        round_size = 1
+        while True:
+            batch: list[tuple[SpeakerVerdict, list[Span]]] = []
+            for verdict in verdicts.values():
+                if verdict.settled or not verdict.pending:
+                    continue
+                take = round_size if self.early_stop else len(verdict.pending)
+                batch.append((verdict, verdict.pending[:take]))
+                del verdict.pending[:take]
+            if not batch:
+                return verdicts
+
+            spans = [span for _, speaker_spans in batch for span in speaker_spans]
+            embeddings = await embed(spans)
+
+            offset = 0
+            for verdict, speaker_spans in batch:
+                verdict.add(
+                    speaker_spans, embeddings[offset : offset + len(speaker_spans)], reference
+                )
+                offset += len(speaker_spans)
+                verdict.settled = self.early_stop and self.is_settled(verdict)
+
+            round_size *= 2
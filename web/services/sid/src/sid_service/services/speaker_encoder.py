@@ -6,28 +6,52 @@ import torchaudio
 from speechbrain.inference.speaker import SpeakerRecognition
 
 from ..core.logging import get_logger
+from .encoder_base import MODEL_SOURCE, EncoderBase
 
 logger = get_logger(__name__)
 
+# Filterbank frame step at 16 kHz (10 ms), and frames on each side of a
+# chunk computed as context so chunked features match one long pass
+_HOP_SAMPLES = 160
+_CONTEXT_FRAMES = 2
 
-class SpeakerEncoder:
+# Frames of filterbank features computed per pass over a long recording
+_FEATURE_CHUNK_FRAMES = 6000
+
+
+class SpeakerEncoder(EncoderBase):
     """
     Extracts speaker embeddings using the ECAPA-TDNN model from SpeechBrain.
 
     The model produces 192-dimensional embeddings that capture unique voice characteristics.
     These embeddings can be compared using cosine similarity for speaker verification.
+
+    Waveforms longer than ``window_seconds`` are never run through the model
+    in one piece: they are cut into overlapping windows of that length, which
+    are batched with everything else and averaged back into one embedding.
     """
 
-    def __init__(self, device: str | None = None) -> None:
+    def __init__(
+        self,
+        device: str | None = None,
+        max_batch_samples: int = 960_000,
+        window_seconds: float = 10.0,
+        window_overlap: float = 0.25,
+    ) -> None:
         """
         Initialize the speaker encoder.
 
         Args:
             device: Device to run inference on ("cuda", "cpu", or None for auto-detect)
+            max_batch_samples: Upper bound on padded samples (batch size x longest
+                waveform) per forward pass in ``encode_waveforms``
+            window_seconds: Longest waveform embedded in one piece; 0 embeds
+                every waveform whole
+            window_overlap: Fraction of each window shared with the next one
         """
+        super().__init__(max_batch_samples, window_seconds, window_overlap)
         self._model: SpeakerRecognition | None = None
         self._device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self._initialized = False
 
     def initialize(self) -> None:
         """Load the ECAPA-TDNN model from HuggingFace."""
@@ -37,7 +61,7 @@ class SpeakerEncoder:
         logger.info("Loading ECAPA-TDNN model", device=self._device)
 
         self._model = SpeakerRecognition.from_hparams(
-            source="speechbrain/spkrec-ecapa-voxceleb",
+            source=MODEL_SOURCE,
             savedir="/tmp/speechbrain_models/spkrec-ecapa-voxceleb",
             run_opts={"device": self._device},
         )
@@ -45,10 +69,10 @@ class SpeakerEncoder:
         self._initialized = True
         logger.info("ECAPA-TDNN model loaded successfully")
 
-    @property
-    def is_initialized(self) -> bool:
-        """Check if the model is loaded."""
-        return self._initialized
+    def use_threads(self, threads: int) -> None:
+        """Set torch's intra-op thread count, which is per calling thread."""
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
 
     def encode_file(self, audio_path: str) -> np.ndarray:
         """
@@ -70,14 +94,7 @@ class SpeakerEncoder:
 
         waveform, sample_rate = AudioUtils.load_audio(audio_path, target_sample_rate=16000)
 
-        # Convert to tensor with batch dimension
-        signal = torch.from_numpy(waveform).unsqueeze(0).float()
-
-        # Extract embedding
-        embedding = self._model.encode_batch(signal)
-
-        # Convert to numpy and flatten
-        embedding_np = embedding.squeeze().cpu().numpy()
+        embedding_np = self.encode_waveform(waveform, sample_rate)
 
         logger.debug(
             "Embedding extracted",
@@ -120,51 +137,249 @@ class SpeakerEncoder:
         if signal.shape[0] > 1:
             signal = torch.mean(signal, dim=0, keepdim=True)
 
-        # Extract embedding
-        embedding = self._model.encode_batch(signal)
-
-        return embedding.squeeze().cpu().numpy()
+        # Extract embedding, windowed if the waveform is long
+        return self._encode_signals([signal[0]])[0]
 
-    def compute_similarity(
-        self, embedding1: np.ndarray, embedding2: np.ndarray
-    ) -> float:
+    def encode_waveforms(
+        self, waveforms: list[np.ndarray], sample_rate: int = 16000
+    ) -> np.ndarray:
         """
-        Compute cosine similarity between two speaker embeddings.
+        Extract speaker embeddings from many mono waveforms in batched passes.
+
+        Waveforms longer than the window are split into windows first, and
+        each one's embedding is the mean of its windows' embeddings. The
+        pieces are sorted by length and packed into padded batches of
+        similar length holding at most ``max_batch_samples`` padded samples,
+        and each batch runs through the embedding model once. Filterbank
+        features and their normalization are computed per piece; padded
+        frames are zeroed and excluded via relative lengths, so results
+        match unbatched passes closely.
 
         Args:
-            embedding1: First speaker embedding
-            embedding2: Second speaker embedding
+            waveforms: Mono audio waveforms (1D numpy arrays), may differ in length
+            sample_rate: Sample rate of the audio
 
         Returns:
-            Cosine similarity score between -1 and 1 (higher = more similar)
+            Array of shape (len(waveforms), 192), in input order
         """
-        # Normalize embeddings
-        norm1 = np.linalg.norm(embedding1)
-        norm2 = np.linalg.norm(embedding2)
+        if not self._initialized:
+            raise RuntimeError("SpeakerEncoder not initialized. Call initialize() first.")
 
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        signals = [torch.from_numpy(w).float() for w in waveforms]
+        if sample_rate != 16000:
+            resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=16000)
+            signals = [resampler(signal) for signal in signals]
+
+        embeddings = self._encode_signals(signals)
+
+        logger.debug(
+            "Batched embeddings extracted",
+            count=len(signals),
+            total_samples=sum(len(signal) for signal in signals),
+        )
+
+        return embeddings
+
+    def encode_windows(
+        self, waveform: np.ndarray, sample_rate: int = 16000
+    ) -> tuple[np.ndarray, list[tuple[float, float]]]:
+        """
+        Extract one embedding per window of a mono waveform.
+
+        The windows are the ones ``encode_waveforms`` averages, so comparing
+        neighbouring rows shows where the speaker changes within a segment.
+
+        Args:
+            waveform: Mono audio waveform (1D numpy array)
+            sample_rate: Sample rate of the audio
 
-        # Compute cosine similarity
-        similarity = np.dot(embedding1, embedding2) / (norm1 * norm2)
+        Returns:
+            Tuple of (embeddings of shape (num_windows, 192), (start, end)
+            of each window in seconds)
+        """
+        if not self._initialized:
+            raise RuntimeError("SpeakerEncoder not initialized. Call initialize() first.")
 
-        return float(similarity)
+        signal = torch.from_numpy(waveform).float()
+        if sample_rate != 16000:
+            signal = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=16000)(
+                signal
+            )
 
-    def verify(
-        self, embedding: np.ndarray, reference_embedding: np.ndarray, threshold: float
-    ) -> tuple[bool, float]:
+        bounds = self._windows(len(signal))
+        embeddings = self._embed_signals([signal[start:end] for start, end in bounds])
+        return embeddings, [(start / 16000, end / 16000) for start, end in bounds]
+
+    def _encode_signals(self, signals: list[torch.Tensor]) -> np.ndarray:
+        """Embed 16 kHz signals, averaging the windows of long ones."""
+        pieces: list[torch.Tensor] = []
+        owners: list[int] = []
+        for index, signal in enumerate(signals):
+            for start, end in self._windows(len(signal)):
+                pieces.append(signal[start:end])
+                owners.append(index)
+
+        piece_embeddings = self._embed_signals(pieces)
+        return self._pool(piece_embeddings, owners, len(signals))
+
+    def encode_segments(
+        self,
+        waveform: np.ndarray,
+        bounds: list[tuple[float, float]],
+        sample_rate: int = 16000,
+    ) -> np.ndarray:
         """
-        Verify if an embedding matches a reference embedding.
+        Extract embeddings of many segments of one recording, sharing features.
+
+        Overlapping and adjacent segments are merged into a cover, and
+        filterbank features are computed once over each stretch of it.
+        Every segment (or window of a long segment) is then embedded from
+        its slice of those frames, normalized on its own as in
+        ``encode_waveforms``. Results match that per-segment path closely;
+        they differ only in the few frames at each segment's edges, which
+        see the neighbouring audio instead of padding.
 
         Args:
-            embedding: Embedding to verify
-            reference_embedding: Reference embedding to compare against
-            threshold: Similarity threshold for verification
+            waveform: Mono waveform of the whole recording (1D numpy array)
+            bounds: (start, end) of each segment in seconds
+            sample_rate: Sample rate of the audio
 
         Returns:
-            Tuple of (is_match, similarity_score)
+            Array of shape (len(bounds), 192), in input order
         """
-        similarity = self.compute_similarity(embedding, reference_embedding)
-        is_match = similarity >= threshold
+        if not self._initialized:
+            raise RuntimeError("SpeakerEncoder not initialized. Call initialize() first.")
+        if not bounds:
+            return np.zeros((0, 192), dtype=np.float32)
+
+        # Sample ranges of every piece at 16 kHz, without resampling yet
+        scale = 16000 / sample_rate
+        num_samples = int(len(waveform) * scale)
+        pieces: list[tuple[int, int]] = []
+        owners: list[int] = []
+        for index, (start, end) in enumerate(bounds):
+            first = min(num_samples, max(0, int(start * 16000)))
+            last = min(num_samples, max(first, int(end * 16000)))
+            for window_start, window_end in self._windows(last - first):
+                pieces.append((first + window_start, first + window_end))
+                owners.append(index)
+
+        # Merge overlapping or touching pieces into stretches of the cover
+        cover: list[list[int]] = []
+        for start, end in sorted(pieces):
+            if cover and start <= cover[-1][1]:
+                cover[-1][1] = max(cover[-1][1], end)
+            else:
+                cover.append([start, end])
+
+        mods = self._model.mods
+        features: list[torch.Tensor | None] = [None] * len(pieces)
+        order = sorted(range(len(pieces)), key=lambda i: pieces[i])
+        position = 0
+        with torch.no_grad():
+            for cover_start, cover_end in cover:
+                # Resample just this stretch; segment offsets stay in 16 kHz samples
+                source = waveform[int(cover_start / scale) : int(np.ceil(cover_end / scale))]
+                signal = torch.from_numpy(np.ascontiguousarray(source)).float()
+                if sample_rate != 16000:
+                    signal = torchaudio.transforms.Resample(
+                        orig_freq=sample_rate, new_freq=16000
+                    )(signal)
+                frames = self._features(signal.to(self._device))
+
+                while position < len(order) and pieces[order[position]][0] < cover_end:
+                    index = order[position]
+                    start, end = pieces[index]
+                    offset = round((start - cover_start) / _HOP_SAMPLES)
+                    count = 1 + (end - start) // _HOP_SAMPLES
+                    feats = frames[offset : offset + count].unsqueeze(0)
+                    features[index] = mods.mean_var_norm(
+                        feats, torch.ones(1, device=self._device)
+                    )
+                    position += 1
+
+        embeddings: list[np.ndarray | None] = [None] * len(pieces)
+        lengths = [end - start for start, end in pieces]
+        for batch in self._length_buckets(lengths):
+            batch_embeddings = self._embed_features([features[index] for index in batch])
+            for row, index in enumerate(batch):
+                embeddings[index] = batch_embeddings[row]
+
+        logger.debug(
+            "Segment embeddings extracted from shared features",
+            count=len(bounds),
+            segment_samples=sum(lengths),
+            feature_samples=sum(end - start for start, end in cover),
+        )
+
+        return self._pool(np.stack(embeddings), owners, len(bounds))
+
+    def _features(self, signal: torch.Tensor) -> torch.Tensor:
+        """
+        Filterbank frames of a 16 kHz signal, one every ``_HOP_SAMPLES``.
+
+        Long signals are processed in chunks of ``_FEATURE_CHUNK_FRAMES``
+        with a little context on each side, so the STFT never spans the
+        whole recording.
+        """
+        compute = self._model.mods.compute_features
+        num_frames = 1 + len(signal) // _HOP_SAMPLES
+        if num_frames <= _FEATURE_CHUNK_FRAMES:
+            return compute(signal.unsqueeze(0))[0]
+
+        chunks = []
+        for first in range(0, num_frames, _FEATURE_CHUNK_FRAMES):
+            last = min(first + _FEATURE_CHUNK_FRAMES, num_frames)
+            context_start = max(0, first - _CONTEXT_FRAMES)
+            context_end = (last + _CONTEXT_FRAMES) * _HOP_SAMPLES
+            feats = compute(
+                signal[context_start * _HOP_SAMPLES : context_end].unsqueeze(0)
+            )[0]
+            chunks.append(feats[first - context_start : last - context_start])
+        return torch.cat(chunks)
+
+    def _embed_signals(self, signals: list[torch.Tensor]) -> np.ndarray:
+        """Embed 16 kHz signals whole, in length-bucketed batches."""
+        embeddings: list[np.ndarray | None] = [None] * len(signals)
+
+        for batch in self._length_buckets([len(signal) for signal in signals]):
+            batch_embeddings = self._embed_batch([signals[index] for index in batch])
+            for row, index in enumerate(batch):
+                embeddings[index] = batch_embeddings[row]
+
+        if not embeddings:
+            return np.zeros((0, 192), dtype=np.float32)
+        return np.stack(embeddings)
+
+    def _embed_batch(self, signals: list[torch.Tensor]) -> np.ndarray:
+        """Run one padded batch of waveforms through the embedding model."""
+        mods = self._model.mods
+
+        with torch.no_grad():
+            features = []
+            for signal in signals:
+                feats = mods.compute_features(signal.unsqueeze(0).to(self._device))
+                features.append(mods.mean_var_norm(feats, torch.ones(1, device=self._device)))
+
+        return self._embed_features(features)
+
+    def _embed_features(self, features: list[torch.Tensor]) -> np.ndarray:
+        """Run one padded batch of normalized features through the embedding model."""
+        mods = self._model.mods
+
+        with torch.no_grad():
+            longest = max(f.shape[1] for f in features)
+            padded = torch.zeros(
+                len(features), longest, features[0].shape[2], device=self._device
+            )
+            for row, feats in enumerate(features):
+                padded[row, : feats.shape[1]] = feats[0]
+
+            # Relative lengths end half a frame early so masks built from
+            # lengths * longest never include the first padded frame
+            lengths = torch.tensor(
+                [(f.shape[1] - 0.5) / longest for f in features], device=self._device
+            )
+            embeddings = mods.embedding_model(padded, lengths)
 
-        return is_match, similarity
+        return embeddings.squeeze(1).cpu().numpy()
@@ -0,0 +1,310 @@
+"""In-memory similarity index over every enrolled profile for 1:N search."""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .profile_store import ProfileStore
+
+logger = get_logger(__name__)
+
+# Profiles added since the last rebuild are scanned exactly; once there are
+# more than this (or 1% of the index), the next search starts a rebuild
+_MAX_TAIL = 1024
+
+# Spherical k-means settings for the IVF partitions
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLES_PER_LIST = 64
+
+
+@dataclass
+class SearchMatch:
+    """One enrolled user and its cosine similarity to a query."""
+
+    user_id: str
+    score: float
+
+
+@dataclass
+class _Snapshot:
+    """A built index: normalized rows grouped by IVF list, if partitioned."""
+
+    user_ids: list[str]
+    matrix: np.ndarray
+    alive: np.ndarray
+    positions: dict[str, int]
+    centroids: np.ndarray | None = None
+    offsets: np.ndarray | None = None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving all-zero rows as zeros."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SpeakerIndex:
+    """
+    Scores query embeddings against every enrolled profile.
+
+    Profiles are held as one L2-normalized float32 matrix, so scoring a
+    query is a single matrix multiply. Once the index holds at least
+    ``ivf_min_profiles`` profiles it is partitioned with spherical k-means
+    (about sqrt(N) lists), and a query only scans the ``ivf_probes`` lists
+    whose centroids are closest to it.
+
+    Enrollments and deletions through this service are applied immediately:
+    new profiles go to a small tail that is always scanned exactly, removed
+    ones are masked out. The index is rebuilt from the profile store when the
+    tail grows large or ``refresh_seconds`` have passed, which also picks up
+    changes made by other workers. Those rebuilds run on a background thread;
+    searches keep using the current index until the new one is swapped in.
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        ivf_min_profiles: int = 50_000,
+        ivf_probes: int = 8,
+        refresh_seconds: float = 60.0,
+    ) -> None:
+        """
+        Create an empty index; call ``rebuild()`` to load the profiles.
+
+        Args:
+            store: Profile store the index is built from
+            ivf_min_profiles: Profiles from which the index is partitioned
+                instead of scanned exactly
+            ivf_probes: IVF lists scanned per query
+            refresh_seconds: Age after which the next search starts a rebuild
+        """
+        self._store = store
+        self._ivf_min_profiles = ivf_min_profiles
+        self._ivf_probes = ivf_probes
+        self._refresh_seconds = refresh_seconds
+
+        self._snapshot = _Snapshot([], np.zeros((0, 0), np.float32), np.zeros(0, bool), {})
+        self._tail_ids: list[str] = []
+        self._tail = np.zeros((0, 0), dtype=np.float32)
+        self._built_at = 0.0
+
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuilding = False
+        # Updates made while a rebuild is running, replayed onto its result
+        self._journal: list[tuple[str, np.ndarray | None]] | None = None
+
+    @property
+    def size(self) -> int:
+        """Number of profiles in the index."""
+        with self._lock:
+            return int(self._snapshot.alive.sum()) + len(self._tail_ids)
+
+    def rebuild(self, wait: bool = True) -> None:
+        """
+        Reload every profile from the store and rebuild the index.
+
+        Args:
+            wait: If False, return at once when another rebuild is running
+        """
+        if not self._rebuild_lock.acquire(blocking=wait):
+            return
+
+        try:
+            with self._lock:
+                self._journal = []
+
+            try:
+                start = time.perf_counter()
+                user_ids, matrix = self._store.load_all()
+                snapshot = self._build(user_ids, matrix)
+            except BaseException:
+                with self._lock:
+                    self._journal = None
+                raise
+
+            with self._lock:
+                journal, self._journal = self._journal, None
+                self._snapshot = snapshot
+                self._tail_ids = []
+                self._tail = np.zeros((0, snapshot.matrix.shape[1]), dtype=np.float32)
+                self._built_at = time.monotonic()
+                for user_id, embedding in journal:
+                    self._apply(user_id, embedding)
+        finally:
+            self._rebuild_lock.release()
+
+        logger.info(
+            "Speaker index built",
+            profiles=len(user_ids),
+            ivf_lists=0 if snapshot.centroids is None else len(snapshot.centroids),
+            build_ms=round((time.perf_counter() - start) * 1000, 1),
+        )
+
+    def _build(self, user_ids: list[str], matrix: np.ndarray) -> _Snapshot:
+        """Normalize and, for large indexes, partition the profiles."""
+        matrix = _normalize(matrix)
+        if len(user_ids) < self._ivf_min_profiles:
+            return _Snapshot(
+                list(user_ids),
+                matrix,
+                np.ones(len(user_ids), dtype=bool),
+                {user_id: row for row, user_id in enumerate(user_ids)},
+            )
+
+        centroids = self._kmeans(matrix, int(np.sqrt(len(user_ids))))
+        assignment = np.argmax(matrix @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+        user_ids = [user_ids[i] for i in order]
+
+        return _Snapshot(
+            user_ids,
+            np.ascontiguousarray(matrix[order]),
+            np.ones(len(user_ids), dtype=bool),
+            {user_id: row for row, user_id in enumerate(user_ids)},
+            centroids,
+            offsets,
+        )
+
+    @staticmethod
+    def _kmeans(matrix: np.ndarray, n_lists: int) -> np.ndarray:
+        """Spherical k-means centroids from a sample of the rows."""
+        rng = np.random.default_rng(0)
+        n_samples = min(len(matrix), n_lists * _KMEANS_SAMPLES_PER_LIST)
+        sample = matrix[rng.choice(len(matrix), n_samples, replace=False)]
+        centroids = sample[rng.choice(n_samples, n_lists, replace=False)]
+
+        for _ in range(_KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            # Empty lists keep their previous centroid
+            filled = np.bincount(assignment, minlength=n_lists) > 0
+            centroids[filled] = _normalize(sums[filled])
+
+        return centroids
+
+    def upsert(self, user_id: str, embedding: np.ndarray) -> None:
+        """Add or replace a profile without waiting for a rebuild."""
+        with self._lock:
+            self._apply(user_id, embedding)
+            if self._journal is not None:
+                self._journal.append((user_id, embedding))
+
+    def remove(self, user_id: str) -> None:
+        """Remove a profile without waiting for a rebuild."""
+        with self._lock:
+            self._apply(user_id, None)
+            if self._journal is not None:
+                self._journal.append((user_id, None))
+
+    def _apply(self, user_id: str, embedding: np.ndarray | None) -> None:
+        """Mask out a profile's old row and append its new one to the tail."""
+        # Searches read a snapshot outside the lock, so swap in a new mask
+        # rather than writing to the one they may be holding
+        row = self._snapshot.positions.get(user_id)
+        if row is not None:
+            alive = self._snapshot.alive.copy()
+            alive[row] = False
+            positions = dict(self._snapshot.positions)
+            del positions[user_id]
+            self._snapshot = replace(self._snapshot, alive=alive, positions=positions)
+
+        if user_id in self._tail_ids:
+            keep = [i for i, tail_id in enumerate(self._tail_ids) if tail_id != user_id]
+            self._tail_ids = [self._tail_ids[i] for i in keep]
+            self._tail = self._tail[keep]
+
+        if embedding is not None:
+            embedding = _normalize(embedding).reshape(1, -1)
+            tail = self._tail if len(self._tail_ids) else self._tail.reshape(0, embedding.shape[1])
+            self._tail = np.vstack([tail, embedding])
+            self._tail_ids = [*self._tail_ids, user_id]
+
+    def _needs_rebuild(self) -> bool:
+        with self._lock:
+            stale = time.monotonic() - self._built_at > self._refresh_seconds
+            tail_full = len(self._tail_ids) > max(_MAX_TAIL, len(self._snapshot.user_ids) // 100)
+        return stale or tail_full
+
+    def _rebuild_in_background(self) -> None:
+        """Start a rebuild on a background thread unless one is already running."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        threading.Thread(
+            target=self._background_rebuild, name="speaker-index-rebuild", daemon=True
+        ).start()
+
+    def _background_rebuild(self) -> None:
+        try:
+            self.rebuild(wait=False)
+        except Exception:
+            logger.exception("Speaker index rebuild failed")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def search(self, queries: np.ndarray, top_k: int = 5) -> list[list[SearchMatch]]:
+        """
+        Find the enrolled users most similar to each query embedding.
+
+        Args:
+            queries: Embeddings of shape (Q, D) or (D,)
+            top_k: Matches returned per query
+
+        Returns:
+            Per query, up to ``top_k`` matches ordered by descending score
+        """
+        if self._needs_rebuild():
+            self._rebuild_in_background()
+
+        with self._lock:
+            snapshot = self._snapshot
+            tail_ids = self._tail_ids
+            tail = self._tail
+
+        queries = _normalize(np.atleast_2d(queries))
+        results = []
+        for query in queries:
+            ids, scores = self._search_snapshot(snapshot, query, top_k)
+            if tail_ids:
+                ids = [*ids, *tail_ids]
+                scores = np.concatenate([scores, tail @ query])
+
+            best = np.argsort(-scores, kind="stable")[:top_k]
+            results.append([SearchMatch(ids[i], float(scores[i])) for i in best])
+
+        return results
+
+    def _search_snapshot(
+        self, snapshot: _Snapshot, query: np.ndarray, top_k: int
+    ) -> tuple[list[str], np.ndarray]:
+        """Top ``top_k`` live rows of a snapshot for one normalized query."""
+        if not snapshot.user_ids:
+            return [], np.zeros(0, dtype=np.float32)
+
+        if snapshot.centroids is None:
+            rows = np.arange(len(snapshot.user_ids))
+            scores = snapshot.matrix @ query
+        else:
+            probes = np.argsort(-(snapshot.centroids @ query))[: self._ivf_probes]
+            rows = np.concatenate(
+                [np.arange(snapshot.offsets[p], snapshot.offsets[p + 1]) for p in probes]
+            )
+            scores = snapshot.matrix[rows] @ query
+
+        live = snapshot.alive[rows]
+        rows, scores = rows[live], scores[live]
+        if len(rows) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            rows, scores = rows[best], scores[best]
+
+        return [snapshot.user_ids[row] for row in rows], scores
@@ -0,0 +1,329 @@
+"""Voice profile storage in a SQLite database in WAL mode."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .profile_store import ProfileStore, merge_clip
+
+logger = get_logger(__name__)
+
+_DATABASE = "profiles.sqlite3"
+
+# Most user IDs bound to one IN (...) query by load_many
+_MAX_QUERY_IDS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    embedding BLOB NOT NULL,
+    dimension INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    audio_duration_seconds REAL,
+    clip_count INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL,
+    modified_at REAL NOT NULL
+)
+"""
+
+# Replacing a profile keeps its original creation time
+_UPSERT = """
+INSERT INTO profiles (
+    user_id, embedding, dimension, model_version,
+    audio_duration_seconds, clip_count, created_at, modified_at
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    embedding = excluded.embedding,
+    dimension = excluded.dimension,
+    model_version = excluded.model_version,
+    audio_duration_seconds = excluded.audio_duration_seconds,
+    clip_count = excluded.clip_count,
+    modified_at = excluded.modified_at
+"""
+
+
+class SQLiteProfileStore(ProfileStore):
+    """
+    Stores profiles as float32 BLOBs in one SQLite table, with metadata.
+
+    The database runs in WAL mode, so any number of readers in any number
+    of worker processes proceed while one writer commits, and every read
+    sees a consistent snapshot. Each save or batch of saves is one
+    transaction, so a profile is replaced atomically. Listing users or
+    reading a profile's metadata is a single indexed query that does not
+    touch the embeddings.
+    """
+
+    def __init__(
+        self,
+        profiles_dir: str,
+        model_version: str = "",
+        busy_timeout_ms: int = 5000,
+    ) -> None:
+        """
+        Initialize the profile store.
+
+        Args:
+            profiles_dir: Directory holding the database file
+            model_version: Embedding model recorded with every saved profile
+            busy_timeout_ms: How long a write waits for another writer's lock
+        """
+        self._path = Path(profiles_dir) / _DATABASE
+        self._model_version = model_version
+        self._busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, isolation_level=None)
+            connection.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout_ms)}")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def initialize(self) -> None:
+        """Create the database and table if needed and switch to WAL mode."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(_SCHEMA)
+
+        # Databases created before multi-clip enrollment lack clip_count
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(profiles)")}
+        if "clip_count" not in columns:
+            connection.execute(
+                "ALTER TABLE profiles ADD COLUMN clip_count INTEGER NOT NULL DEFAULT 1"
+            )
+        count = connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+        logger.info(
+            "Profile store initialized",
+            path=str(self._path),
+            backend="sqlite",
+            profiles=count,
+        )
+
+    def _row(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float | None,
+        clip_count: int,
+        now: float,
+    ) -> tuple:
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32).reshape(-1)
+        return (
+            user_id,
+            embedding.tobytes(),
+            embedding.shape[0],
+            self._model_version,
+            audio_duration_seconds,
+            clip_count,
+            now,
+            now,
+        )
+
+    def save(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float | None = None,
+        clip_count: int = 1,
+    ) -> None:
+        """
+        Save or atomically replace a user's voice profile.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Speaker embedding to save
+            audio_duration_seconds: Total enrollment audio behind the embedding
+            clip_count: Number of enrollment clips behind the embedding
+        """
+        row = self._row(user_id, embedding, audio_duration_seconds, clip_count, time.time())
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(_UPSERT, row)
+
+        logger.info(
+            "Profile saved",
+            user_id=user_id,
+            backend="sqlite",
+            embedding_shape=embedding.shape,
+        )
+
+    def save_many(self, profiles: dict[str, np.ndarray]) -> None:
+        """Save several profiles in one transaction."""
+        now = time.time()
+        rows = [
+            self._row(user_id, embedding, None, 1, now) for user_id, embedding in profiles.items()
+        ]
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(_UPSERT, rows)
+
+        logger.info("Profiles saved", count=len(rows), backend="sqlite")
+
+    def add_clip(
+        self,
+        user_id: str,
+        embedding: np.ndarray,
+        audio_duration_seconds: float,
+    ) -> tuple[np.ndarray, float, int]:
+        """
+        Fold one more enrollment clip into a profile in a single transaction.
+
+        Unlike the base implementation, concurrent updates from other
+        worker processes cannot interleave with this one.
+
+        Args:
+            user_id: Unique identifier for the user
+            embedding: Embedding of the new clip
+            audio_duration_seconds: Duration of the new clip
+
+        Returns:
+            Tuple of (updated embedding, total audio seconds, clip count)
+        """
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                """
+                SELECT embedding, audio_duration_seconds, clip_count
+                FROM profiles WHERE user_id = ?
+                """,
+                (user_id,),
+            ).fetchone()
+
+            current = info = None
+            if row is not None:
+                current = np.frombuffer(row[0], dtype=np.float32)
+                info = {"audio_duration_seconds": row[1], "clip_count": row[2]}
+
+            merged = merge_clip(current, info, embedding, audio_duration_seconds)
+            connection.execute(_UPSERT, self._row(user_id, *merged, time.time()))
+
+        logger.info("Profile updated", user_id=user_id, clip_count=merged[2])
+        return merged
+
+    def load(self, user_id: str) -> np.ndarray | None:
+        """
+        Load a user's voice profile.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            Speaker embedding or None if not found
+        """
+        row = (
+            self._connection()
+            .execute("SELECT embedding FROM profiles WHERE user_id = ?", (user_id,))
+            .fetchone()
+        )
+        if row is None:
+            logger.debug("Profile not found", user_id=user_id)
+            return None
+
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def load_many(self, user_ids: list[str]) -> dict[str, np.ndarray]:
+        """Load several profiles with a few IN queries; missing users are left out."""
+        connection = self._connection()
+        profiles = {}
+        for start in range(0, len(user_ids), _MAX_QUERY_IDS):
+            chunk = user_ids[start : start + _MAX_QUERY_IDS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(
+                f"SELECT user_id, embedding FROM profiles WHERE user_id IN ({placeholders})",
+                chunk,
+            )
+            for user_id, blob in rows:
+                profiles[user_id] = np.frombuffer(blob, dtype=np.float32)
+        return profiles
+
+    def load_all(self) -> tuple[list[str], np.ndarray]:
+        """
+        Load every profile with one query.
+
+        Returns:
+            Tuple of (user IDs, matrix with one embedding per row)
+        """
+        rows = self._connection().execute("SELECT user_id, embedding FROM profiles").fetchall()
+        if not rows:
+            return [], np.zeros((0, 0), dtype=np.float32)
+
+        user_ids = [user_id for user_id, _ in rows]
+        matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+        return user_ids, matrix
+
+    def delete(self, user_id: str) -> bool:
+        """
+        Delete a user's voice profile.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            True if profile was deleted, False if not found
+        """
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            deleted = connection.execute(
+                "DELETE FROM profiles WHERE user_id = ?", (user_id,)
+            ).rowcount
+
+        if not deleted:
+            logger.debug("Profile not found for deletion", user_id=user_id)
+            return False
+
+        logger.info("Profile deleted", user_id=user_id)
+        return True
+
+    def list_users(self) -> list[str]:
+        """List all enrolled user IDs."""
+        rows = self._connection().execute("SELECT user_id FROM profiles ORDER BY user_id")
+        return [user_id for (user_id,) in rows]
+
+    def get_profile_info(self, user_id: str) -> dict | None:
+        """
+        Get information about a user's profile without reading its embedding.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            Profile info dict or None if not found
+        """
+        row = (
+            self._connection()
+            .execute(
+                """
+                SELECT dimension, model_version, audio_duration_seconds, clip_count,
+                       created_at, modified_at, length(embedding)
+                FROM profiles WHERE user_id = ?
+                """,
+                (user_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+
+        dimension, model_version, duration, clip_count, created_at, modified_at, size = row
+        return {
+            "user_id": user_id,
+            "embedding_dimension": dimension,
+            "model_version": model_version,
+            "audio_duration_seconds": duration,
+            "clip_count": clip_count,
+            "created_at": created_at,
+            "modified_at": modified_at,
+            "file_size_bytes": size,
+        }
@@ -0,0 +1 @@
+"""Tests for SID service."""
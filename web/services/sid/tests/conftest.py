@@ -0,0 +1,78 @@
+"""Pytest fixtures for SID service tests."""
+
+import numpy as np
+import pytest
+import torch
+from speechbrain.inference.speaker import SpeakerRecognition
+from speechbrain.lobes.features import Fbank
+from speechbrain.lobes.models.ECAPA_TDNN import ECAPA_TDNN
+from speechbrain.processing.features import InputNormalization
+
+from sid_service.services.speaker_encoder import SpeakerEncoder
+
+
+@pytest.fixture
+def sample_rate() -> int:
+    """Default sample rate for test audio."""
+    return 16000
+
+
+@pytest.fixture
+def generate_speech_like(sample_rate: int):
+    """Factory fixture to generate a voiced, syllable-modulated harmonic signal."""
+
+    def _generate(duration: float = 1.0, amplitude: float = 0.3, f0: float = 140.0) -> np.ndarray:
+        t = np.arange(int(sample_rate * duration)) / sample_rate
+        pitch = f0 + 30 * np.sin(2 * np.pi * 0.7 * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        harmonics = sum(np.sin(k * phase) / k for k in range(1, 15))
+        syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0.0, None)
+        noise = 0.01 * np.random.default_rng(0).standard_normal(len(t))
+        return (amplitude * harmonics * syllables + noise).astype(np.float32)
+
+    return _generate
+
+
+@pytest.fixture(scope="session")
+def ecapa_model() -> SpeakerRecognition:
+    """
+    ECAPA-TDNN with the pretrained model's architecture and random weights.
+
+    The tests compare code paths against each other rather than checking
+    who is speaking, so the weights do not matter and nothing is downloaded.
+    """
+    torch.manual_seed(0)
+    modules = {
+        "compute_features": Fbank(n_mels=80),
+        "mean_var_norm": InputNormalization(norm_type="sentence", std_norm=False),
+        "embedding_model": ECAPA_TDNN(
+            80,
+            channels=[1024, 1024, 1024, 1024, 3072],
+            kernel_sizes=[5, 3, 3, 3, 1],
+            dilations=[1, 2, 3, 4, 1],
+            attention_channels=128,
+            lin_neurons=192,
+        ),
+    }
+    model = SpeakerRecognition(modules=modules, hparams={**modules, "pretrainer": None})
+    model.mods.eval()
+    return model
+
+
+@pytest.fixture
+def make_encoder(ecapa_model: SpeakerRecognition):
+    """Factory fixture for CPU encoders sharing the random-weight model."""
+
+    def _make(**kwargs) -> SpeakerEncoder:
+        encoder = SpeakerEncoder(device="cpu", **kwargs)
+        encoder._model = ecapa_model
+        encoder._initialized = True
+        return encoder
+
+    return _make
+
+
+@pytest.fixture
+def encoder(make_encoder) -> SpeakerEncoder:
+    """Encoder with the service's default windowing."""
+    return make_encoder()
@@ -0,0 +1,107 @@
+"""Tests for audio utilities."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+import torch
+import torchaudio
+
+from sid_service.services.audio_utils import AudioReader, AudioUtils
+
+
+class TestResample:
+    """Tests for the NumPy resampler."""
+
+    @pytest.mark.parametrize("orig_sample_rate", [8000, 11025, 22050, 44100, 48000])
+    def test_matches_torchaudio(self, orig_sample_rate: int):
+        """Test that resampling matches torchaudio's default Resample."""
+        waveform = np.random.default_rng(0).standard_normal(orig_sample_rate * 2 + 7)
+        waveform = waveform.astype(np.float32)
+
+        expected = torchaudio.transforms.Resample(orig_sample_rate, 16000)(
+            torch.from_numpy(waveform).unsqueeze(0)
+        )[0].numpy()
+        actual = AudioUtils.resample(waveform, orig_sample_rate, 16000)
+
+        assert actual.dtype == np.float32
+        assert actual.shape == expected.shape
+        np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+    def test_same_rate_and_empty(self):
+        """Test the trivial cases."""
+        waveform = np.ones(100, dtype=np.float32)
+
+        np.testing.assert_array_equal(AudioUtils.resample(waveform, 16000, 16000), waveform)
+        assert AudioUtils.resample(np.zeros(0, dtype=np.float32), 44100, 16000).shape == (0,)
+
+
+class TestAudioReader:
+    """Tests for seek-based segment reads."""
+
+    @pytest.fixture
+    def waveform(self, generate_speech_like) -> np.ndarray:
+        return generate_speech_like(duration=5.0)
+
+    @pytest.fixture
+    def wav_path(self, tmp_path, waveform: np.ndarray, sample_rate: int) -> str:
+        path = tmp_path / "speech.wav"
+        sf.write(path, waveform, sample_rate, subtype="FLOAT")
+        return str(path)
+
+    def test_segments_match_slices(self, wav_path: str, waveform: np.ndarray):
+        """Test that each segment holds exactly the frames of its range."""
+        with AudioReader(wav_path) as reader:
+            assert reader.duration == pytest.approx(5.0)
+            for start, end in [(3.0, 4.0), (0.0, 0.5), (1.25, 2.5)]:
+                np.testing.assert_array_equal(
+                    reader.segment(start, end), waveform[int(start * 16000) : int(end * 16000)]
+                )
+
+    def test_ranges_are_clamped(self, wav_path: str, waveform: np.ndarray):
+        """Test that ranges past either end are cut to the recording."""
+        with AudioReader(wav_path) as reader:
+            np.testing.assert_array_equal(reader.segment(-1.0, 0.5), waveform[:8000])
+            np.testing.assert_array_equal(reader.segment(4.5, 9.0), waveform[72000:])
+            assert reader.segment(6.0, 7.0).shape == (0,)
+
+    def test_resamples_to_target_rate(self, tmp_path, waveform: np.ndarray):
+        """Test that a 32 kHz file is returned at 16 kHz."""
+        path = tmp_path / "speech_32k.wav"
+        sf.write(path, np.repeat(waveform, 2), 32000, subtype="FLOAT")
+
+        with AudioReader(str(path)) as reader:
+            segment = reader.segment(1.0, 2.0)
+
+        assert reader.native_sample_rate == 32000
+        np.testing.assert_array_equal(
+            segment, AudioUtils.resample(np.repeat(waveform, 2)[32000:64000], 32000, 16000)
+        )
+
+    def test_compressed_file_is_decoded_once_into_a_map(
+        self, tmp_path, waveform: np.ndarray, sample_rate: int, monkeypatch
+    ):
+        """Test that compressed audio is read from a decoded memory map, not a temp WAV."""
+        av = pytest.importorskip("av")
+        path = tmp_path / "speech.m4a"
+        with av.open(str(path), "w") as container:
+            stream = container.add_stream("aac", rate=sample_rate, layout="mono")
+            frame = av.AudioFrame.from_ndarray(waveform[np.newaxis], format="flt", layout="mono")
+            frame.sample_rate = sample_rate
+            for packet in (*stream.encode(frame), *stream.encode(None)):
+                container.mux(packet)
+        monkeypatch.setattr(AudioUtils, "convert_to_wav", None)
+        decoded = AudioUtils.decode(str(path), decoder="pyav")
+
+        with AudioReader(str(path), decoder="pyav", temp_dir=str(tmp_path / "maps")) as reader:
+            segment = reader.segment(1.0, 2.0)
+            assert reader.duration == pytest.approx(len(decoded) / 16000)
+            assert len(list((tmp_path / "maps").iterdir())) == 1
+
+        np.testing.assert_array_equal(segment, decoded[16000:32000])
+        assert list((tmp_path / "maps").iterdir()) == []
+
+    def test_extract_segment(self, wav_path: str, waveform: np.ndarray):
+        """Test the one-call helper."""
+        segment = AudioUtils.extract_segment(wav_path, 1.0, 2.0)
+
+        np.testing.assert_array_equal(segment, waveform[16000:32000])
@@ -0,0 +1,84 @@
+"""Tests for the cross-request embedding batcher."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from sid_service.services.batcher import EmbeddingBatcher
+from sid_service.services.executors import BoundedExecutor
+
+
+class FakeEncoders:
+    """Stands in for EncoderPool: each embedding repeats its waveform's first sample."""
+
+    size = 1
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.batches: list[list[float]] = []
+        self._error = error
+
+    def encode_waveforms(self, waveforms: list[np.ndarray], sample_rate: int) -> np.ndarray:
+        self.batches.append([float(w[0]) for w in waveforms])
+        if self._error is not None:
+            raise self._error
+        return np.stack([np.full(192, w[0], dtype=np.float32) for w in waveforms])
+
+
+def _waveforms(*values: float) -> list[np.ndarray]:
+    return [np.full(1600, value, dtype=np.float32) for value in values]
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("inference", max_workers=1, max_pending=8)
+    yield executor
+    executor.shutdown()
+
+
+class TestEmbeddingBatcher:
+    """Tests for EmbeddingBatcher."""
+
+    async def test_concurrent_requests_share_a_batch(self, executor):
+        """Test that requests arriving within max_delay run as one batch."""
+        encoders = FakeEncoders()
+        batcher = EmbeddingBatcher(encoders, executor, max_delay_ms=50)
+
+        first, second = await asyncio.gather(
+            batcher.embed(_waveforms(1, 2)), batcher.embed(_waveforms(3))
+        )
+        await batcher.close()
+
+        assert sorted(encoders.batches[0]) == [1, 2, 3]
+        assert len(encoders.batches) == 1
+        np.testing.assert_array_equal(first[:, 0], [1, 2])
+        np.testing.assert_array_equal(second[:, 0], [3])
+
+    async def test_batches_are_filled_round_robin(self, executor):
+        """Test that a large request does not starve a small one."""
+        encoders = FakeEncoders()
+        batcher = EmbeddingBatcher(encoders, executor, max_batch_size=2, max_delay_ms=50)
+
+        await asyncio.gather(batcher.embed(_waveforms(1, 2, 3, 4)), batcher.embed(_waveforms(9)))
+        await batcher.close()
+
+        assert encoders.batches == [[1, 9], [2, 3], [4]]
+
+    async def test_errors_reach_every_request_in_the_batch(self, executor):
+        """Test that a failed forward pass fails each waiting request."""
+        batcher = EmbeddingBatcher(FakeEncoders(RuntimeError("boom")), executor, max_delay_ms=50)
+
+        results = await asyncio.gather(
+            batcher.embed(_waveforms(1)), batcher.embed(_waveforms(2)), return_exceptions=True
+        )
+        await batcher.close()
+
+        assert [str(result) for result in results] == ["boom", "boom"]
+
+    async def test_empty_request(self, executor):
+        """Test that no waveforms give an empty matrix without a batch."""
+        encoders = FakeEncoders()
+        batcher = EmbeddingBatcher(encoders, executor)
+
+        assert (await batcher.embed([])).shape == (0, 192)
+        assert encoders.batches == []
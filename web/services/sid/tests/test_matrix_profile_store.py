@@ -0,0 +1,103 @@
+"""Tests for the memory-mapped matrix profile store."""
+
+import numpy as np
+import pytest
+
+from sid_service.services import matrix_profile_store
+from sid_service.services.matrix_profile_store import MatrixProfileStore
+
+
+def _embedding(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(192).astype(np.float32)
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """Factory fixture for stores sharing one directory, like separate workers."""
+
+    def _make() -> MatrixProfileStore:
+        store = MatrixProfileStore(str(tmp_path), refresh_interval_seconds=0)
+        store.initialize()
+        return store
+
+    return _make
+
+
+class TestMatrixProfileStore:
+    """Tests for MatrixProfileStore."""
+
+    def test_replace_appends_a_row(self, make_store):
+        """Test that replacing a profile appends a row and keeps created_at."""
+        store = make_store()
+        store.save("alice", _embedding(0))
+        created_at = store.get_profile_info("alice")["created_at"]
+        store.save("alice", _embedding(1))
+
+        assert store._rows_used == 2
+        assert store.get_profile_info("alice")["created_at"] == created_at
+        np.testing.assert_allclose(store.load("alice"), _embedding(1), rtol=1e-6)
+
+    def test_rejects_wrong_dimension(self, make_store):
+        """Test that embeddings of another size are refused."""
+        store = make_store()
+
+        with pytest.raises(ValueError, match="shape"):
+            store.save("alice", np.zeros(10, dtype=np.float32))
+        with pytest.raises(ValueError, match="shape"):
+            store.add_clip("alice", np.zeros(10, dtype=np.float32), 1.0)
+
+    def test_second_instance_picks_up_records(self, make_store):
+        """Test that another process's saves and deletes become visible."""
+        writer, reader = make_store(), make_store()
+
+        writer.save("alice", _embedding(0))
+        writer.save("bob", _embedding(1))
+        np.testing.assert_allclose(reader.load("alice"), _embedding(0), rtol=1e-6)
+
+        writer.delete("alice")
+        writer.save("bob", _embedding(2))
+        assert reader.list_users() == ["bob"]
+        np.testing.assert_allclose(reader.load("bob"), _embedding(2), rtol=1e-6)
+
+    def test_compaction_across_generations(self, make_store, tmp_path):
+        """Test that compaction keeps live rows and other instances follow it."""
+        writer, reader = make_store(), make_store()
+        for round_ in range(3):
+            for seed, user_id in enumerate(["alice", "bob", "carol"]):
+                writer.save(user_id, _embedding(10 * round_ + seed))
+        writer.delete("carol")
+        assert reader.list_users() == ["alice", "bob"]
+
+        writer.compact()
+        writer.save("dave", _embedding(99))
+
+        assert (tmp_path / "CURRENT").read_text() == "1"
+        assert not (tmp_path / "index.0.log").exists()
+        assert writer._rows_used == 3
+        assert sorted(reader.list_users()) == ["alice", "bob", "dave"]
+        np.testing.assert_allclose(reader.load("alice"), _embedding(20), rtol=1e-6)
+        np.testing.assert_allclose(reader.load("dave"), _embedding(99), rtol=1e-6)
+
+    def test_compacts_automatically(self, make_store, monkeypatch):
+        """Test that dead rows past the limit trigger compaction on write."""
+        monkeypatch.setattr(matrix_profile_store, "_MIN_COMPACT_ROWS", 4)
+        store = make_store()
+
+        for seed in range(8):
+            store.save("alice", _embedding(seed))
+
+        assert store._generation >= 1
+        assert store._rows_used < 8
+        np.testing.assert_allclose(store.load("alice"), _embedding(7), rtol=1e-6)
+
+    def test_add_clip_from_two_instances(self, make_store):
+        """Test that clip updates from two instances are both counted."""
+        worker_a, worker_b = make_store(), make_store()
+
+        worker_a.add_clip("alice", _embedding(0), 5.0)
+        worker_b.add_clip("alice", _embedding(1), 5.0)
+        merged, seconds, clips = worker_a.add_clip("alice", _embedding(2), 5.0)
+
+        expected = (_embedding(0) + _embedding(1) + _embedding(2)) / 3
+        np.testing.assert_allclose(merged, expected, rtol=1e-5)
+        assert (seconds, clips) == (15.0, 3)
@@ -0,0 +1,136 @@
+"""Tests for the voice profile storage backends."""
+
+import numpy as np
+import pytest
+
+from sid_service.services.matrix_profile_store import MatrixProfileStore
+from sid_service.services.profile_store import FileProfileStore, ProfileStore
+from sid_service.services.sqlite_profile_store import SQLiteProfileStore
+
+DIMENSION = 192
+
+
+def _embedding(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32)
+
+
+@pytest.fixture(params=["files", "matrix", "sqlite"])
+def store(request, tmp_path) -> ProfileStore:
+    """An initialized store of each backend in a fresh directory."""
+    if request.param == "files":
+        store = FileProfileStore(str(tmp_path))
+    elif request.param == "matrix":
+        store = MatrixProfileStore(str(tmp_path), refresh_interval_seconds=0)
+    else:
+        store = SQLiteProfileStore(str(tmp_path))
+    store.initialize()
+    return store
+
+
+class TestProfileStores:
+    """Behaviour every backend shares."""
+
+    def test_round_trip(self, store: ProfileStore):
+        """Test that a saved profile loads back with its metadata."""
+        embedding = _embedding(0)
+        store.save("alice", embedding, audio_duration_seconds=12.5, clip_count=2)
+
+        np.testing.assert_allclose(store.load("alice"), embedding, rtol=1e-6)
+        info = store.get_profile_info("alice")
+        assert info["user_id"] == "alice"
+        assert info["embedding_dimension"] == DIMENSION
+        assert info["audio_duration_seconds"] == 12.5
+        assert info["clip_count"] == 2
+        assert store.exists("alice")
+
+    def test_missing_profile(self, store: ProfileStore):
+        """Test lookups of a user that was never enrolled."""
+        assert store.load("nobody") is None
+        assert store.get_profile_info("nobody") is None
+        assert not store.exists("nobody")
+        assert not store.delete("nobody")
+
+    def test_replace_and_delete(self, store: ProfileStore):
+        """Test that saving again replaces a profile and delete removes it."""
+        store.save("alice", _embedding(0))
+        store.save("alice", _embedding(1))
+        store.save("bob", _embedding(2))
+
+        np.testing.assert_allclose(store.load("alice"), _embedding(1), rtol=1e-6)
+        assert sorted(store.list_users()) == ["alice", "bob"]
+
+        assert store.delete("alice")
+        assert store.load("alice") is None
+        assert store.list_users() == ["bob"]
+
+    def test_user_ids_are_kept_verbatim(self, store: ProfileStore):
+        """Test that IDs with punctuation are listed as enrolled and stay distinct."""
+        user_ids = ["a.b", "ab", "user@example.com", "../escape", "100%"]
+        for seed, user_id in enumerate(user_ids):
+            store.save(user_id, _embedding(seed))
+
+        assert sorted(store.list_users()) == sorted(user_ids)
+        for seed, user_id in enumerate(user_ids):
+            np.testing.assert_allclose(store.load(user_id), _embedding(seed), rtol=1e-6)
+
+    def test_load_all(self, store: ProfileStore):
+        """Test that load_all returns every profile with matching rows."""
+        for seed, user_id in enumerate(["alice", "bob", "carol"]):
+            store.save(user_id, _embedding(seed))
+
+        user_ids, matrix = store.load_all()
+
+        assert sorted(user_ids) == ["alice", "bob", "carol"]
+        for user_id, row in zip(user_ids, matrix):
+            np.testing.assert_allclose(row, store.load(user_id), rtol=1e-6)
+
+    def test_add_clip_weights_by_duration(self, store: ProfileStore):
+        """Test that clips are folded into a duration-weighted running mean."""
+        first, second = _embedding(0), _embedding(1)
+
+        store.add_clip("alice", first, 10.0)
+        merged, seconds, clips = store.add_clip("alice", second, 30.0)
+
+        expected = (first * 10.0 + second * 30.0) / 40.0
+        np.testing.assert_allclose(merged, expected, rtol=1e-5)
+        np.testing.assert_allclose(store.load("alice"), expected, rtol=1e-5)
+        assert (seconds, clips) == (40.0, 2)
+        info = store.get_profile_info("alice")
+        assert info["audio_duration_seconds"] == 40.0
+        assert info["clip_count"] == 2
+
+
+class TestFileProfileStore:
+    """Tests specific to the one-file-per-profile backend."""
+
+    def test_simple_ids_keep_their_file_names(self, tmp_path):
+        """Test that IDs without punctuation map to the same files as before."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        store.save("user_42-a", _embedding(0))
+
+        assert (tmp_path / "user_42-a.npy").exists()
+
+    def test_add_clip_sees_other_workers_writes(self, tmp_path):
+        """Test that add_clip reads the profile from disk, not a stale cache entry."""
+        worker_a = FileProfileStore(str(tmp_path), cache_ttl_seconds=60)
+        worker_b = FileProfileStore(str(tmp_path), cache_ttl_seconds=60)
+        worker_a.initialize()
+
+        worker_a.add_clip("alice", _embedding(0), 10.0)
+        worker_b.add_clip("alice", _embedding(1), 10.0)
+        _, seconds, clips = worker_a.add_clip("alice", _embedding(2), 10.0)
+
+        assert (seconds, clips) == (30.0, 3)
+
+    def test_delete_removes_lock_file(self, tmp_path):
+        """Test that deleting a profile leaves no lock file behind, and locking still works."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        store.add_clip("alice", _embedding(0), 10.0)
+
+        assert store.delete("alice")
+        assert list(tmp_path.iterdir()) == []
+
+        _, seconds, clips = store.add_clip("alice", _embedding(1), 5.0)
+        assert (seconds, clips) == (5.0, 1)
@@ -0,0 +1,71 @@
+"""Tests for identify span planning."""
+
+import pytest
+
+from sid_service.services.segment_planner import Span, plan_segments
+
+
+def _total(spans: list[Span]) -> float:
+    return sum(span.duration for span in spans)
+
+
+class TestPlanSegments:
+    """Tests for plan_segments."""
+
+    def test_zero_budget_keeps_every_segment(self):
+        """Test that budget 0 embeds every long enough segment as given."""
+        segments = [Span(0, 0.0, 5.0), Span(1, 4.0, 9.0), Span(0, 9.0, 9.5), Span(0, 10.0, 40.0)]
+
+        plan = plan_segments(segments, 0, min_seconds=1.0)
+
+        assert plan == {0: [Span(0, 0.0, 5.0), Span(0, 10.0, 40.0)], 1: [Span(1, 4.0, 9.0)]}
+
+    def test_drops_overlapping_speech(self):
+        """Test that only audio where a speaker talks alone is planned."""
+        segments = [Span(0, 0.0, 5.0), Span(1, 4.0, 9.0)]
+
+        plan = plan_segments(segments, 60, min_seconds=1.0)
+
+        assert plan == {0: [Span(0, 0.0, 4.0)], 1: [Span(1, 5.0, 9.0)]}
+
+    def test_joins_touching_segments(self):
+        """Test that back-to-back segments of one speaker become one span."""
+        plan = plan_segments([Span(0, 0.0, 2.0), Span(0, 2.0, 5.0)], 60, min_seconds=1.0)
+
+        assert plan == {0: [Span(0, 0.0, 5.0)]}
+
+    def test_falls_back_to_overlapped_segments(self):
+        """Test that a speaker who never talks alone still gets their segments."""
+        segments = [Span(0, 0.0, 10.0), Span(1, 2.0, 6.0)]
+
+        plan = plan_segments(segments, 60, min_seconds=1.0)
+
+        assert plan[1] == [Span(1, 2.0, 6.0)]
+
+    def test_budget_caps_audio_per_speaker(self):
+        """Test that long speakers are capped and spans are spread and bounded."""
+        segments = [Span(0, 0.0, 600.0), Span(1, 600.0, 605.0)]
+
+        plan = plan_segments(segments, 30, min_seconds=1.0, max_span_seconds=10.0)
+
+        assert _total(plan[0]) == pytest.approx(30.0)
+        assert all(span.duration <= 10.0 for span in plan[0])
+        assert plan[0][0].start < 200 and plan[0][-1].end > 400
+        assert plan[1] == [Span(1, 600.0, 605.0)]
+
+    def test_spans_in_time_order_without_short_ones(self):
+        """Test that planned spans are sorted and none is below the minimum."""
+        segments = [Span(0, float(i), i + 0.4 + (i % 5)) for i in range(0, 200, 7)]
+
+        plan = plan_segments(segments, 20, min_seconds=1.5, max_span_seconds=3.0)
+
+        starts = [span.start for span in plan[0]]
+        assert starts == sorted(starts)
+        assert all(span.duration >= 1.5 for span in plan[0])
+        assert _total(plan[0]) <= 20 + 1e-9
+
+    def test_speaker_without_enough_audio_is_left_out(self):
+        """Test that speakers with only short segments are not planned."""
+        plan = plan_segments([Span(0, 0.0, 5.0), Span(1, 5.0, 5.5)], 60, min_seconds=1.0)
+
+        assert list(plan) == [0]
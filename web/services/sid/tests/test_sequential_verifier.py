@@ -0,0 +1,97 @@
+"""Tests for early-stopping sequential verification."""
+
+import numpy as np
+import pytest
+
+from sid_service.services.segment_planner import Span
+from sid_service.services.sequential_verifier import SequentialVerifier
+
+
+def _total(spans: list[Span]) -> float:
+    return sum(span.duration for span in spans)
+
+
+class TestSequentialVerifier:
+    """Tests for SequentialVerifier."""
+
+    @staticmethod
+    def _embedder(vectors: dict[tuple[int, float], np.ndarray], calls: list[list[Span]]):
+        async def embed(spans: list[Span]) -> np.ndarray:
+            calls.append(list(spans))
+            return np.stack([vectors[(span.speaker, span.start)] for span in spans])
+
+        return embed
+
+    @pytest.fixture
+    def reference(self) -> np.ndarray:
+        return np.array([1.0, 0.0, 0.0], dtype=np.float32)
+
+    @pytest.fixture
+    def plan(self) -> dict[int, list[Span]]:
+        return {
+            0: [Span(0, float(i * 10), float(i * 10 + 5 + i)) for i in range(6)],
+            1: [Span(1, float(100 + i * 10), float(100 + i * 10 + 3)) for i in range(6)],
+        }
+
+    @pytest.fixture
+    def vectors(self, plan) -> dict[tuple[int, float], np.ndarray]:
+        rng = np.random.default_rng(0)
+        directions = {0: np.array([1.0, 0.1, 0.0]), 1: np.array([0.0, 1.0, 0.2])}
+        return {
+            (speaker, span.start): (directions[speaker] + 0.05 * rng.standard_normal(3)).astype(
+                np.float32
+            )
+            for speaker, spans in plan.items()
+            for span in spans
+        }
+
+    async def test_without_early_stop_matches_mean_of_all_spans(self, plan, vectors, reference):
+        """Test that early stop off embeds everything at once, scoring the plain mean."""
+        calls: list[list[Span]] = []
+        verifier = SequentialVerifier(0.5, 0.1, 0.1, early_stop=False)
+
+        verdicts = await verifier.verify(plan, reference, self._embedder(vectors, calls))
+
+        assert len(calls) == 1
+        assert len(calls[0]) == sum(len(spans) for spans in plan.values())
+        for speaker, spans in plan.items():
+            mean = np.mean([vectors[(speaker, span.start)] for span in spans], axis=0)
+            expected = mean @ reference / (np.linalg.norm(mean) * np.linalg.norm(reference))
+            verdict = verdicts[speaker]
+            assert verdict.similarity == pytest.approx(expected, rel=1e-5)
+            assert verdict.count == len(spans)
+            assert verdict.seconds == pytest.approx(_total(spans))
+            assert not verdict.settled
+
+    async def test_early_stop_settles_clear_speakers(self, plan, vectors, reference):
+        """Test that clear-cut speakers stop after the first, longest span."""
+        calls: list[list[Span]] = []
+        verifier = SequentialVerifier(0.5, 0.1, 0.1)
+
+        verdicts = await verifier.verify(plan, reference, self._embedder(vectors, calls))
+
+        assert len(calls) == 1
+        assert calls[0] == [plan[0][-1], plan[1][0]]
+        assert verdicts[0].settled and verdicts[0].similarity >= 0.6
+        assert verdicts[1].settled and verdicts[1].similarity < 0.4
+
+    async def test_rounds_double_until_settled(self, plan, vectors, reference):
+        """Test that an undecided speaker is embedded in rounds of 1, 2, 4 spans."""
+        calls: list[list[Span]] = []
+        verifier = SequentialVerifier(0.5, 0.9, 0.9)
+
+        verdicts = await verifier.verify(plan, reference, self._embedder(vectors, calls))
+
+        assert [len(call) for call in calls] == [2, 4, 6]
+        assert all(verdict.count == 6 and not verdict.settled for verdict in verdicts.values())
+
+    async def test_min_seconds_delays_settling(self, plan, vectors, reference):
+        """Test that a speaker cannot settle on less audio than min_seconds."""
+        calls: list[list[Span]] = []
+        verifier = SequentialVerifier(0.5, 0.1, 0.1, min_seconds=8.0)
+
+        verdicts = await verifier.verify(plan, reference, self._embedder(vectors, calls))
+
+        assert verdicts[0].count == 1
+        assert verdicts[1].count == 3
+        assert verdicts[1].seconds >= 8.0
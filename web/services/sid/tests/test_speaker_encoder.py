@@ -0,0 +1,164 @@
+"""Tests for the speaker encoder backends."""
+
+import numpy as np
+import pytest
+
+from sid_service.services.encoder_base import EncoderBase, window_bounds
+from sid_service.services.speaker_encoder import SpeakerEncoder
+
+
+def _cosine_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return 1.0 - (a * b).sum(axis=-1) / (np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1))
+
+
+class TestWindowBounds:
+    """Tests for window_bounds."""
+
+    def test_consecutive_windows_join_short_remainder(self):
+        """Test that a remainder under min_samples joins the window before it."""
+        assert window_bounds(25, 10, min_samples=6) == [(0, 10), (10, 25)]
+        assert window_bounds(27, 10, min_samples=6) == [(0, 10), (10, 20), (20, 27)]
+
+    def test_hopped_windows_end_at_the_last_sample(self):
+        """Test that hopped windows have one length and the last ends at the end."""
+        assert window_bounds(25, 10, hop_samples=7) == [(0, 10), (7, 17), (14, 24), (15, 25)]
+        assert window_bounds(8, 10, hop_samples=7) == [(0, 8)]
+        assert window_bounds(0, 10, hop_samples=7) == []
+
+
+class TestBatching:
+    """Tests for length-bucketed batching."""
+
+    def test_batched_matches_unbatched(self, encoder: SpeakerEncoder, generate_speech_like):
+        """Test that padding shorter waveforms in a batch barely changes embeddings."""
+        speech = generate_speech_like(duration=4.0)
+        waveforms = [speech[: int(seconds * 16000)] for seconds in (2.0, 2.1, 2.3, 2.4, 1.0)]
+
+        batched = encoder.encode_waveforms(waveforms)
+        unbatched = np.stack([encoder.encode_waveforms([w])[0] for w in waveforms])
+
+        # The first four share a padded batch. Padded frames are left out of
+        # pooling; only what the convolutions see past each end differs
+        assert encoder._length_buckets([len(w) for w in waveforms]) == [[3, 2, 1, 0], [4]]
+        assert batched.shape == (5, 192)
+        assert _cosine_distance(batched, unbatched).max() < 1e-3
+        np.testing.assert_allclose(batched[3:], unbatched[3:], atol=1e-5)
+
+    def test_length_buckets_respect_limits(self, make_encoder):
+        """Test that buckets hold similar lengths within the padded-sample budget."""
+        encoder = make_encoder(max_batch_samples=100)
+        lengths = [40, 38, 35, 33, 20, 19, 150]
+
+        buckets = encoder._length_buckets(lengths)
+
+        assert sorted(i for bucket in buckets for i in bucket) == list(range(len(lengths)))
+        assert buckets[0] == [6]
+        for bucket in buckets:
+            longest = lengths[bucket[0]]
+            assert len(bucket) == 1 or longest * len(bucket) <= 100
+            assert all(lengths[i] >= 0.8 * longest for i in bucket)
+
+
+class TestWindowedPooling:
+    """Tests for embedding long waveforms in overlapping windows."""
+
+    def test_long_waveform_is_mean_of_its_windows(self, make_encoder, generate_speech_like):
+        """Test that a long waveform's embedding averages its window embeddings."""
+        encoder = make_encoder(window_seconds=2.0, window_overlap=0.25)
+        waveform = generate_speech_like(duration=5.0)
+
+        embeddings, bounds = encoder.encode_windows(waveform)
+        pooled = encoder.encode_waveforms([waveform])[0]
+
+        assert bounds == [(0.0, 2.0), (1.5, 3.5), (3.0, 5.0)]
+        np.testing.assert_allclose(pooled, embeddings.mean(axis=0), atol=1e-5)
+
+    def test_short_waveform_is_one_window(self, make_encoder, generate_speech_like):
+        """Test that waveforms up to the window length are embedded whole."""
+        encoder = make_encoder(window_seconds=2.0)
+        waveform = generate_speech_like(duration=2.0)
+
+        embeddings, bounds = encoder.encode_windows(waveform)
+
+        assert bounds == [(0.0, 2.0)]
+        np.testing.assert_allclose(encoder.encode_waveforms([waveform])[0], embeddings[0])
+
+    def test_window_zero_embeds_whole(self, make_encoder, generate_speech_like):
+        """Test that window_seconds=0 disables windowing."""
+        encoder = make_encoder(window_seconds=0)
+
+        _, bounds = encoder.encode_windows(generate_speech_like(duration=5.0))
+
+        assert bounds == [(0.0, 5.0)]
+
+
+class TestSharedFeatures:
+    """Tests for encode_segments computing features once per recording."""
+
+    @pytest.fixture
+    def recording(self, generate_speech_like) -> np.ndarray:
+        return generate_speech_like(duration=20.0)
+
+    def test_matches_per_segment_path(self, make_encoder, recording):
+        """Test that shared features embed segments like slicing them out first."""
+        encoder = make_encoder(window_seconds=3.0)
+        bounds = [(0.5, 2.0), (1.5, 4.0), (6.0, 13.5), (13.5, 15.0), (17.2, 19.9)]
+
+        shared = encoder.encode_segments(recording, bounds)
+        per_segment = EncoderBase.encode_segments(encoder, recording, bounds)
+
+        assert shared.shape == (len(bounds), 192)
+        assert _cosine_distance(shared, per_segment).max() < 1e-3
+
+    def test_matches_per_segment_path_when_resampling(self, make_encoder, recording):
+        """Test the shared path on audio that is not at 16 kHz."""
+        encoder = make_encoder()
+        waveform = recording[::2].copy()
+        bounds = [(1.0, 4.0), (5.0, 9.5)]
+
+        shared = encoder.encode_segments(waveform, bounds, sample_rate=8000)
+        per_segment = EncoderBase.encode_segments(encoder, waveform, bounds, sample_rate=8000)
+
+        assert _cosine_distance(shared, per_segment).max() < 1e-3
+
+    def test_no_segments(self, encoder: SpeakerEncoder, recording):
+        """Test that an empty request returns an empty matrix."""
+        assert encoder.encode_segments(recording, []).shape == (0, 192)
+
+
+class TestOnnxEncoder:
+    """Tests for the ONNX Runtime backend against the torch one."""
+
+    @pytest.fixture(scope="class")
+    def onnx_path(self, ecapa_model, tmp_path_factory) -> str:
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+        from sid_service.services.onnx_export import export_onnx
+
+        encoder = SpeakerEncoder(device="cpu")
+        encoder._model = ecapa_model
+        encoder._initialized = True
+        path = str(tmp_path_factory.mktemp("onnx") / "ecapa.onnx")
+        export_onnx(encoder, path)
+        return path
+
+    def test_parity_with_torch(self, encoder: SpeakerEncoder, onnx_path: str):
+        """Test that the exported model's embeddings match torch within tolerance."""
+        from sid_service.services.onnx_export import DEFAULT_TOLERANCE, check_parity
+
+        assert check_parity(encoder, onnx_path) < DEFAULT_TOLERANCE
+
+    def test_resampled_input_matches_torch(
+        self, encoder: SpeakerEncoder, onnx_path: str, generate_speech_like
+    ):
+        """Test that both backends agree on audio they have to resample first."""
+        from sid_service.services.onnx_encoder import OnnxSpeakerEncoder
+
+        onnx_encoder = OnnxSpeakerEncoder(onnx_path)
+        onnx_encoder.initialize()
+        waveform = generate_speech_like(duration=3.0)[::2].copy()
+
+        expected = encoder.encode_waveforms([waveform], sample_rate=8000)
+        actual = onnx_encoder.encode_waveforms([waveform], sample_rate=8000)
+
+        assert _cosine_distance(expected, actual).max() < 1e-4
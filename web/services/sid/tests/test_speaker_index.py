@@ -0,0 +1,103 @@
+"""Tests for the 1:N speaker search index."""
+
+import threading
+import time
+
+import numpy as np
+
+from sid_service.services.profile_store import FileProfileStore
+from sid_service.services.speaker_index import SpeakerIndex
+
+
+def _embedding(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(192).astype(np.float32)
+
+
+class TestSpeakerIndex:
+    """Tests for SpeakerIndex."""
+
+    def test_search_returns_enrolled_ids(self, tmp_path):
+        """Test that matches carry the user IDs as they were enrolled."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        for seed, user_id in enumerate(["a.b", "ab", "user@example.com"]):
+            store.save(user_id, _embedding(seed))
+        index = SpeakerIndex(store)
+        index.rebuild()
+
+        (matches,) = index.search(_embedding(0), top_k=3)
+
+        assert matches[0].user_id == "a.b"
+        assert matches[0].score > 0.999
+        assert sorted(match.user_id for match in matches) == ["a.b", "ab", "user@example.com"]
+
+    def test_upsert_and_remove_apply_before_rebuild(self, tmp_path):
+        """Test that enrollments and deletions are searchable immediately."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        store.save("alice", _embedding(0))
+        index = SpeakerIndex(store)
+        index.rebuild()
+
+        index.upsert("bob", _embedding(1))
+        index.remove("alice")
+
+        (matches,) = index.search(_embedding(1), top_k=5)
+        assert [match.user_id for match in matches] == ["bob"]
+        assert index.size == 1
+
+    def test_remove_leaves_taken_snapshots_unchanged(self, tmp_path):
+        """Test that a removal does not write to a snapshot a search may hold."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        store.save("alice", _embedding(0))
+        index = SpeakerIndex(store)
+        index.rebuild()
+        snapshot = index._snapshot
+
+        index.remove("alice")
+
+        assert snapshot.alive.tolist() == [True]
+        assert snapshot.positions == {"alice": 0}
+        assert index._snapshot.alive.tolist() == [False]
+        assert index.search(_embedding(0)) == [[]]
+
+    def test_stale_index_rebuilds_in_background(self, tmp_path):
+        """Test that a search past refresh_seconds does not wait for the rebuild."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        store.save("alice", _embedding(0))
+        index = SpeakerIndex(store, refresh_seconds=0)
+        index.rebuild()
+
+        # Another worker enrolls bob, and reloading the store is slow
+        store.save("bob", _embedding(1))
+        release = threading.Event()
+        load_all = store.load_all
+        store.load_all = lambda: release.wait(5) and load_all()
+
+        start = time.perf_counter()
+        (matches,) = index.search(_embedding(1), top_k=5)
+        assert time.perf_counter() - start < 1.0
+        assert [match.user_id for match in matches] == ["alice"]
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while index.size < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        (matches,) = index.search(_embedding(1), top_k=5)
+        assert matches[0].user_id == "bob"
+
+    def test_ivf_index_finds_exact_matches(self, tmp_path):
+        """Test that a partitioned index still finds each profile itself."""
+        store = FileProfileStore(str(tmp_path))
+        store.initialize()
+        store.save_many({f"user{i}": _embedding(i) for i in range(400)})
+        index = SpeakerIndex(store, ivf_min_profiles=100, ivf_probes=4)
+        index.rebuild()
+
+        results = index.search(np.stack([_embedding(i) for i in range(0, 400, 40)]), top_k=1)
+
+        assert [matches[0].user_id for matches in results] == [
+            f"user{i}" for i in range(0, 400, 40)
+        ]
@@ -0,0 +1,40 @@
+"""Tests for the SQLite profile store."""
+
+import numpy as np
+
+from sid_service.services.sqlite_profile_store import SQLiteProfileStore
+
+
+def _embedding(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(192).astype(np.float32)
+
+
+class TestSQLiteProfileStore:
+    """Tests for SQLiteProfileStore."""
+
+    def test_second_instance_sees_saves(self, tmp_path):
+        """Test that another connection to the database reads committed profiles."""
+        writer = SQLiteProfileStore(str(tmp_path))
+        reader = SQLiteProfileStore(str(tmp_path))
+        writer.initialize()
+        reader.initialize()
+
+        writer.save_many({"alice": _embedding(0), "bob": _embedding(1)})
+
+        loaded = reader.load_many(["alice", "bob", "nobody"])
+        assert sorted(loaded) == ["alice", "bob"]
+        np.testing.assert_allclose(loaded["bob"], _embedding(1), rtol=1e-6)
+
+    def test_configured_store_records_encoder_backend(self, tmp_path, monkeypatch):
+        """Test that profiles record which encoder backend embedded them."""
+        from sid_service.main import create_profile_store, settings
+
+        monkeypatch.setattr(settings, "profile_backend", "sqlite")
+        monkeypatch.setattr(settings, "profiles_dir", str(tmp_path))
+        monkeypatch.setattr(settings, "encoder_backend", "onnx")
+        store = create_profile_store()
+        store.initialize()
+
+        store.save("alice", _embedding(0))
+
+        assert store.get_profile_info("alice")["model_version"].endswith(":onnx")
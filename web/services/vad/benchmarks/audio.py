@@ -0,0 +1,114 @@
+"""Deterministic synthetic recordings for the VAD benchmarks.
+
+Audio is generated block by block and written straight to disk, so even the
+10-hour fixtures never have to fit in memory while being created. Files are
+cached by profile, duration, format and sample rate.
+"""
+
+import zlib
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Container formats and the libsndfile subtype used for each
+FORMATS = {
+    "wav": ("WAV", "PCM_16"),
+    "flac": ("FLAC", "PCM_16"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+}
+
+# Fraction of each 10-second block that is voiced
+PROFILES = {
+    "speech": 0.7,
+    "silence": 0.1,
+}
+
+BLOCK_SECONDS = 10
+
+
+def _voiced(n_samples: int, sample_rate: int, rng: np.random.Generator) -> np.ndarray:
+    """A harmonic, syllable-modulated signal with a drifting pitch."""
+    t = np.arange(n_samples) / sample_rate
+    base = rng.uniform(100, 220)
+    f0 = base + 0.2 * base * np.sin(2 * np.pi * rng.uniform(0.3, 1.0) * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 15))
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0.0, None)
+    return rng.uniform(0.15, 0.4) * harmonics * syllables
+
+
+def _block(
+    profile: str,
+    sample_rate: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """One block of audio: low background noise with voiced bursts."""
+    n_samples = BLOCK_SECONDS * sample_rate
+    block = rng.normal(0.0, 0.003, n_samples)
+
+    voiced_samples = int(PROFILES[profile] * n_samples)
+    position = 0
+    while voiced_samples > 0 and position < n_samples:
+        gap = int(rng.uniform(0.1, 1.5) * sample_rate)
+        burst = min(voiced_samples, int(rng.uniform(0.4, 3.0) * sample_rate))
+        start = position + gap
+        end = min(n_samples, start + burst)
+        if start >= end:
+            break
+        block[start:end] += _voiced(end - start, sample_rate, rng)
+        voiced_samples -= end - start
+        position = end
+
+    return block.astype(np.float32)
+
+
+def fixture_path(
+    cache_dir: Path,
+    profile: str,
+    duration: float,
+    fmt: str,
+    sample_rate: int,
+) -> Path:
+    """
+    Return the path of a synthetic recording, generating it if needed.
+
+    Args:
+        cache_dir: Directory holding generated fixtures
+        profile: "speech" (mostly voiced) or "silence" (mostly background)
+        duration: Length in seconds, rounded up to a whole block
+        fmt: One of ``FORMATS``
+        sample_rate: Sample rate of the file
+
+    Returns:
+        Path to the cached file
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    path = cache_dir / f"{profile}_{int(duration)}s_{sample_rate}hz.{fmt}"
+    if path.exists():
+        return path
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    container, subtype = FORMATS[fmt]
+    rng = np.random.default_rng(zlib.crc32(f"{profile}:{sample_rate}".encode()))
+    n_blocks = max(1, int(np.ceil(duration / BLOCK_SECONDS)))
+
+    # Write to a temporary name so an interrupted run never leaves a short fixture
+    partial = path.with_suffix(path.suffix + ".partial")
+    with sf.SoundFile(
+        partial,
+        mode="w",
+        samplerate=sample_rate,
+        channels=1,
+        format=container,
+        subtype=subtype,
+    ) as out:
+        for _ in range(n_blocks):
+            out.write(_block(profile, sample_rate, rng))
+
+    partial.rename(path)
+    return path
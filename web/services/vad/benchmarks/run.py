@@ -0,0 +1,285 @@
+"""Benchmark the VAD pipeline stage by stage.
+
+Runs decode, resample, VAD and extraction separately and the full
+detect-and-extract pipeline together over synthetic recordings, then
+reports throughput, latency percentiles and peak memory, and compares them
+with a stored baseline. Everything runs offline: fixtures are generated
+locally and the silero model ships with the ``silero-vad`` package.
+
+Usage (from ``web/services/vad``):
+
+    poetry run python -m benchmarks.run
+    poetry run python -m benchmarks.run --durations 10,3600,36000 --formats wav
+    poetry run python -m benchmarks.run --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.audio import FORMATS, PROFILES, fixture_path
+
+STAGES = ("decode", "resample", "vad", "extract", "pipeline")
+
+# Stages that run on decoded audio, so the container format does not matter
+FORMAT_INDEPENDENT = ("resample", "vad", "extract")
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "vad-benchmarks"
+
+
+@dataclass
+class CaseResult:
+    """Summary of one benchmark case."""
+
+    case: str
+    audio_seconds: float
+    repeats: int
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    setup_rss_mb: float
+
+
+def _case_name(profile: str, fmt: str, duration: int, stage: str) -> str:
+    if stage in FORMAT_INDEPENDENT:
+        return f"{profile}/pcm/{duration}s/{stage}"
+    return f"{profile}/{fmt}/{duration}s/{stage}"
+
+
+def _rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is in KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_case(path: str, stage: str, repeat: int, warmup: int) -> dict:
+    """
+    Time one stage over one fixture (runs in a fresh child process).
+
+    Inputs for the stage are prepared first, outside the timed region, so
+    each stage is measured on its own. Peak RSS is read at the end; the RSS
+    after preparation is reported alongside it as the floor it started from.
+    """
+    from vad_service.core.logging import setup_logging
+    from vad_service.services.vad_processor import VADProcessor
+
+    setup_logging("WARNING", "console")
+    processor = VADProcessor()
+    sample_rate = processor.SAMPLE_RATE
+    data = Path(path).read_bytes()
+
+    if stage != "decode":
+        asyncio.run(processor.initialize())
+
+    audio, source_rate = processor._decode_audio(data)
+    audio_seconds = len(audio) / source_rate
+    resampled = segments = None
+    if stage in ("vad", "extract"):
+        resampled = processor._resample(audio, source_rate, sample_rate)
+    if stage == "extract":
+        segments = processor._run_vad(resampled, 0.5, 250, 100, True)
+    if stage != "resample":
+        audio = None
+
+    async def pipeline() -> None:
+        result = await processor.process_audio_bytes(data)
+        await processor.extract_speech_audio(data, result.segments, timer=result.timer)
+
+    work = {
+        "decode": lambda: processor._decode_audio(data),
+        "resample": lambda: processor._resample(audio, source_rate, sample_rate),
+        "vad": lambda: processor._run_vad(resampled, 0.5, 250, 100, True),
+        "extract": lambda: processor._encode_speech(resampled, segments, sample_rate),
+        "pipeline": lambda: asyncio.run(pipeline()),
+    }[stage]
+
+    setup_rss = _rss_mb()
+
+    for _ in range(warmup):
+        work()
+
+    wall: list[float] = []
+    cpu: list[float] = []
+    for _ in range(repeat):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        work()
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+
+    return {
+        "audio_seconds": audio_seconds,
+        "wall": wall,
+        "cpu": cpu,
+        "peak_rss_mb": _rss_mb(),
+        "setup_rss_mb": setup_rss,
+    }
+
+
+def _summarize(case: str, raw: dict) -> CaseResult:
+    wall_ms = np.array(raw["wall"]) * 1000
+    cpu = float(np.median(raw["cpu"]))
+
+    return CaseResult(
+        case=case,
+        audio_seconds=raw["audio_seconds"],
+        repeats=len(wall_ms),
+        throughput=raw["audio_seconds"] / cpu if cpu > 0 else float("inf"),
+        p50_ms=float(np.percentile(wall_ms, 50)),
+        p90_ms=float(np.percentile(wall_ms, 90)),
+        p99_ms=float(np.percentile(wall_ms, 99)),
+        peak_rss_mb=raw["peak_rss_mb"],
+        setup_rss_mb=raw["setup_rss_mb"],
+    )
+
+
+def _compare(result: CaseResult, baseline: dict, tolerance: float) -> list[str]:
+    """Return the regressions of ``result`` against its baseline entry."""
+    reference = baseline.get(result.case)
+    if reference is None:
+        return []
+
+    problems = []
+    if result.throughput < reference["throughput"] * (1 - tolerance):
+        problems.append(
+            f"throughput {result.throughput:.0f} < {reference['throughput']:.0f} audio-s/CPU-s"
+        )
+    if result.p50_ms > reference["p50_ms"] * (1 + tolerance):
+        problems.append(f"p50 {result.p50_ms:.1f} > {reference['p50_ms']:.1f} ms")
+    if result.peak_rss_mb > reference["peak_rss_mb"] * (1 + tolerance):
+        problems.append(f"peak RSS {result.peak_rss_mb:.0f} > {reference['peak_rss_mb']:.0f} MB")
+
+    return problems
+
+
+def _machine() -> dict:
+    import torch
+
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def _parse_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="speech,silence")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="wav,flac,mp3")
+    parser.add_argument(
+        "--durations",
+        default="10,60",
+        help="Seconds per fixture, e.g. 10,60,600,3600,36000 (10 h)",
+    )
+    parser.add_argument("--stages", default=",".join(STAGES), help=",".join(STAGES))
+    parser.add_argument("--sample-rate", type=int, default=48000, help="Fixture sample rate")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write this run's results to the baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown or memory growth before a case is flagged",
+    )
+    parser.add_argument("--output", type=Path, help="Also write results as JSON")
+    args = parser.parse_args(argv)
+
+    profiles = _parse_list(args.profiles)
+    formats = _parse_list(args.formats)
+    durations = [int(float(d)) for d in _parse_list(args.durations)]
+    stages = _parse_list(args.stages)
+    for stage in stages:
+        if stage not in STAGES:
+            parser.error(f"Unknown stage: {stage}")
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+
+    results: list[CaseResult] = []
+    regressions: dict[str, list[str]] = {}
+    print(
+        f"{'case':<36} {'audio-s/CPU-s':>14} {'p50 ms':>10} {'p90 ms':>10} "
+        f"{'p99 ms':>10} {'peak MB':>9} {'setup MB':>9}"
+    )
+
+    for profile in profiles:
+        for duration in durations:
+            for fmt in formats:
+                path = fixture_path(args.cache_dir, profile, duration, fmt, args.sample_rate)
+                for stage in stages:
+                    if stage in FORMAT_INDEPENDENT and fmt != formats[0]:
+                        continue
+
+                    case = _case_name(profile, fmt, duration, stage)
+                    # A fresh process per case keeps peak RSS attributable to it
+                    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                        raw = pool.submit(
+                            _run_case, str(path), stage, args.repeat, args.warmup
+                        ).result()
+
+                    result = _summarize(case, raw)
+                    results.append(result)
+                    problems = _compare(result, baseline, args.tolerance)
+                    if problems:
+                        regressions[case] = problems
+
+                    flag = "  REGRESSION" if problems else ""
+                    print(
+                        f"{case:<36} {result.throughput:>14.1f} {result.p50_ms:>10.1f} "
+                        f"{result.p90_ms:>10.1f} {result.p99_ms:>10.1f} "
+                        f"{result.peak_rss_mb:>9.0f} {result.setup_rss_mb:>9.0f}{flag}",
+                        flush=True,
+                    )
+
+    report = {
+        "machine": _machine(),
+        "results": {r.case: asdict(r) for r in results},
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.tolerance:.0%}:")
+        for case, problems in regressions.items():
+            print(f"  {case}: {'; '.join(problems)}")
+        return 1
+
+    if baseline:
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
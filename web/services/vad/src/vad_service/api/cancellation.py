@@ -0,0 +1,66 @@
+"""Request-scoped cancellation: client disconnects, deadlines and job IDs."""
+
+import asyncio
+from collections.abc import Awaitable
+from typing import TypeVar
+
+import structlog
+from fastapi import HTTPException, Request
+
+from vad_service.core.config import settings
+from vad_service.core.metrics import CANCELLATIONS
+from vad_service.services.cancellation import CancellationToken, ProcessingCancelledError
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# nginx's convention for "client closed request"
+CLIENT_CLOSED_REQUEST = 499
+
+
+def cancellation_error(reason: str) -> HTTPException:
+    """Count a cancelled job and build the matching HTTP error."""
+    CANCELLATIONS.labels(reason=reason).inc()
+    logger.info("VAD job cancelled", reason=reason)
+
+    if reason == "deadline":
+        return HTTPException(status_code=504, detail="Deadline exceeded")
+    return HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=f"Job {reason}")
+
+
+async def run_cancellable(
+    request: Request,
+    token: CancellationToken,
+    work: Awaitable[T],
+) -> T:
+    """
+    Await processing while watching for the client to disconnect.
+
+    If the client goes away, the token is cancelled so the executor job
+    stops at its next window batch. Cancellations, whatever their cause,
+    are counted and turned into HTTP errors.
+    """
+    task = asyncio.ensure_future(work)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task},
+                timeout=settings.disconnect_poll_interval_seconds,
+            )
+            if task in done:
+                return task.result()
+
+            if await request.is_disconnected():
+                token.cancel("disconnect")
+                task.cancel()
+                raise cancellation_error("disconnect")
+
+    except ProcessingCancelledError as e:
+        raise cancellation_error(e.reason) from e
+
+    finally:
+        if not task.done():
+            token.cancel("disconnect")
+            task.cancel()
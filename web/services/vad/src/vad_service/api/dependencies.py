@@ -1,9 +1,18 @@
 """FastAPI dependencies for dependency injection."""
 
+from collections.abc import Callable, Generator
+
+from fastapi import HTTPException, Request
+
+from vad_service.api.cancellation import cancellation_error
+from vad_service.core.config import settings
+from vad_service.core.metrics import IN_FLIGHT
+from vad_service.services.cancellation import CancellationToken, JobRegistry
 from vad_service.services.vad_processor import VADProcessor
 
-# Global singleton instance
+# Global singleton instances
 _vad_processor: VADProcessor | None = None
+_job_registry = JobRegistry()
 
 
 def get_vad_processor() -> VADProcessor:
@@ -28,3 +37,65 @@ def set_vad_processor(processor: VADProcessor) -> None:
     """
     global _vad_processor
     _vad_processor = processor
+
+
+def get_job_registry() -> JobRegistry:
+    """Dependency to get the registry of cancellable jobs."""
+    return _job_registry
+
+
+def get_cancel_token(request: Request) -> Generator[CancellationToken, None, None]:
+    """
+    Dependency that creates a cancellation token for the current request.
+
+    The deadline is taken from the propagated deadline header (a Unix
+    timestamp in seconds). If the client supplies a job ID header, the
+    token is registered so the job can be cancelled explicitly while it
+    runs.
+    """
+    deadline = None
+    raw_deadline = request.headers.get(settings.deadline_header)
+    if raw_deadline:
+        try:
+            deadline = float(raw_deadline)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid {settings.deadline_header} header: {raw_deadline}",
+            )
+
+    token = CancellationToken(deadline=deadline)
+    if token.expired:
+        raise cancellation_error("deadline")
+
+    job_id = request.headers.get(settings.job_id_header)
+    if job_id:
+        try:
+            _job_registry.register(job_id, token)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        yield token
+    finally:
+        if job_id:
+            _job_registry.unregister(job_id)
+
+
+def track_in_flight(endpoint: str) -> Callable[[], Generator[None, None, None]]:
+    """
+    Build a dependency that counts the requests an endpoint is processing.
+
+    Args:
+        endpoint: Short endpoint name used as the metric label
+    """
+
+    def dependency() -> Generator[None, None, None]:
+        gauge = IN_FLIGHT.labels(endpoint)
+        gauge.inc()
+        try:
+            yield
+        finally:
+            gauge.dec()
+
+    return dependency
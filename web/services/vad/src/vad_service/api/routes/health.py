@@ -1,6 +1,7 @@
 """Health check endpoints."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from vad_service import __version__
 from vad_service.api.dependencies import get_vad_processor
@@ -55,3 +56,13 @@ async def liveness() -> dict:
     Used by container orchestrators like Kubernetes.
     """
     return {"alive": True}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus metrics endpoint.
+
+    Exposes counters and histograms in the Prometheus text format.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
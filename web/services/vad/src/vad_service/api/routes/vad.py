@@ -1,26 +1,71 @@
 """VAD detection endpoints."""
 
+import json
 from collections.abc import AsyncGenerator
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, UploadFile
 from fastapi.responses import Response, StreamingResponse
 
-from vad_service.api.dependencies import get_vad_processor
+from vad_service.api.cancellation import cancellation_error, run_cancellable
+from vad_service.api.dependencies import (
+    get_cancel_token,
+    get_job_registry,
+    get_vad_processor,
+    track_in_flight,
+)
 from vad_service.core.config import settings
+from vad_service.core.metrics import IN_FLIGHT, observe_request
 from vad_service.models.requests import VADParams
-from vad_service.models.responses import VADResponse
+from vad_service.models.responses import (
+    DayStreamFileInfo,
+    DayStreamResponse,
+    IncrementalVADResponse,
+    VADResponse,
+)
+from vad_service.services.cancellation import (
+    CancellationToken,
+    JobRegistry,
+    ProcessingCancelledError,
+)
+from vad_service.services.day_stream import DayStreamFile
+from vad_service.services.timing import StageTimer
 from vad_service.services.vad_processor import VADProcessor
 
 router = APIRouter(prefix="/api/v1/vad", tags=["VAD"])
 logger = structlog.get_logger(__name__)
 
 
-@router.post("/detect", response_model=VADResponse)
+def _record_timings(
+    endpoint: str,
+    response: Response,
+    timer: StageTimer,
+    bytes_received: int,
+    audio_seconds: float,
+) -> None:
+    """Expose a request's stage timings in Server-Timing and the metrics."""
+    response.headers["Server-Timing"] = timer.server_timing()
+    observe_request(
+        endpoint,
+        timer.stages,
+        timer.elapsed_seconds,
+        bytes_received,
+        audio_seconds,
+    )
+
+
+@router.post(
+    "/detect",
+    response_model=VADResponse,
+    dependencies=[Depends(track_in_flight("detect"))],
+)
 async def detect_speech(
+    request: Request,
+    response: Response,
     file: UploadFile,
     params: VADParams = Depends(),
     processor: VADProcessor = Depends(get_vad_processor),
+    cancel_token: CancellationToken = Depends(get_cancel_token),
 ) -> VADResponse:
     """
     Detect speech segments in an audio file.
@@ -46,32 +91,44 @@ async def detect_speech(
         )
 
     try:
-        segments = await processor.process_audio_bytes(
-            audio_data,
-            threshold=params.threshold,
-            min_speech_duration_ms=params.min_speech_duration_ms,
-            min_silence_duration_ms=params.min_silence_duration_ms,
-            return_seconds=params.return_seconds,
+        result = await run_cancellable(
+            request,
+            cancel_token,
+            processor.process_audio_bytes(
+                audio_data,
+                threshold=params.threshold,
+                min_speech_duration_ms=params.min_speech_duration_ms,
+                min_silence_duration_ms=params.min_silence_duration_ms,
+                return_seconds=params.return_seconds,
+                cancel_token=cancel_token,
+                filename=file.filename or "",
+            ),
         )
 
+        _record_timings("detect", response, result.timer, len(audio_data), result.duration)
+
         return VADResponse(
-            segments=segments,
-            total_speech_duration=sum(s.end - s.start for s in segments),
-            total_duration=processor.last_duration,
-            speech_ratio=processor.last_speech_ratio,
-            processing_time_ms=processor.last_processing_time_ms,
+            segments=result.segments,
+            total_speech_duration=sum(s.end - s.start for s in result.segments),
+            total_duration=result.duration,
+            speech_ratio=result.speech_ratio,
+            processing_time_ms=result.processing_time_ms,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("VAD processing failed", error=str(e))
         raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
 
 
-@router.post("/detect/audio")
+@router.post("/detect/audio", dependencies=[Depends(track_in_flight("detect_audio"))])
 async def detect_speech_audio(
+    request: Request,
     file: UploadFile,
     params: VADParams = Depends(),
     processor: VADProcessor = Depends(get_vad_processor),
+    cancel_token: CancellationToken = Depends(get_cancel_token),
 ) -> Response:
     """
     Detect speech and return audio with non-speech removed.
@@ -98,19 +155,32 @@ async def detect_speech_audio(
 
     try:
         # First detect speech segments
-        segments = await processor.process_audio_bytes(
-            audio_data,
-            threshold=params.threshold,
-            min_speech_duration_ms=params.min_speech_duration_ms,
-            min_silence_duration_ms=params.min_silence_duration_ms,
-            return_seconds=True,
+        result = await run_cancellable(
+            request,
+            cancel_token,
+            processor.process_audio_bytes(
+                audio_data,
+                threshold=params.threshold,
+                min_speech_duration_ms=params.min_speech_duration_ms,
+                min_silence_duration_ms=params.min_silence_duration_ms,
+                return_seconds=True,
+                cancel_token=cancel_token,
+                filename=file.filename or "",
+            ),
         )
 
         # Extract speech audio
-        speech_audio = await processor.extract_speech_audio(
-            audio_data,
-            segments,
-            output_sample_rate=params.output_sample_rate,
+        speech_audio = await run_cancellable(
+            request,
+            cancel_token,
+            processor.extract_speech_audio(
+                audio_data,
+                result.segments,
+                output_sample_rate=params.output_sample_rate,
+                cancel_token=cancel_token,
+                timer=result.timer,
+                filename=file.filename or "",
+            ),
         )
 
         # Determine output filename
@@ -121,30 +191,214 @@ async def detect_speech_audio(
             base_name = original_name
         output_filename = f"{base_name}_speech.wav"
 
-        return Response(
+        response = Response(
             content=speech_audio,
             media_type="audio/wav",
             headers={
                 "Content-Disposition": f'attachment; filename="{output_filename}"',
                 "X-Speech-Duration": str(
-                    sum(s.end - s.start for s in segments)
+                    sum(s.end - s.start for s in result.segments)
                 ),
-                "X-Total-Duration": str(processor.last_duration),
-                "X-Speech-Ratio": str(processor.last_speech_ratio),
-                "X-Processing-Time-Ms": str(processor.last_processing_time_ms),
+                "X-Total-Duration": str(result.duration),
+                "X-Speech-Ratio": str(result.speech_ratio),
+                "X-Processing-Time-Ms": str(result.timer.elapsed_ms),
             },
         )
+        _record_timings(
+            "detect_audio", response, result.timer, len(audio_data), result.duration
+        )
 
+        return response
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("VAD audio processing failed", error=str(e))
         raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
 
 
+@router.post(
+    "/detect/incremental",
+    response_model=IncrementalVADResponse,
+    dependencies=[Depends(track_in_flight("detect_incremental"))],
+)
+async def detect_speech_incremental(
+    request: Request,
+    response: Response,
+    file: UploadFile,
+    checkpoint: str | None = Form(default=None),
+    final: bool = Form(default=False),
+    params: VADParams = Depends(),
+    processor: VADProcessor = Depends(get_vad_processor),
+    cancel_token: CancellationToken = Depends(get_cancel_token),
+) -> IncrementalVADResponse:
+    """
+    Detect speech in a recording that is still growing.
+
+    Send the start of a 16 kHz PCM WAV file without a checkpoint. Each
+    response carries a checkpoint token; send it back together with only
+    the bytes appended since the previous upload. Set `final` on the last
+    upload to close any open segment. Only new audio is processed, and the
+    segments returned across all requests match a single full pass.
+    """
+    logger.info(
+        "Processing incremental VAD request",
+        filename=file.filename,
+        resumed=checkpoint is not None,
+        final=final,
+    )
+
+    audio_data = await file.read()
+
+    if len(audio_data) > settings.max_file_size_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.max_file_size_mb}MB",
+        )
+
+    try:
+        result = await run_cancellable(
+            request,
+            cancel_token,
+            processor.process_incremental(
+                audio_data,
+                checkpoint=checkpoint,
+                final=final,
+                threshold=params.threshold,
+                min_speech_duration_ms=params.min_speech_duration_ms,
+                min_silence_duration_ms=params.min_silence_duration_ms,
+                return_seconds=params.return_seconds,
+                cancel_token=cancel_token,
+            ),
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Incremental VAD processing failed", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
+
+    _record_timings(
+        "detect_incremental",
+        response,
+        result.timer,
+        len(audio_data),
+        result.audio_duration,
+    )
+
+    return IncrementalVADResponse(
+        segments=result.segments,
+        checkpoint=result.checkpoint,
+        processed_duration=result.processed_duration,
+        bytes_received=result.bytes_received,
+        processing_time_ms=result.processing_time_ms,
+    )
+
+
+@router.post(
+    "/detect/day",
+    response_model=DayStreamResponse,
+    dependencies=[Depends(track_in_flight("detect_day"))],
+)
+async def detect_speech_day(
+    request: Request,
+    response: Response,
+    files: list[UploadFile],
+    offsets: str | None = Form(
+        default=None,
+        description="JSON array of wall-clock offsets in seconds, one per file",
+    ),
+    max_gap_seconds: float = Form(default=settings.day_stream_max_gap_seconds, ge=0.0),
+    params: VADParams = Depends(),
+    processor: VADProcessor = Depends(get_vad_processor),
+    cancel_token: CancellationToken = Depends(get_cancel_token),
+) -> DayStreamResponse:
+    """
+    Detect speech across a day's consecutive recordings as one timeline.
+
+    Upload the recordings in chronological order, optionally with the
+    wall-clock offset of each file. The files are processed as a single
+    continuous stream, so speech spanning a file boundary is one segment,
+    and all timestamps are returned on the day timeline. Without offsets,
+    each file is assumed to start where the previous one ended.
+    """
+    logger.info("Processing day-stream VAD request", num_files=len(files))
+
+    wall_offsets: list[float | None] = [None] * len(files)
+    if offsets is not None:
+        try:
+            wall_offsets = [float(o) for o in json.loads(offsets)]
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid offsets JSON: {e}")
+        if len(wall_offsets) != len(files):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Got {len(wall_offsets)} offsets for {len(files)} files",
+            )
+
+    for file in files:
+        if file.size is not None and file.size > settings.max_file_size_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {settings.max_file_size_mb}MB",
+            )
+
+    try:
+        result = await run_cancellable(
+            request,
+            cancel_token,
+            processor.process_day_stream(
+                [
+                    DayStreamFile(source=file.file, offset=offset, filename=file.filename or "")
+                    for file, offset in zip(files, wall_offsets)
+                ],
+                threshold=params.threshold,
+                min_speech_duration_ms=params.min_speech_duration_ms,
+                min_silence_duration_ms=params.min_silence_duration_ms,
+                max_gap_seconds=max_gap_seconds,
+                cancel_token=cancel_token,
+            ),
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Day-stream VAD processing failed", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
+
+    total_duration = sum(result.file_durations)
+    total_speech = sum(s.end - s.start for s in result.segments)
+    _record_timings(
+        "detect_day",
+        response,
+        result.timer,
+        sum(file.size or 0 for file in files),
+        total_duration,
+    )
+
+    return DayStreamResponse(
+        segments=result.segments,
+        files=[
+            DayStreamFileInfo(filename=file.filename or "", offset=offset, duration=duration)
+            for file, offset, duration in zip(files, result.file_offsets, result.file_durations)
+        ],
+        total_speech_duration=total_speech,
+        total_duration=total_duration,
+        speech_ratio=min(1.0, total_speech / total_duration) if total_duration > 0 else 0.0,
+        processing_time_ms=result.processing_time_ms,
+    )
+
+
 @router.post("/detect/stream")
 async def detect_speech_streaming(
     request: Request,
     params: VADParams = Depends(),
     processor: VADProcessor = Depends(get_vad_processor),
+    cancel_token: CancellationToken = Depends(get_cancel_token),
 ) -> StreamingResponse:
     """
     Stream audio and receive speech segments as Server-Sent Events.
@@ -153,12 +407,21 @@ async def detect_speech_streaming(
     as they are detected via SSE.
 
     This endpoint accepts raw audio bytes in the request body.
+    Stage timings are sent as a `timings` object (milliseconds) with the
+    completion event, since headers go out before processing starts.
     """
+    timer = StageTimer()
+    bytes_received = 0
 
     async def generate() -> AsyncGenerator[bytes, None]:
+        # Counted here rather than by a dependency, which exits before the body is sent
+        in_flight = IN_FLIGHT.labels("detect_stream")
+        in_flight.inc()
         try:
             async def request_stream() -> AsyncGenerator[bytes, None]:
+                nonlocal bytes_received
                 async for chunk in request.stream():
+                    bytes_received += len(chunk)
                     yield chunk
 
             async for segment in processor.process_stream(
@@ -166,15 +429,31 @@ async def detect_speech_streaming(
                 threshold=params.threshold,
                 min_speech_duration_ms=params.min_speech_duration_ms,
                 min_silence_duration_ms=params.min_silence_duration_ms,
+                cancel_token=cancel_token,
+                timer=timer,
             ):
                 yield f"data: {segment.model_dump_json()}\n\n".encode()
 
+            observe_request(
+                "detect_stream",
+                timer.stages,
+                timer.elapsed_seconds,
+                bytes_received,
+                None,
+            )
+            timings = {name: round(seconds * 1000, 2) for name, seconds in timer.stages.items()}
+
             # Send completion message
-            yield b'data: {"done": true}\n\n'
+            yield f"data: {json.dumps({'done': True, 'timings': timings})}\n\n".encode()
 
+        except ProcessingCancelledError as e:
+            error = cancellation_error(e.reason)
+            yield f'data: {{"error": "{error.detail}"}}\n\n'.encode()
         except Exception as e:
             logger.error("Streaming VAD failed", error=str(e))
             yield f'data: {{"error": "{e}"}}\n\n'.encode()
+        finally:
+            in_flight.dec()
 
     return StreamingResponse(
         generate(),
@@ -184,3 +463,27 @@ async def detect_speech_streaming(
             "Connection": "keep-alive",
         },
     )
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(
+    job_id: str,
+    registry: JobRegistry = Depends(get_job_registry),
+) -> dict:
+    """
+    Cancel a running job.
+
+    Jobs are identified by the ID the client sent in the job ID header
+    (`X-Job-ID` by default) with the original request. Processing stops at
+    the next window batch and the original request fails with status 499.
+
+    The registry lives in this worker process, so only jobs running in it
+    can be found; see the README on running with several workers.
+    """
+    if not registry.cancel(job_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No running job found: {job_id}",
+        )
+
+    return {"success": True, "job_id": job_id, "message": "Job cancelled"}
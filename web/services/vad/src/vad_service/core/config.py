@@ -1,5 +1,7 @@
 """Application configuration using Pydantic Settings."""
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -30,6 +32,14 @@ class Settings(BaseSettings):
     max_file_size_mb: int = Field(default=2048)
     temp_dir: str = Field(default="/tmp/vad-uploads")
     chunk_size: int = Field(default=8192)
+    day_stream_max_gap_seconds: float = Field(default=1.0, ge=0.0)
+    audio_decoder: Literal["auto", "pyav", "ffmpeg"] = Field(default="auto")
+    checkpoint_secret: str = Field(default="")
+
+    # Cancellation
+    deadline_header: str = Field(default="X-Request-Deadline")
+    job_id_header: str = Field(default="X-Job-ID")
+    disconnect_poll_interval_seconds: float = Field(default=0.5, gt=0.0)
 
     # Observability
     log_level: str = Field(default="INFO")
@@ -0,0 +1,72 @@
+"""Prometheus metrics for the VAD service."""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+CANCELLATIONS = Counter(
+    "vad_cancellations_total",
+    "VAD jobs stopped before completion",
+    ["reason"],
+)
+
+STAGE_DURATION = Histogram(
+    "vad_stage_duration_seconds",
+    "Time a request spent in each pipeline stage",
+    ["endpoint", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+REAL_TIME_FACTOR = Histogram(
+    "vad_real_time_factor",
+    "Processing time divided by audio duration",
+    ["endpoint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2),
+)
+
+REQUEST_BYTES = Histogram(
+    "vad_request_bytes",
+    "Size of the audio received per request",
+    ["endpoint"],
+    buckets=(1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 2e9),
+)
+
+REQUEST_AUDIO_SECONDS = Histogram(
+    "vad_request_audio_seconds",
+    "Duration of the audio processed per request",
+    ["endpoint"],
+    buckets=(1, 10, 60, 300, 900, 3600, 4 * 3600, 12 * 3600, 24 * 3600),
+)
+
+IN_FLIGHT = Gauge(
+    "vad_requests_in_flight",
+    "Requests currently being processed",
+    ["endpoint"],
+)
+
+
+def observe_request(
+    endpoint: str,
+    stages: dict[str, float],
+    processing_seconds: float,
+    bytes_received: int,
+    audio_seconds: float | None,
+) -> None:
+    """
+    Record the metrics of one completed request.
+
+    Args:
+        endpoint: Short endpoint name used as the metric label
+        stages: Seconds spent in each pipeline stage
+        processing_seconds: Total wall-clock processing time
+        bytes_received: Size of the uploaded audio
+        audio_seconds: Duration of the audio processed, None if unknown
+    """
+    for stage, seconds in stages.items():
+        STAGE_DURATION.labels(endpoint, stage).observe(seconds)
+
+    REQUEST_BYTES.labels(endpoint).observe(bytes_received)
+    if audio_seconds is None:
+        return
+
+    REQUEST_AUDIO_SECONDS.labels(endpoint).observe(audio_seconds)
+    if audio_seconds > 0:
+        REAL_TIME_FACTOR.labels(endpoint).observe(processing_seconds / audio_seconds)
@@ -31,7 +31,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     )
 
     # Initialize VAD processor
-    processor = VADProcessor()
+    processor = VADProcessor(
+        decoder=settings.audio_decoder, checkpoint_secret=settings.checkpoint_secret
+    )
     await processor.initialize()
     set_vad_processor(processor)
 
@@ -2,7 +2,10 @@
 
 from vad_service.models.requests import OutputFormat, VADParams
 from vad_service.models.responses import (
+    DayStreamFileInfo,
+    DayStreamResponse,
     HealthResponse,
+    IncrementalVADResponse,
     ReadinessResponse,
     SpeechSegment,
     VADResponse,
@@ -13,6 +16,9 @@ __all__ = [
     "VADParams",
     "SpeechSegment",
     "VADResponse",
+    "IncrementalVADResponse",
+    "DayStreamFileInfo",
+    "DayStreamResponse",
     "HealthResponse",
     "ReadinessResponse",
 ]
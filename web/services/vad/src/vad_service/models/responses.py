@@ -32,6 +32,60 @@ class VADResponse(BaseModel):
     )
 
 
+class IncrementalVADResponse(BaseModel):
+    """Response model for incremental VAD over a growing recording."""
+
+    segments: list[SpeechSegment] = Field(
+        description="Speech segments finalized by this request"
+    )
+    checkpoint: str | None = Field(
+        default=None,
+        description="Token to send with the next tail of the recording (null once final)",
+    )
+    processed_duration: float = Field(
+        description="Duration of audio processed so far across all requests, in seconds"
+    )
+    bytes_received: int = Field(
+        description="Total bytes of the recording received so far"
+    )
+    processing_time_ms: float = Field(
+        description="Time taken to process this request in milliseconds"
+    )
+
+
+class DayStreamFileInfo(BaseModel):
+    """Placement of one recording on the day timeline."""
+
+    filename: str = Field(description="Uploaded filename")
+    offset: float = Field(description="Wall-clock offset of the file's first sample in seconds")
+    duration: float = Field(description="Duration of the file in seconds")
+
+
+class DayStreamResponse(BaseModel):
+    """Response model for day-stream VAD across consecutive recordings."""
+
+    segments: list[SpeechSegment] = Field(
+        description="Speech segments with wall-clock timestamps in seconds"
+    )
+    files: list[DayStreamFileInfo] = Field(
+        description="Where each uploaded file was placed on the timeline"
+    )
+    total_speech_duration: float = Field(
+        description="Total duration of speech in seconds"
+    )
+    total_duration: float = Field(
+        description="Total duration of all files in seconds"
+    )
+    speech_ratio: float = Field(
+        ge=0.0,
+        le=1.0,
+        description="Ratio of speech to total duration (0-1)",
+    )
+    processing_time_ms: float = Field(
+        description="Time taken to process all files in milliseconds"
+    )
+
+
 class HealthResponse(BaseModel):
     """Response model for basic health check."""
 
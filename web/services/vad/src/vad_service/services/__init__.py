@@ -1,6 +1,14 @@
 """Services for audio processing and VAD detection."""
 
 from vad_service.services.audio_decoder import AudioDecoder
+from vad_service.services.day_stream import DayStreamFile
+from vad_service.services.incremental_vad import StreamingSpeechDetector, VADCheckpoint
 from vad_service.services.vad_processor import VADProcessor
 
-__all__ = ["AudioDecoder", "VADProcessor"]
+__all__ = [
+    "AudioDecoder",
+    "DayStreamFile",
+    "StreamingSpeechDetector",
+    "VADCheckpoint",
+    "VADProcessor",
+]
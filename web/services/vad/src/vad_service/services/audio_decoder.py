@@ -5,11 +5,24 @@ import io
 import subprocess
 import tempfile
 from pathlib import Path
+from typing import BinaryIO
 
 import numpy as np
 import soundfile as sf
 import structlog
 
+from vad_service.services.audio_format import (
+    HEADER_SIZE,
+    NATIVE_FORMATS,
+    detect_format,
+    read_header,
+)
+
+try:
+    import av
+except ImportError:  # optional, installed with the "av" extra
+    av = None
+
 logger = structlog.get_logger(__name__)
 
 
@@ -18,16 +31,21 @@ class AudioDecoder:
     Audio decoder that handles various formats and converts to PCM.
 
     Supports:
-    - Native formats via soundfile: WAV, FLAC, OGG
-    - FFmpeg fallback for: MP3, M4A, AAC, etc.
+    - Native formats via soundfile: WAV, FLAC, OGG, AIFF
+    - In-process PyAV decoding for: MP3, M4A, AAC, WebM, etc. (if installed)
+    - FFmpeg subprocess fallback for the same formats
+
+    The container is identified from the leading bytes (the filename is only
+    a fallback), so each input goes straight to one decoder.
     """
 
-    NATIVE_FORMATS = {".wav", ".flac", ".ogg"}
+    DECODERS = ("auto", "pyav", "ffmpeg")
 
     def __init__(
         self,
         target_sample_rate: int = 16000,
         target_channels: int = 1,
+        decoder: str = "auto",
     ) -> None:
         """
         Initialize audio decoder.
@@ -35,9 +53,17 @@ class AudioDecoder:
         Args:
             target_sample_rate: Target sample rate for output
             target_channels: Target number of channels (1 for mono)
+            decoder: Decoder for non-native formats: "pyav", "ffmpeg", or
+                "auto" for PyAV when installed with FFmpeg as fallback
         """
+        if decoder not in self.DECODERS:
+            raise ValueError(f"Unknown decoder {decoder!r}, expected one of {self.DECODERS}")
+        if decoder == "pyav" and av is None:
+            raise RuntimeError("PyAV is not installed; install the 'av' extra")
+
         self.target_sample_rate = target_sample_rate
         self.target_channels = target_channels
+        self.decoder = decoder
 
     async def decode(self, audio_data: bytes, filename: str = "") -> np.ndarray:
         """
@@ -45,33 +71,16 @@ class AudioDecoder:
 
         Args:
             audio_data: Raw audio file bytes
-            filename: Optional filename to help detect format
+            filename: Optional filename, used only if the bytes are not recognised
 
         Returns:
             Numpy array of audio samples (float32, mono)
         """
-        # Try to determine format from filename extension
-        ext = Path(filename).suffix.lower() if filename else ""
-
         loop = asyncio.get_event_loop()
 
-        if ext in self.NATIVE_FORMATS or not ext:
-            # Try native decoding first
-            try:
-                return await loop.run_in_executor(
-                    None,
-                    lambda: self._decode_native(audio_data),
-                )
-            except Exception:
-                if ext:
-                    # Re-raise if we expected native format to work
-                    raise
-                # Fall through to FFmpeg for unknown formats
-
-        # Use FFmpeg for other formats
         return await loop.run_in_executor(
             None,
-            lambda: self._decode_ffmpeg(audio_data),
+            lambda: self._normalize(*self.read(audio_data, filename)),
         )
 
     async def decode_file(self, filepath: str | Path) -> np.ndarray:
@@ -84,34 +93,109 @@ class AudioDecoder:
         Returns:
             Numpy array of audio samples (float32, mono)
         """
-        filepath = Path(filepath)
-        ext = filepath.suffix.lower()
-
         loop = asyncio.get_event_loop()
 
-        if ext in self.NATIVE_FORMATS:
-            return await loop.run_in_executor(
-                None,
-                lambda: self._decode_native_file(str(filepath)),
-            )
-        else:
-            return await loop.run_in_executor(
-                None,
-                lambda: self._decode_ffmpeg_file(str(filepath)),
-            )
+        return await loop.run_in_executor(
+            None,
+            lambda: self._normalize(*self.read(filepath)),
+        )
 
-    def _decode_native(self, audio_data: bytes) -> np.ndarray:
-        """Decode audio using soundfile."""
-        buffer = io.BytesIO(audio_data)
-        audio_array, sample_rate = sf.read(buffer, dtype="float32")
+    def read(
+        self, source: bytes | str | Path | BinaryIO, filename: str = ""
+    ) -> tuple[np.ndarray, int]:
+        """
+        Decode audio to mono float32, blocking the calling thread.
+
+        Native formats are returned at their own sample rate, so callers can
+        resample (and time it) as a separate step; PyAV and FFmpeg resample
+        to the target rate while decoding.
+
+        Args:
+            source: Raw audio file bytes, a file path, or a seekable binary
+                file positioned at the start of the audio
+            filename: Optional filename, used only if the bytes are not recognised
 
-        return self._normalize(audio_array, sample_rate)
+        Returns:
+            Audio samples and their sample rate
+        """
+        if isinstance(source, Path):
+            source = str(source)
 
-    def _decode_native_file(self, filepath: str) -> np.ndarray:
-        """Decode audio file using soundfile."""
-        audio_array, sample_rate = sf.read(filepath, dtype="float32")
+        if self._detect(source, filename) in NATIVE_FORMATS:
+            audio_array, sample_rate = sf.read(
+                io.BytesIO(source) if isinstance(source, bytes) else source, dtype="float32"
+            )
+            if audio_array.ndim > 1:
+                audio_array = np.mean(audio_array, axis=1)
+            return audio_array, sample_rate
+
+        # PyAV and FFmpeg probe anything else, including unknown formats
+        return self._decode_compressed(source), self.target_sample_rate
+
+    @staticmethod
+    def _detect(source: bytes | str | BinaryIO, filename: str) -> str | None:
+        """Identify the container of any source accepted by ``read``."""
+        if isinstance(source, bytes):
+            return detect_format(source, filename)
+        if isinstance(source, str):
+            return detect_format(read_header(source), filename or Path(source).name)
+
+        position = source.tell()
+        header = source.read(HEADER_SIZE)
+        source.seek(position)
+        return detect_format(header, filename)
+
+    def _decode_compressed(self, source: bytes | str | BinaryIO) -> np.ndarray:
+        """Decode bytes, a file or a file object with PyAV, falling back to FFmpeg."""
+        if self.decoder != "ffmpeg" and av is not None:
+            try:
+                container = av.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+            except av.error.FFmpegError as e:
+                if self.decoder == "pyav":
+                    raise RuntimeError(f"Failed to decode audio: {e}") from e
+                logger.debug("PyAV could not open audio, falling back to FFmpeg", error=str(e))
+            else:
+                return self._decode_pyav(container)
+
+        if isinstance(source, bytes):
+            return self._decode_ffmpeg(source)
+        if isinstance(source, str):
+            return self._decode_ffmpeg_file(source)
+
+        source.seek(0)
+        return self._decode_ffmpeg(source.read())
+
+    def _decode_pyav(self, container: "av.container.InputContainer") -> np.ndarray:
+        """Decode the first audio stream of a PyAV container in-process."""
+        layout = "mono" if self.target_channels == 1 else "stereo"
+        chunks = []
+
+        with container:
+            if not container.streams.audio:
+                raise RuntimeError("Failed to decode audio: no audio stream found")
+
+            # One resampler per stream keeps its filter state across frames
+            resampler = av.AudioResampler(
+                format="flt", layout=layout, rate=self.target_sample_rate
+            )
+            try:
+                for frame in container.decode(container.streams.audio[0]):
+                    for resampled in resampler.resample(frame):
+                        chunks.append(resampled.to_ndarray().reshape(-1))
+                for resampled in resampler.resample(None):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            except av.error.FFmpegError as e:
+                raise RuntimeError(f"Failed to decode audio: {e}") from e
+
+        audio_array = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+        logger.debug(
+            "PyAV decode complete",
+            samples=len(audio_array),
+            duration_s=len(audio_array) / self.target_sample_rate,
+        )
 
-        return self._normalize(audio_array, sample_rate)
+        return audio_array
 
     def _decode_ffmpeg(self, audio_data: bytes) -> np.ndarray:
         """Decode audio using FFmpeg subprocess."""
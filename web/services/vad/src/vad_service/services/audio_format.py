@@ -0,0 +1,80 @@
+"""Container detection from the leading bytes of an audio file."""
+
+from pathlib import Path
+
+# Bytes needed to recognise every container below
+HEADER_SIZE = 12
+
+# Containers soundfile (libsndfile) decodes directly
+NATIVE_FORMATS = frozenset({"wav", "flac", "ogg", "aiff"})
+
+# Containers that need PyAV or FFmpeg
+COMPRESSED_FORMATS = frozenset({"mp3", "aac", "mp4", "webm"})
+
+# Used only when the leading bytes are not recognised
+EXTENSION_FORMATS = {
+    ".wav": "wav",
+    ".flac": "flac",
+    ".ogg": "ogg",
+    ".opus": "ogg",
+    ".aif": "aiff",
+    ".aiff": "aiff",
+    ".mp3": "mp3",
+    ".aac": "aac",
+    ".m4a": "mp4",
+    ".mp4": "mp4",
+    ".webm": "webm",
+}
+
+
+def sniff_format(header: bytes) -> str | None:
+    """
+    Identify an audio container from its first bytes.
+
+    Args:
+        header: At least the first ``HEADER_SIZE`` bytes of the file
+
+    Returns:
+        One of ``NATIVE_FORMATS`` or ``COMPRESSED_FORMATS``, or None if the
+        bytes match none of them
+    """
+    if header[:4] in (b"RIFF", b"RF64", b"BW64") and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if header[:3] == b"ID3":
+        return "mp3"
+
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        # Frame sync: layer bits 00 mark ADTS AAC, anything else MPEG audio
+        return "aac" if header[1] & 0x06 == 0 else "mp3"
+
+    return None
+
+
+def detect_format(header: bytes, filename: str = "") -> str | None:
+    """
+    Identify an audio container, trusting its bytes over its file name.
+
+    Args:
+        header: At least the first ``HEADER_SIZE`` bytes of the file
+        filename: Name of the file, consulted only if the bytes are unknown
+
+    Returns:
+        The container name, or None if neither bytes nor name identify it
+    """
+    return sniff_format(header) or EXTENSION_FORMATS.get(Path(filename).suffix.lower())
+
+
+def read_header(filepath: str | Path) -> bytes:
+    """Read the first ``HEADER_SIZE`` bytes of a file."""
+    with open(filepath, "rb") as f:
+        return f.read(HEADER_SIZE)
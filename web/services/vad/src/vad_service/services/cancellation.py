@@ -0,0 +1,125 @@
+"""Cooperative cancellation for long-running VAD jobs.
+
+Work submitted to the executor cannot be interrupted from the event loop,
+so the processing pipeline polls a ``CancellationToken`` between window
+batches and pipeline stages and stops as soon as it is cancelled or its
+deadline passes.
+"""
+
+import threading
+import time
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class ProcessingCancelledError(Exception):
+    """Raised inside the pipeline when its job has been cancelled."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Processing cancelled: {reason}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag with an optional deadline.
+
+    Args:
+        deadline: Unix timestamp after which the job is considered cancelled
+    """
+
+    def __init__(self, deadline: float | None = None) -> None:
+        self.deadline = deadline
+        self._event = threading.Event()
+        self._reason: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def reason(self) -> str | None:
+        """Why the job was cancelled, or None if it is still live."""
+        if self._reason is None and self.expired:
+            return "deadline"
+        return self._reason
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.deadline is not None and time.time() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the job was cancelled or ran past its deadline."""
+        return self._event.is_set() or self.expired
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the job. The first reason given is kept."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason
+            self._event.set()
+
+    def check(self) -> None:
+        """Raise ``ProcessingCancelledError`` if the job should stop."""
+        if self._event.is_set():
+            raise ProcessingCancelledError(self._reason or "cancelled")
+        if self.expired:
+            self.cancel("deadline")
+            raise ProcessingCancelledError("deadline")
+
+
+class JobRegistry:
+    """
+    In-process registry of running jobs that clients can cancel by ID.
+
+    Each worker process has its own registry, so a job can only be cancelled
+    through the process running it; with several workers a cancel request
+    that lands elsewhere does not find the job.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def register(self, job_id: str, token: CancellationToken) -> None:
+        """
+        Track a running job.
+
+        Args:
+            job_id: Client-supplied job identifier
+            token: Token controlling the job
+
+        Raises:
+            ValueError: If a job with the same ID is already running
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                raise ValueError(f"Job already running: {job_id}")
+            self._jobs[job_id] = token
+
+    def unregister(self, job_id: str) -> None:
+        """Stop tracking a job once it has finished."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a running job.
+
+        Args:
+            job_id: Identifier the job was registered with
+
+        Returns:
+            True if the job was found and cancelled, False otherwise
+        """
+        with self._lock:
+            token = self._jobs.get(job_id)
+
+        if token is None:
+            return False
+
+        token.cancel("cancelled")
+        logger.info("Job cancelled", job_id=job_id)
+        return True
@@ -0,0 +1,46 @@
+"""Day-stream assembly: many consecutive recordings treated as one timeline."""
+
+import bisect
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+
+@dataclass
+class DayStreamFile:
+    """One recording in a day stream."""
+
+    source: BinaryIO | bytes
+    offset: float | None = None
+    filename: str = ""
+
+
+@dataclass
+class DayTimeline:
+    """
+    Maps sample positions of a continuous detection run to wall-clock seconds.
+
+    Each file appended to the run contributes an anchor: the stream sample at
+    which it starts and the wall-clock offset of its first sample. Positions
+    are mapped through the anchor at or before them, so a segment that starts
+    in one file and ends in the next gets both timestamps on the day timeline.
+    """
+
+    sample_rate: int = 16000
+    _starts: list[int] = field(default_factory=list)
+    _offsets: list[float] = field(default_factory=list)
+
+    def add_file(self, stream_start: int, wall_offset: float) -> None:
+        """
+        Register a file that begins at ``stream_start`` samples into the run.
+
+        Args:
+            stream_start: First sample of the file within the run
+            wall_offset: Wall-clock time of that sample, in seconds
+        """
+        self._starts.append(stream_start)
+        self._offsets.append(wall_offset)
+
+    def to_seconds(self, sample: int) -> float:
+        """Convert a run sample position to wall-clock seconds."""
+        index = max(0, bisect.bisect_right(self._starts, sample) - 1)
+        return self._offsets[index] + (sample - self._starts[index]) / self.sample_rate
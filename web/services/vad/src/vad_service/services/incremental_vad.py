@@ -0,0 +1,600 @@
+"""Resumable speech detection over growing recordings.
+
+The detector in this module reproduces silero-vad's ``get_speech_timestamps``
+window by window, so it can stop after any chunk of audio, serialize its
+state into a compact checkpoint token, and continue later from exactly the
+same point. Running a stream through it in pieces yields the same segments
+as a single full pass over the concatenated audio.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+
+import numpy as np
+import structlog
+
+from vad_service.services.cancellation import CancellationToken
+from vad_service.services.timing import StageTimer, timed
+
+logger = structlog.get_logger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+# Silero's recurrent state and the audio context it carries between 16 kHz windows
+MODEL_STATE_SHAPE = (2, 1, 128)
+MODEL_CONTEXT_SAMPLES = 64
+
+# WAVE format tags
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class CheckpointError(ValueError):
+    """Raised when a checkpoint token is malformed or does not match the request."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data.encode("ascii"))
+
+
+def _decode_array(data: str, shape: tuple[int, ...]) -> np.ndarray:
+    """Decode a checkpointed float32 array, checking it has the expected shape."""
+    array = np.frombuffer(_b64decode(data), dtype="<f4")
+    if array.size != np.prod(shape):
+        raise CheckpointError(
+            f"Invalid checkpoint token: expected {np.prod(shape)} values, got {array.size}"
+        )
+    return array.reshape(shape).copy()
+
+
+def _decode_count(value: object, name: str) -> int:
+    """Return a checkpointed non-negative integer, rejecting any other value."""
+    if type(value) is not int or value < 0:
+        raise CheckpointError(f"Invalid checkpoint token: {name} must be a non-negative integer")
+    return value
+
+
+def _decode_segment(value: object) -> dict | None:
+    """Return a checkpointed ``{"start", "end"}`` segment, or None."""
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise CheckpointError("Invalid checkpoint token: pending must be a segment")
+    return {
+        "start": _decode_count(value.get("start"), "pending start"),
+        "end": _decode_count(value.get("end"), "pending end"),
+    }
+
+
+def _sign(body: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), body.encode(), hashlib.sha256).digest())
+
+
+def _check_sample_width(bits: int, is_float: bool) -> None:
+    """Raise ValueError for sample widths ``PCMFormat.decode`` does not handle."""
+    if (is_float and bits != 32) or (not is_float and bits not in (16, 24, 32)):
+        raise ValueError(f"Unsupported WAV sample width: {bits} bits")
+
+
+@dataclass
+class PCMFormat:
+    """Sample layout of a PCM WAV data chunk."""
+
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+    is_float: bool
+
+    @property
+    def block_align(self) -> int:
+        """Bytes per frame (one sample for every channel)."""
+        return self.channels * (self.bits_per_sample // 8)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """
+        Decode whole frames of raw PCM bytes to mono float32 samples.
+
+        Args:
+            data: Raw PCM bytes, length must be a multiple of ``block_align``
+
+        Returns:
+            Mono float32 samples scaled like ``soundfile.read(dtype="float32")``
+        """
+        width = self.bits_per_sample // 8
+
+        if self.is_float:
+            samples = np.frombuffer(data, dtype="<f4").astype(np.float32)
+        elif width == 2:
+            samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        elif width == 4:
+            samples = (
+                np.frombuffer(data, dtype="<i4").astype(np.float64) / 2147483648.0
+            ).astype(np.float32)
+        elif width == 3:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+            widened = (
+                raw[:, 0].astype(np.int32)
+                | (raw[:, 1].astype(np.int32) << 8)
+                | (raw[:, 2].astype(np.int32) << 16)
+            )
+            widened = np.where(widened & 0x800000, widened - 0x1000000, widened)
+            samples = widened.astype(np.float32) / 8388608.0
+        else:
+            raise ValueError(f"Unsupported PCM sample width: {self.bits_per_sample} bits")
+
+        if self.channels > 1:
+            samples = np.mean(samples.reshape(-1, self.channels), axis=1)
+
+        return samples.astype(np.float32, copy=False)
+
+
+def parse_wav_header(data: bytes) -> tuple[PCMFormat, int, int | None]:
+    """
+    Locate the PCM data chunk in the first bytes of a WAV file.
+
+    Args:
+        data: Leading bytes of a WAV file (must include the ``data`` chunk header)
+
+    Returns:
+        Tuple of (pcm_format, data_offset, data_size). ``data_size`` is None
+        when the header does not declare a usable size, as is the case for a
+        recording that is still being written.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Incremental detection requires PCM WAV input")
+
+    pcm_format: PCMFormat | None = None
+    offset = 12
+
+    while offset + 8 <= len(data):
+        chunk_id = data[offset : offset + 4]
+        (chunk_size,) = struct.unpack("<I", data[offset + 4 : offset + 8])
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            if body + 16 > len(data):
+                break
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack(
+                "<HHIIHH", data[body : body + 16]
+            )
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE and body + 26 <= len(data):
+                (format_tag,) = struct.unpack("<H", data[body + 24 : body + 26])
+            if format_tag not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_IEEE_FLOAT):
+                raise ValueError(f"Unsupported WAV encoding (format tag {format_tag:#x})")
+            is_float = format_tag == _WAVE_FORMAT_IEEE_FLOAT
+            _check_sample_width(bits, is_float)
+            pcm_format = PCMFormat(
+                sample_rate=sample_rate,
+                channels=channels,
+                bits_per_sample=bits,
+                is_float=is_float,
+            )
+
+        elif chunk_id == b"data":
+            if pcm_format is None:
+                raise ValueError("WAV data chunk precedes its fmt chunk")
+            # Streaming writers leave the size as 0 or 0xFFFFFFFF until close
+            data_size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+            return pcm_format, body, data_size
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV header is incomplete; upload more bytes before detecting")
+
+
+@dataclass
+class DetectorParams:
+    """Detection parameters that must stay fixed for the lifetime of a stream."""
+
+    threshold: float
+    min_speech_duration_ms: int
+    min_silence_duration_ms: int
+    speech_pad_ms: int = 30
+
+
+@dataclass
+class StreamingSpeechDetector:
+    """
+    Incremental equivalent of silero-vad's ``get_speech_timestamps``.
+
+    Audio is fed in arbitrary-sized chunks of 16 kHz mono samples. The
+    detector runs the model over complete 512-sample windows, tracks the
+    same trigger/silence state machine, and emits a segment as soon as its
+    padded boundaries can no longer change. All timestamps are in samples
+    from the start of the stream.
+    """
+
+    params: DetectorParams
+    sample_rate: int = 16000
+    window_size_samples: int = 512
+
+    # Model recurrent state (None until the first window has been processed)
+    model_state: np.ndarray | None = None
+    model_context: np.ndarray | None = None
+
+    # Samples received but not yet covered by a full window
+    leftover: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    windows_processed: int = 0
+
+    # get_speech_timestamps state machine
+    triggered: bool = False
+    current_start: int | None = None
+    temp_end: int = 0
+
+    # Closed segment whose padded end still depends on the next segment
+    pending: dict | None = None
+    segments_emitted: int = 0
+
+    @property
+    def samples_received(self) -> int:
+        """Total number of samples fed into the detector so far."""
+        return self.windows_processed * self.window_size_samples + len(self.leftover)
+
+    @property
+    def _speech_pad_samples(self) -> float:
+        return self.sample_rate * self.params.speech_pad_ms / 1000
+
+    def feed(
+        self,
+        audio: np.ndarray,
+        model,
+        lock: threading.Lock,
+        cancel_token: CancellationToken | None = None,
+        batch_windows: int = 250,
+        timer: StageTimer | None = None,
+    ) -> list[dict]:
+        """
+        Process newly arrived samples.
+
+        The model runs over ``batch_windows`` windows at a time. The lock is
+        released between batches, and the cancellation token is checked
+        before each one.
+
+        Args:
+            audio: Mono float32 samples at ``sample_rate``
+            model: Loaded silero-vad model (shared, state is swapped in and out)
+            lock: Lock guarding the shared model
+            cancel_token: Token that stops processing between batches
+            batch_windows: Number of windows per model batch
+            timer: Request timer for the inference and post-processing stages
+
+        Returns:
+            Segments (``{"start", "end"}`` in samples) that became final
+        """
+        if len(self.leftover):
+            audio = np.concatenate([self.leftover, audio.astype(np.float32, copy=False)])
+
+        n_windows = len(audio) // self.window_size_samples
+        cut = n_windows * self.window_size_samples
+        self.leftover = audio[cut:].copy()
+
+        emitted: list[dict] = []
+        for first in range(0, n_windows, batch_windows):
+            if cancel_token is not None:
+                cancel_token.check()
+
+            count = min(batch_windows, n_windows - first)
+            batch = audio[
+                first * self.window_size_samples : (first + count) * self.window_size_samples
+            ]
+            probs = self._infer(batch, count, model, lock, timer)
+            with timed(timer, "postprocess"):
+                for prob in probs:
+                    self._step(prob, self.windows_processed * self.window_size_samples, emitted)
+                    self.windows_processed += 1
+                    self._release_pending(emitted)
+
+        return emitted
+
+    def finalize(
+        self,
+        model,
+        lock: threading.Lock,
+        cancel_token: CancellationToken | None = None,
+        timer: StageTimer | None = None,
+    ) -> list[dict]:
+        """
+        Flush the stream: process the zero-padded tail and close any open segment.
+
+        Args:
+            model: Loaded silero-vad model
+            lock: Lock guarding the shared model
+            cancel_token: Token checked before the final window
+            timer: Request timer for the inference and post-processing stages
+
+        Returns:
+            Remaining segments, matching the tail of a full-pass result
+        """
+        audio_length = self.samples_received
+        emitted: list[dict] = []
+
+        if cancel_token is not None:
+            cancel_token.check()
+
+        if len(self.leftover):
+            window = np.zeros(self.window_size_samples, dtype=np.float32)
+            window[: len(self.leftover)] = self.leftover
+            self.leftover = np.zeros(0, dtype=np.float32)
+            (prob,) = self._infer(window, 1, model, lock, timer)
+            self._step(prob, self.windows_processed * self.window_size_samples, emitted)
+            self.windows_processed += 1
+
+        min_speech_samples = self.sample_rate * self.params.min_speech_duration_ms / 1000
+        if self.current_start is not None and (
+            audio_length - self.current_start
+        ) > min_speech_samples:
+            self._close({"start": self.current_start, "end": audio_length}, emitted)
+        self.current_start = None
+        self.triggered = False
+
+        if self.pending is not None:
+            pending = self.pending
+            pending["end"] = int(min(audio_length, pending["end"] + self._speech_pad_samples))
+            emitted.append(pending)
+            self.pending = None
+            self.segments_emitted += 1
+
+        return emitted
+
+    def _infer(
+        self,
+        audio: np.ndarray,
+        n_windows: int,
+        model,
+        lock: threading.Lock,
+        timer: StageTimer | None = None,
+    ) -> list[float]:
+        """Run the model over consecutive windows with this stream's state."""
+        import torch
+
+        tensor = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32))
+        probs: list[float] = []
+
+        # Time spent queued behind other requests is reported apart from inference
+        with timed(timer, "model_wait"):
+            lock.acquire()
+
+        try:
+            with timed(timer, "inference"), torch.no_grad():
+                model.reset_states()
+                if self.model_state is not None and self.model_context is not None:
+                    model._state = torch.from_numpy(self.model_state.copy())
+                    model._context = torch.from_numpy(self.model_context.copy())
+                    model._last_sr = self.sample_rate
+                    model._last_batch_size = 1
+
+                window = self.window_size_samples
+                for i in range(n_windows):
+                    chunk = tensor[i * window : (i + 1) * window]
+                    probs.append(model(chunk, self.sample_rate).item())
+
+                self.model_state = model._state.detach().cpu().numpy().copy()
+                self.model_context = model._context.detach().cpu().numpy().copy()
+        finally:
+            lock.release()
+
+        return probs
+
+    def _step(self, prob: float, position: int, emitted: list[dict]) -> None:
+        """Advance the trigger state machine by one window."""
+        threshold = self.params.threshold
+        neg_threshold = threshold - 0.15
+        min_silence_samples = self.sample_rate * self.params.min_silence_duration_ms / 1000
+        min_speech_samples = self.sample_rate * self.params.min_speech_duration_ms / 1000
+
+        if prob >= threshold and self.temp_end:
+            self.temp_end = 0
+
+        if prob >= threshold and not self.triggered:
+            self.triggered = True
+            self.current_start = position
+            return
+
+        if prob < neg_threshold and self.triggered:
+            if not self.temp_end:
+                self.temp_end = position
+            if position - self.temp_end < min_silence_samples:
+                return
+
+            segment = {"start": self.current_start, "end": self.temp_end}
+            if (segment["end"] - segment["start"]) > min_speech_samples:
+                self._close(segment, emitted)
+            self.current_start = None
+            self.temp_end = 0
+            self.triggered = False
+
+    def _close(self, segment: dict, emitted: list[dict]) -> None:
+        """Apply speech padding between the pending segment and a newly closed one."""
+        pad = self._speech_pad_samples
+
+        if self.pending is None:
+            # First segment, or the previous one was released with a full gap
+            segment["start"] = int(max(0, segment["start"] - pad))
+            self.pending = segment
+            return
+
+        previous = self.pending
+        silence_duration = segment["start"] - previous["end"]
+        if silence_duration < 2 * pad:
+            previous["end"] += int(silence_duration // 2)
+            segment["start"] = int(max(0, segment["start"] - silence_duration // 2))
+        else:
+            previous["end"] = int(previous["end"] + pad)
+            segment["start"] = int(max(0, segment["start"] - pad))
+
+        emitted.append(previous)
+        self.segments_emitted += 1
+        self.pending = segment
+
+    def _release_pending(self, emitted: list[dict]) -> None:
+        """Emit the pending segment once no later segment can be close enough to merge pads."""
+        if self.pending is None:
+            return
+
+        if self.current_start is not None:
+            earliest_next_start = self.current_start
+        else:
+            earliest_next_start = self.windows_processed * self.window_size_samples
+
+        pad = self._speech_pad_samples
+        if earliest_next_start - self.pending["end"] >= 2 * pad:
+            pending = self.pending
+            pending["end"] = int(pending["end"] + pad)
+            pending["start"] = int(pending["start"])
+            emitted.append(pending)
+            self.segments_emitted += 1
+            self.pending = None
+
+
+@dataclass
+class VADCheckpoint:
+    """Everything needed to resume detection on the next tail of a recording."""
+
+    detector: StreamingSpeechDetector
+    pcm_format: PCMFormat
+    bytes_received: int = 0
+    data_remaining: int | None = None
+    partial_frame: bytes = b""
+
+    def to_token(self, secret: str = "") -> str:
+        """
+        Serialize the checkpoint to a compact, URL-safe token.
+
+        Args:
+            secret: Key to sign the token with (HMAC-SHA256), empty for unsigned
+        """
+        detector = self.detector
+        payload = {
+            "v": CHECKPOINT_VERSION,
+            "params": [
+                detector.params.threshold,
+                detector.params.min_speech_duration_ms,
+                detector.params.min_silence_duration_ms,
+                detector.params.speech_pad_ms,
+            ],
+            "fmt": [
+                self.pcm_format.sample_rate,
+                self.pcm_format.channels,
+                self.pcm_format.bits_per_sample,
+                self.pcm_format.is_float,
+            ],
+            "bytes": self.bytes_received,
+            "remaining": self.data_remaining,
+            "partial": _b64encode(self.partial_frame),
+            "windows": detector.windows_processed,
+            "leftover": _b64encode(detector.leftover.astype("<f4").tobytes()),
+            "state": (
+                _b64encode(detector.model_state.astype("<f4").tobytes())
+                if detector.model_state is not None
+                else None
+            ),
+            "context": (
+                _b64encode(detector.model_context.astype("<f4").tobytes())
+                if detector.model_context is not None
+                else None
+            ),
+            "triggered": detector.triggered,
+            "current_start": detector.current_start,
+            "temp_end": detector.temp_end,
+            "pending": detector.pending,
+            "emitted": detector.segments_emitted,
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        token = _b64encode(zlib.compress(raw, 9))
+        return f"{token}.{_sign(token, secret)}" if secret else token
+
+    @classmethod
+    def from_token(cls, token: str, params: DetectorParams, secret: str = "") -> "VADCheckpoint":
+        """
+        Restore a checkpoint from its token.
+
+        Args:
+            token: Token previously returned by ``to_token``
+            params: Parameters of the continuing request (must match the checkpoint)
+            secret: Key the token was signed with, empty if it is unsigned
+
+        Returns:
+            The restored checkpoint
+        """
+        if secret:
+            token, _, signature = token.rpartition(".")
+            if not hmac.compare_digest(signature.encode(), _sign(token, secret).encode()):
+                raise CheckpointError("Invalid checkpoint token: signature does not match")
+
+        try:
+            payload = json.loads(zlib.decompress(_b64decode(token)))
+        except (ValueError, zlib.error) as e:
+            raise CheckpointError(f"Invalid checkpoint token: {e}") from e
+
+        # Everything below reads client-supplied data, so any shape error
+        # becomes a CheckpointError (400) rather than escaping as a 500
+        try:
+            if not isinstance(payload, dict) or payload.get("v") != CHECKPOINT_VERSION:
+                raise CheckpointError("Checkpoint was created by an incompatible version")
+
+            stored = DetectorParams(*payload["params"])
+            if stored != params:
+                raise CheckpointError(
+                    "Detection parameters differ from the ones the checkpoint was created with"
+                )
+
+            current_start = payload["current_start"]
+            detector = StreamingSpeechDetector(
+                params=stored,
+                windows_processed=_decode_count(payload["windows"], "windows"),
+                leftover=np.frombuffer(_b64decode(payload["leftover"]), dtype="<f4").copy(),
+                triggered=bool(payload["triggered"]),
+                current_start=(
+                    None if current_start is None else _decode_count(current_start, "current_start")
+                ),
+                temp_end=_decode_count(payload["temp_end"], "temp_end"),
+                pending=_decode_segment(payload["pending"]),
+                segments_emitted=_decode_count(payload["emitted"], "emitted"),
+            )
+            if len(detector.leftover) >= detector.window_size_samples:
+                raise CheckpointError("Invalid checkpoint token: leftover exceeds one window")
+            if payload["state"] is not None:
+                detector.model_state = _decode_array(payload["state"], MODEL_STATE_SHAPE)
+                detector.model_context = _decode_array(
+                    payload["context"], (1, MODEL_CONTEXT_SAMPLES)
+                )
+
+            # The same constraints the first request puts on the WAV header
+            sample_rate, channels, bits, is_float = payload["fmt"]
+            if type(sample_rate) is not int or sample_rate != detector.sample_rate:
+                raise CheckpointError(
+                    f"Invalid checkpoint token: sample rate must be {detector.sample_rate} Hz"
+                )
+            if type(channels) is not int or channels < 1:
+                raise CheckpointError("Invalid checkpoint token: channels must be at least 1")
+            if type(bits) is not int or not isinstance(is_float, bool):
+                raise CheckpointError("Invalid checkpoint token: malformed sample format")
+            _check_sample_width(bits, is_float)
+            pcm_format = PCMFormat(sample_rate, channels, bits, is_float)
+
+            remaining = payload["remaining"]
+            partial_frame = _b64decode(payload["partial"])
+            if len(partial_frame) >= pcm_format.block_align:
+                raise CheckpointError("Invalid checkpoint token: partial frame exceeds one frame")
+            return cls(
+                detector=detector,
+                pcm_format=pcm_format,
+                bytes_received=_decode_count(payload["bytes"], "bytes"),
+                data_remaining=None if remaining is None else _decode_count(remaining, "remaining"),
+                partial_frame=partial_frame,
+            )
+        except CheckpointError:
+            raise
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise CheckpointError(f"Invalid checkpoint token: {e}") from e
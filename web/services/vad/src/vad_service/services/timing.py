@@ -0,0 +1,71 @@
+"""Request-scoped timing of VAD pipeline stages."""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+
+# Pipeline stages, in the order they appear in the Server-Timing header
+STAGES = ("decode", "resample", "model_wait", "inference", "postprocess", "extract")
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock time per pipeline stage for one request.
+
+    Each request gets its own timer, so concurrent requests never see each
+    other's numbers. A stage may be entered many times (e.g. once per window
+    batch) and from executor threads; its durations are summed.
+    """
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._stages: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stages[name] = self._stages.get(name, 0.0) + elapsed
+
+    @property
+    def stages(self) -> dict[str, float]:
+        """Total seconds spent in each stage that ran, in pipeline order."""
+        with self._lock:
+            ordered = {name: self._stages[name] for name in STAGES if name in self._stages}
+            ordered.update(self._stages)
+        return ordered
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Wall-clock seconds since the timer was created."""
+        return time.perf_counter() - self._started
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Wall-clock milliseconds since the timer was created."""
+        return self.elapsed_seconds * 1000
+
+    def server_timing(self) -> str:
+        """
+        Format the timings as a ``Server-Timing`` header value.
+
+        Returns:
+            e.g. ``decode;dur=1.20, inference;dur=35.81, total;dur=38.02``
+        """
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.elapsed_ms:.2f}")
+        return ", ".join(entries)
+
+
+def timed(timer: StageTimer | None, name: str) -> AbstractContextManager[None]:
+    """Return ``timer.stage(name)``, or a no-op context if there is no timer."""
+    if timer is None:
+        return nullcontext()
+    return timer.stage(name)
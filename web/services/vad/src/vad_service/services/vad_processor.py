@@ -3,17 +3,67 @@
 import asyncio
 import io
 import tempfile
+import threading
 import time
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass
+from typing import TypeVar
 
 import numpy as np
 import soundfile as sf
 import structlog
 
 from vad_service.models.responses import SpeechSegment
+from vad_service.services.audio_decoder import AudioDecoder
+from vad_service.services.cancellation import CancellationToken
+from vad_service.services.day_stream import DayStreamFile, DayTimeline
+from vad_service.services.incremental_vad import (
+    DetectorParams,
+    StreamingSpeechDetector,
+    VADCheckpoint,
+    parse_wav_header,
+)
+from vad_service.services.timing import StageTimer, timed
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
+
+@dataclass
+class DetectionResult:
+    """Outcome of detecting speech in one complete recording."""
+
+    segments: list[SpeechSegment]
+    duration: float
+    speech_ratio: float
+    processing_time_ms: float
+    timer: StageTimer
+
+
+@dataclass
+class IncrementalResult:
+    """Outcome of processing one piece of a growing recording."""
+
+    segments: list[SpeechSegment]
+    checkpoint: str | None
+    processed_duration: float
+    bytes_received: int
+    processing_time_ms: float
+    audio_duration: float
+    timer: StageTimer
+
+
+@dataclass
+class DayStreamResult:
+    """Outcome of detecting speech across a day's worth of recordings."""
+
+    segments: list[SpeechSegment]
+    file_offsets: list[float]
+    file_durations: list[float]
+    processing_time_ms: float
+    timer: StageTimer
+
 
 class VADProcessor:
     """
@@ -25,13 +75,25 @@ class VADProcessor:
 
     SAMPLE_RATE = 16000
     WINDOW_SIZE_SAMPLES = 512  # 32ms at 16kHz
+    BATCH_WINDOWS = 250  # ~8s of audio between cancellation checks
+    SECONDS_DECIMALS = 1  # timestamp resolution, as silero's return_seconds
+    OFFSET_TOLERANCE_SECONDS = 0.001  # rounding slack when day-stream files abut
+
+    def __init__(self, decoder: str = "auto", checkpoint_secret: str = "") -> None:
+        """
+        Create the processor; call ``initialize()`` to load the model.
 
-    def __init__(self) -> None:
+        Args:
+            decoder: Decoder for compressed uploads: "pyav", "ffmpeg", or
+                "auto" for PyAV when installed with FFmpeg as fallback
+            checkpoint_secret: Key that signs incremental checkpoint tokens,
+                empty to issue unsigned tokens
+        """
+        self._decoder = AudioDecoder(target_sample_rate=self.SAMPLE_RATE, decoder=decoder)
+        self._checkpoint_secret = checkpoint_secret
         self._model = None
+        self._model_lock = threading.Lock()
         self._initialized = False
-        self.last_duration: float = 0.0
-        self.last_speech_ratio: float = 0.0
-        self.last_processing_time_ms: float = 0.0
 
     @property
     def is_initialized(self) -> bool:
@@ -66,7 +128,9 @@ class VADProcessor:
         min_speech_duration_ms: int = 250,
         min_silence_duration_ms: int = 100,
         return_seconds: bool = True,
-    ) -> list[SpeechSegment]:
+        cancel_token: CancellationToken | None = None,
+        filename: str = "",
+    ) -> DetectionResult:
         """
         Process audio bytes and return detected speech segments.
 
@@ -76,50 +140,50 @@ class VADProcessor:
             min_speech_duration_ms: Minimum speech segment duration
             min_silence_duration_ms: Minimum silence to split segments
             return_seconds: Return timestamps in seconds vs samples
+            cancel_token: Token that stops processing between window batches
+            filename: Upload name, used only if the format is not recognised
+                from the bytes
 
         Returns:
-            List of detected speech segments
+            Detected speech segments with duration, speech ratio and timings
         """
         if not self.is_initialized:
             raise RuntimeError("VAD model not initialized. Call initialize() first.")
 
-        start_time = time.perf_counter()
+        timer = StageTimer()
 
         # Decode audio to numpy array
-        loop = asyncio.get_event_loop()
-        audio_array, sample_rate = await loop.run_in_executor(
-            None,
-            lambda: self._decode_audio(audio_data),
+        audio_array, sample_rate = await self._run_blocking(
+            lambda: self._decoder.read(audio_data, filename),
+            cancel_token,
+            timer,
+            "decode",
         )
 
         # Resample if necessary
         if sample_rate != self.SAMPLE_RATE:
-            audio_array = await loop.run_in_executor(
-                None,
+            audio_array = await self._run_blocking(
                 lambda: self._resample(audio_array, sample_rate, self.SAMPLE_RATE),
+                cancel_token,
+                timer,
+                "resample",
             )
 
         # Run VAD
-        segments = await loop.run_in_executor(
-            None,
+        segments = await self._run_blocking(
             lambda: self._run_vad(
                 audio_array,
                 threshold,
                 min_speech_duration_ms,
                 min_silence_duration_ms,
                 return_seconds,
+                cancel_token,
+                timer,
             ),
+            cancel_token,
         )
 
-        # Calculate metrics
-        self.last_duration = len(audio_array) / self.SAMPLE_RATE
-        total_speech = sum(s.end - s.start for s in segments)
-        self.last_speech_ratio = (
-            total_speech / self.last_duration if self.last_duration > 0 else 0.0
-        )
-        self.last_processing_time_ms = (time.perf_counter() - start_time) * 1000
-
-        return segments
+        return self._detection_result(segments, len(audio_array), return_seconds, timer)
 
     async def process_stream(
         self,
@@ -127,6 +191,8 @@ class VADProcessor:
         threshold: float = 0.5,
         min_speech_duration_ms: int = 250,
         min_silence_duration_ms: int = 100,
+        cancel_token: CancellationToken | None = None,
+        timer: StageTimer | None = None,
     ) -> AsyncGenerator[SpeechSegment, None]:
         """
         Process audio stream and yield speech segments as detected.
@@ -138,6 +204,8 @@ class VADProcessor:
             threshold: Speech detection threshold
             min_speech_duration_ms: Minimum speech segment duration
             min_silence_duration_ms: Minimum silence to split segments
+            cancel_token: Token that stops processing between window batches
+            timer: Request timer to record stage timings in
 
         Yields:
             Speech segments as they are detected
@@ -145,12 +213,12 @@ class VADProcessor:
         if not self.is_initialized:
             raise RuntimeError("VAD model not initialized. Call initialize() first.")
 
-        start_time = time.perf_counter()
-
         # Collect stream to temp file (handles GB-scale files)
         with tempfile.NamedTemporaryFile(suffix=".audio", delete=True) as tmp:
             total_bytes = 0
             async for chunk in stream:
+                if cancel_token is not None:
+                    cancel_token.check()
                 tmp.write(chunk)
                 total_bytes += len(chunk)
 
@@ -160,47 +228,280 @@ class VADProcessor:
             logger.debug("Received audio stream", total_bytes=total_bytes)
 
             # Decode the temp file
-            loop = asyncio.get_event_loop()
-            audio_array, sample_rate = await loop.run_in_executor(
-                None,
-                lambda: self._decode_audio_file(tmp.name),
+            audio_array, sample_rate = await self._run_blocking(
+                lambda: self._decoder.read(tmp.name),
+                cancel_token,
+                timer,
+                "decode",
             )
 
             # Resample if necessary
             if sample_rate != self.SAMPLE_RATE:
-                audio_array = await loop.run_in_executor(
-                    None,
+                audio_array = await self._run_blocking(
                     lambda: self._resample(audio_array, sample_rate, self.SAMPLE_RATE),
+                    cancel_token,
+                    timer,
+                    "resample",
                 )
 
             # Run VAD and yield segments
-            segments = await loop.run_in_executor(
-                None,
+            segments = await self._run_blocking(
                 lambda: self._run_vad(
                     audio_array,
                     threshold,
                     min_speech_duration_ms,
                     min_silence_duration_ms,
-                    return_seconds=True,
+                    True,
+                    cancel_token,
+                    timer,
                 ),
+                cancel_token,
             )
 
-            # Update metrics
-            self.last_duration = len(audio_array) / self.SAMPLE_RATE
-            total_speech = sum(s.end - s.start for s in segments)
-            self.last_speech_ratio = (
-                total_speech / self.last_duration if self.last_duration > 0 else 0.0
-            )
-            self.last_processing_time_ms = (time.perf_counter() - start_time) * 1000
-
             for segment in segments:
                 yield segment
 
+    async def process_incremental(
+        self,
+        audio_data: bytes,
+        checkpoint: str | None = None,
+        final: bool = False,
+        threshold: float = 0.5,
+        min_speech_duration_ms: int = 250,
+        min_silence_duration_ms: int = 100,
+        return_seconds: bool = True,
+        cancel_token: CancellationToken | None = None,
+    ) -> IncrementalResult:
+        """
+        Process the next piece of a recording that is still being written.
+
+        The first call receives the start of a PCM WAV file; later calls
+        receive only the bytes appended since the previous call, together
+        with the checkpoint token it returned. Only new audio is run through
+        the model, and the concatenated segments of all calls equal those of
+        a single pass over the complete file.
+
+        Args:
+            audio_data: WAV bytes (first call) or raw tail bytes (continuations)
+            checkpoint: Token returned by the previous call, None to start
+            final: Whether this is the last piece of the recording
+            threshold: Speech detection threshold (0-1)
+            min_speech_duration_ms: Minimum speech segment duration
+            min_silence_duration_ms: Minimum silence to split segments
+            return_seconds: Return timestamps in seconds vs samples
+            cancel_token: Token that stops processing between window batches
+
+        Returns:
+            Segments finalized by this call and the checkpoint to resume from
+        """
+        if not self.is_initialized:
+            raise RuntimeError("VAD model not initialized. Call initialize() first.")
+
+        timer = StageTimer()
+        params = DetectorParams(
+            threshold=threshold,
+            min_speech_duration_ms=min_speech_duration_ms,
+            min_silence_duration_ms=min_silence_duration_ms,
+        )
+
+        state, raw_segments, new_samples = await self._run_blocking(
+            lambda: self._run_incremental(
+                audio_data, checkpoint, final, params, cancel_token, timer
+            ),
+            cancel_token,
+        )
+
+        with timer.stage("postprocess"):
+            segments = self._to_segments(raw_segments, return_seconds)
+            token = None if final else state.to_token(self._checkpoint_secret)
+
+        return IncrementalResult(
+            segments=segments,
+            checkpoint=token,
+            processed_duration=state.detector.samples_received / self.SAMPLE_RATE,
+            bytes_received=state.bytes_received,
+            processing_time_ms=timer.elapsed_ms,
+            audio_duration=new_samples / self.SAMPLE_RATE,
+            timer=timer,
+        )
+
+    async def process_day_stream(
+        self,
+        files: list[DayStreamFile],
+        threshold: float = 0.5,
+        min_speech_duration_ms: int = 250,
+        min_silence_duration_ms: int = 100,
+        max_gap_seconds: float = 1.0,
+        cancel_token: CancellationToken | None = None,
+    ) -> DayStreamResult:
+        """
+        Detect speech across consecutive recordings as one continuous stream.
+
+        Files are decoded one at a time, with the next file decoded in the
+        background while the model runs on the current one, so at most two
+        decoded files are held in memory. Model state carries across file
+        boundaries, and a segment spanning two files is returned once with
+        wall-clock timestamps. A gap larger than ``max_gap_seconds`` between
+        one file's end and the next file's offset ends the run there, as if
+        the recording had stopped. Files may not overlap: an offset before
+        the end of the previous file is rejected.
+
+        Args:
+            files: Recordings in chronological order; a missing offset means
+                the file starts where the previous one ended
+            threshold: Speech detection threshold (0-1)
+            min_speech_duration_ms: Minimum speech segment duration
+            min_silence_duration_ms: Minimum silence to split segments
+            max_gap_seconds: Largest gap still treated as continuous audio
+            cancel_token: Token that stops processing between window batches
+
+        Returns:
+            Segments on the day timeline plus per-file offsets and durations
+
+        Raises:
+            ValueError: If there are no files, or a file starts before the
+                previous one ends
+        """
+        if not self.is_initialized:
+            raise RuntimeError("VAD model not initialized. Call initialize() first.")
+        if not files:
+            raise ValueError("At least one file is required")
+
+        # Out-of-order offsets fail before anything is decoded; overlaps are
+        # only known once the previous file's duration is
+        offsets = [day_file.offset for day_file in files if day_file.offset is not None]
+        if any(later < earlier for earlier, later in zip(offsets, offsets[1:])):
+            raise ValueError("Day-stream offsets must be in chronological order")
+
+        timer = StageTimer()
+        params = DetectorParams(
+            threshold=threshold,
+            min_speech_duration_ms=min_speech_duration_ms,
+            min_silence_duration_ms=min_silence_duration_ms,
+        )
+
+        detector = StreamingSpeechDetector(params=params, sample_rate=self.SAMPLE_RATE)
+        timeline = DayTimeline(sample_rate=self.SAMPLE_RATE)
+        pending: asyncio.Future | None = None
+
+        segments: list[SpeechSegment] = []
+        file_offsets: list[float] = []
+        file_durations: list[float] = []
+
+        def collect(raw_segments: list[dict], run_timeline: DayTimeline) -> None:
+            with timer.stage("postprocess"):
+                for ts in raw_segments:
+                    segments.append(
+                        SpeechSegment(
+                            start=self._round_seconds(run_timeline.to_seconds(ts["start"])),
+                            end=self._round_seconds(run_timeline.to_seconds(ts["end"])),
+                        )
+                    )
+
+        expected_offset = files[0].offset or 0.0
+        # Decodes go through _run_blocking like every other stage, so they
+        # check the token first and cancel it if the job is torn down
+        pending = asyncio.ensure_future(
+            self._run_blocking(lambda: self._decode_day_file(files[0], timer), cancel_token)
+        )
+
+        try:
+            for index, day_file in enumerate(files):
+                audio = await pending
+                pending = None
+
+                # Read the next file ahead while this one runs through the model
+                if index + 1 < len(files):
+                    next_file = files[index + 1]
+                    pending = asyncio.ensure_future(
+                        self._run_blocking(
+                            lambda next_file=next_file: self._decode_day_file(next_file, timer),
+                            cancel_token,
+                        )
+                    )
+
+                offset = expected_offset if day_file.offset is None else day_file.offset
+                if offset < expected_offset - self.OFFSET_TOLERANCE_SECONDS:
+                    raise ValueError(
+                        f"Day-stream file {index + 1} starts at {offset}s, before the "
+                        f"previous file ends at {expected_offset:.3f}s"
+                    )
+
+                if index and offset - expected_offset > max_gap_seconds:
+                    logger.debug(
+                        "Day stream gap, starting new run",
+                        filename=day_file.filename,
+                        gap_seconds=offset - expected_offset,
+                    )
+                    run_detector, run_timeline = detector, timeline
+                    collect(
+                        await self._run_blocking(
+                            lambda: run_detector.finalize(
+                                self._model, self._model_lock, cancel_token, timer
+                            ),
+                            cancel_token,
+                        ),
+                        run_timeline,
+                    )
+                    detector = StreamingSpeechDetector(
+                        params=params, sample_rate=self.SAMPLE_RATE
+                    )
+                    timeline = DayTimeline(sample_rate=self.SAMPLE_RATE)
+
+                timeline.add_file(detector.samples_received, offset)
+                run_detector, run_audio = detector, audio
+                collect(
+                    await self._run_blocking(
+                        lambda: run_detector.feed(
+                            run_audio,
+                            self._model,
+                            self._model_lock,
+                            cancel_token,
+                            self.BATCH_WINDOWS,
+                            timer,
+                        ),
+                        cancel_token,
+                    ),
+                    timeline,
+                )
+
+                duration = len(audio) / self.SAMPLE_RATE
+                file_offsets.append(offset)
+                file_durations.append(duration)
+                expected_offset = offset + duration
+
+            run_detector = detector
+            collect(
+                await self._run_blocking(
+                    lambda: run_detector.finalize(
+                        self._model, self._model_lock, cancel_token, timer
+                    ),
+                    cancel_token,
+                ),
+                timeline,
+            )
+
+        finally:
+            # Don't leave a read-ahead decode running for a job that has stopped
+            if pending is not None:
+                pending.cancel()
+
+        return DayStreamResult(
+            segments=segments,
+            file_offsets=file_offsets,
+            file_durations=file_durations,
+            processing_time_ms=timer.elapsed_ms,
+            timer=timer,
+        )
+
     async def extract_speech_audio(
         self,
         audio_data: bytes,
         segments: list[SpeechSegment],
         output_sample_rate: int = 16000,
+        cancel_token: CancellationToken | None = None,
+        timer: StageTimer | None = None,
+        filename: str = "",
     ) -> bytes:
         """
         Extract only speech segments from audio and return as WAV bytes.
@@ -209,37 +510,178 @@ class VADProcessor:
             audio_data: Original audio file bytes
             segments: Speech segments to extract
             output_sample_rate: Sample rate for output audio
+            cancel_token: Token checked before the extraction starts
+            timer: Request timer to record stage timings in
+            filename: Upload name, used only if the format is not recognised
+                from the bytes
 
         Returns:
             WAV file bytes containing only speech
         """
+        return await self._run_blocking(
+            lambda: self._extract_speech(
+                audio_data, segments, output_sample_rate, timer, filename
+            ),
+            cancel_token,
+        )
+
+    async def _run_blocking(
+        self,
+        func: Callable[[], T],
+        cancel_token: CancellationToken | None,
+        timer: StageTimer | None = None,
+        stage: str | None = None,
+    ) -> T:
+        """
+        Run a blocking pipeline stage in the executor.
+
+        The token is checked before the stage starts. If the awaiting task is
+        cancelled (e.g. the client went away), the token is cancelled too so
+        the executor job stops at its next window batch instead of running to
+        completion. When ``stage`` is given, the time ``func`` spends running
+        (not queued for a worker) is added to it on ``timer``.
+        """
+        if cancel_token is not None:
+            cancel_token.check()
+
+        if stage is not None:
+            untimed = func
+
+            def func() -> T:
+                with timed(timer, stage):
+                    return untimed()
+
         loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(None, func)
+        except asyncio.CancelledError:
+            if cancel_token is not None:
+                cancel_token.cancel("disconnect")
+            raise
+
+    def _detection_result(
+        self,
+        segments: list[SpeechSegment],
+        n_samples: int,
+        return_seconds: bool,
+        timer: StageTimer,
+    ) -> DetectionResult:
+        """Summarize a full-recording detection run."""
+        duration = n_samples / self.SAMPLE_RATE
+        total_speech = sum(s.end - s.start for s in segments)
+        if not return_seconds:
+            total_speech /= self.SAMPLE_RATE
+
+        return DetectionResult(
+            segments=segments,
+            duration=duration,
+            speech_ratio=total_speech / duration if duration > 0 else 0.0,
+            processing_time_ms=timer.elapsed_ms,
+            timer=timer,
+        )
+
+    def _round_seconds(self, seconds: float) -> float:
+        """Round a returned timestamp to the service's resolution."""
+        return round(seconds, self.SECONDS_DECIMALS)
+
+    def _to_segments(self, raw_segments: list[dict], return_seconds: bool) -> list[SpeechSegment]:
+        """Convert sample-based detector output to response segments."""
+        segments = []
+        for ts in raw_segments:
+            if return_seconds:
+                segments.append(
+                    SpeechSegment(
+                        start=self._round_seconds(ts["start"] / self.SAMPLE_RATE),
+                        end=self._round_seconds(ts["end"] / self.SAMPLE_RATE),
+                    )
+                )
+            else:
+                segments.append(SpeechSegment(start=ts["start"], end=ts["end"]))
+
+        return segments
+
+    def _run_incremental(
+        self,
+        audio_data: bytes,
+        checkpoint: str | None,
+        final: bool,
+        params: DetectorParams,
+        cancel_token: CancellationToken | None = None,
+        timer: StageTimer | None = None,
+    ) -> tuple[VADCheckpoint, list[dict], int]:
+        """
+        Decode new PCM bytes and advance the streaming detector (runs in executor).
+
+        Returns:
+            The updated checkpoint, finalized segments and number of new samples
+        """
+        if checkpoint is None:
+            pcm_format, data_offset, data_size = parse_wav_header(audio_data)
+            if pcm_format.sample_rate != self.SAMPLE_RATE:
+                raise ValueError(
+                    f"Incremental detection requires {self.SAMPLE_RATE} Hz audio, "
+                    f"got {pcm_format.sample_rate} Hz"
+                )
+            state = VADCheckpoint(
+                detector=StreamingSpeechDetector(params=params, sample_rate=self.SAMPLE_RATE),
+                pcm_format=pcm_format,
+                data_remaining=data_size,
+            )
+            payload = audio_data[data_offset:]
+        else:
+            state = VADCheckpoint.from_token(checkpoint, params, self._checkpoint_secret)
+            payload = audio_data
 
-        return await loop.run_in_executor(
-            None,
-            lambda: self._extract_speech(audio_data, segments, output_sample_rate),
+        state.bytes_received += len(audio_data)
+
+        # Ignore trailing chunks (LIST, id3, ...) once the declared data size is reached
+        if state.data_remaining is not None:
+            payload = payload[: state.data_remaining]
+            state.data_remaining -= len(payload)
+
+        payload = state.partial_frame + payload
+        usable = len(payload) - len(payload) % state.pcm_format.block_align
+        state.partial_frame = payload[usable:]
+
+        with timed(timer, "decode"):
+            samples = state.pcm_format.decode(payload[:usable])
+
+        segments = state.detector.feed(
+            samples,
+            self._model,
+            self._model_lock,
+            cancel_token,
+            self.BATCH_WINDOWS,
+            timer,
         )
 
-    def _decode_audio(self, audio_data: bytes) -> tuple[np.ndarray, int]:
-        """Decode audio bytes to numpy array."""
-        buffer = io.BytesIO(audio_data)
-        audio_array, sample_rate = sf.read(buffer, dtype="float32")
+        if final:
+            segments.extend(
+                state.detector.finalize(self._model, self._model_lock, cancel_token, timer)
+            )
 
-        # Convert stereo to mono if necessary
-        if len(audio_array.shape) > 1:
-            audio_array = np.mean(audio_array, axis=1)
+        logger.debug(
+            "Incremental VAD step",
+            new_samples=len(samples),
+            total_samples=state.detector.samples_received,
+            segments=len(segments),
+            final=final,
+        )
 
-        return audio_array, sample_rate
+        return state, segments, len(samples)
 
-    def _decode_audio_file(self, filepath: str) -> tuple[np.ndarray, int]:
-        """Decode audio file to numpy array."""
-        audio_array, sample_rate = sf.read(filepath, dtype="float32")
+    def _decode_day_file(
+        self, day_file: DayStreamFile, timer: StageTimer | None = None
+    ) -> np.ndarray:
+        """Decode one day-stream file to 16 kHz mono float32 (runs in executor)."""
+        with timed(timer, "decode"):
+            audio_array, sample_rate = self._decoder.read(day_file.source, day_file.filename)
 
-        # Convert stereo to mono if necessary
-        if len(audio_array.shape) > 1:
-            audio_array = np.mean(audio_array, axis=1)
+        if sample_rate != self.SAMPLE_RATE:
+            with timed(timer, "resample"):
+                audio_array = self._resample(audio_array, sample_rate, self.SAMPLE_RATE)
 
-        return audio_array, sample_rate
+        return audio_array
 
     def _resample(
         self, audio: np.ndarray, orig_sr: int, target_sr: int
@@ -263,51 +705,69 @@ class VADProcessor:
         min_speech_duration_ms: int,
         min_silence_duration_ms: int,
         return_seconds: bool,
+        cancel_token: CancellationToken | None = None,
+        timer: StageTimer | None = None,
     ) -> list[SpeechSegment]:
-        """Run VAD on audio array using get_speech_timestamps."""
-        import torch
-        from silero_vad import get_speech_timestamps
+        """
+        Run VAD on audio array.
 
-        # Convert numpy array to torch tensor
-        audio_tensor = torch.from_numpy(audio)
+        Uses the streaming detector, which matches silero's
+        get_speech_timestamps exactly but runs the model in batches of
+        windows, checking the cancellation token between batches and
+        releasing the shared model to other requests.
+        """
+        detector = StreamingSpeechDetector(
+            params=DetectorParams(
+                threshold=threshold,
+                min_speech_duration_ms=min_speech_duration_ms,
+                min_silence_duration_ms=min_silence_duration_ms,
+            ),
+            sample_rate=self.SAMPLE_RATE,
+        )
 
-        # Get speech timestamps
-        speech_timestamps = get_speech_timestamps(
-            audio_tensor,
+        speech_timestamps = detector.feed(
+            audio,
             self._model,
-            threshold=threshold,
-            sampling_rate=self.SAMPLE_RATE,
-            min_speech_duration_ms=min_speech_duration_ms,
-            min_silence_duration_ms=min_silence_duration_ms,
-            return_seconds=return_seconds,
+            self._model_lock,
+            cancel_token,
+            self.BATCH_WINDOWS,
+            timer,
+        )
+        speech_timestamps.extend(
+            detector.finalize(self._model, self._model_lock, cancel_token, timer)
         )
 
-        # Convert to SpeechSegment objects
-        segments = []
-        for ts in speech_timestamps:
-            segments.append(
-                SpeechSegment(
-                    start=ts["start"],
-                    end=ts["end"],
-                )
-            )
-
-        return segments
+        with timed(timer, "postprocess"):
+            return self._to_segments(speech_timestamps, return_seconds)
 
     def _extract_speech(
         self,
         audio_data: bytes,
         segments: list[SpeechSegment],
         output_sample_rate: int,
+        timer: StageTimer | None = None,
+        filename: str = "",
     ) -> bytes:
         """Extract speech segments and return as WAV bytes."""
         # Decode original audio
-        audio_array, sample_rate = self._decode_audio(audio_data)
+        with timed(timer, "decode"):
+            audio_array, sample_rate = self._decoder.read(audio_data, filename)
 
         # Resample to processing sample rate for segment extraction
         if sample_rate != self.SAMPLE_RATE:
-            audio_array = self._resample(audio_array, sample_rate, self.SAMPLE_RATE)
+            with timed(timer, "resample"):
+                audio_array = self._resample(audio_array, sample_rate, self.SAMPLE_RATE)
+
+        with timed(timer, "extract"):
+            return self._encode_speech(audio_array, segments, output_sample_rate)
 
+    def _encode_speech(
+        self,
+        audio_array: np.ndarray,
+        segments: list[SpeechSegment],
+        output_sample_rate: int,
+    ) -> bytes:
+        """Concatenate speech segments of 16 kHz audio and encode as WAV."""
         # Extract speech segments
         speech_chunks = []
         for segment in segments:
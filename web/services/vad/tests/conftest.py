@@ -41,6 +41,21 @@ def generate_sine_wave(sample_rate: int):
     return _generate
 
 
+@pytest.fixture
+def generate_speech_like(sample_rate: int):
+    """Factory fixture to generate a voiced, syllable-modulated harmonic signal."""
+
+    def _generate(duration: float = 1.0, amplitude: float = 0.3) -> np.ndarray:
+        t = np.arange(int(sample_rate * duration)) / sample_rate
+        f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        harmonics = sum(np.sin(k * phase) / k for k in range(1, 15))
+        syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0.0, None)
+        return (amplitude * harmonics * syllables).astype(np.float32)
+
+    return _generate
+
+
 @pytest.fixture
 def generate_silence(sample_rate: int):
     """Factory fixture to generate silence."""
@@ -64,6 +79,28 @@ def audio_to_wav_bytes(sample_rate: int):
     return _convert
 
 
+@pytest.fixture
+def audio_to_m4a_bytes(sample_rate: int):
+    """Factory fixture to encode an audio array as AAC in an MP4 container."""
+    av = pytest.importorskip("av")
+
+    def _convert(audio: np.ndarray) -> bytes:
+        buffer = io.BytesIO()
+        with av.open(buffer, "w", format="mp4") as container:
+            stream = container.add_stream("aac", rate=sample_rate, layout="mono")
+            frame = av.AudioFrame.from_ndarray(
+                audio.astype(np.float32).reshape(1, -1), format="fltp", layout="mono"
+            )
+            frame.sample_rate = sample_rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+            for packet in stream.encode(None):
+                container.mux(packet)
+        return buffer.getvalue()
+
+    return _convert
+
+
 @pytest.fixture
 def sample_audio_bytes(
     generate_sine_wave,
@@ -90,6 +127,22 @@ def sample_audio_bytes(
     return audio_to_wav_bytes(audio)
 
 
+@pytest.fixture
+def speech_like_wav_bytes(
+    generate_speech_like,
+    generate_silence,
+    audio_to_wav_bytes,
+) -> bytes:
+    """Several speech-like bursts separated by gaps of varying length."""
+    parts = []
+    for speech, gap in [(2.0, 1.0), (1.5, 0.5), (1.0, 0.1), (0.8, 0.04), (2.2, 1.5)]:
+        parts.append(generate_silence(duration=gap))
+        parts.append(generate_speech_like(duration=speech))
+    parts.append(generate_silence(duration=0.7))
+
+    return audio_to_wav_bytes(np.concatenate(parts))
+
+
 @pytest.fixture
 async def vad_processor() -> AsyncGenerator[VADProcessor, None]:
     """Create and initialize a VAD processor for tests."""
@@ -1,5 +1,11 @@
 """Tests for VAD API endpoints."""
 
+import base64
+import json
+import zlib
+
+import numpy as np
+import pytest
 from httpx import AsyncClient
 
 
@@ -150,6 +156,351 @@ class TestVADEndpoints:
             assert segment["start"] >= 0
             assert segment["end"] >= segment["start"]
 
+    async def test_detect_compressed_upload(
+        self,
+        client: AsyncClient,
+        generate_speech_like,
+        generate_silence,
+        audio_to_m4a_bytes,
+    ):
+        """Test that an M4A upload is decoded by PyAV rather than rejected."""
+        audio = np.concatenate([generate_silence(duration=1.0), generate_speech_like(2.0)])
+
+        response = await client.post(
+            "/api/v1/vad/detect",
+            files={"file": ("speech.m4a", audio_to_m4a_bytes(audio), "audio/mp4")},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert abs(data["total_duration"] - 3.0) < 0.1
+        assert data["segments"]
+
+    async def test_detect_mislabelled_upload(
+        self,
+        client: AsyncClient,
+        generate_speech_like,
+        generate_silence,
+        audio_to_m4a_bytes,
+    ):
+        """Test that an M4A named and typed as WAV is recognised by its bytes."""
+        audio = np.concatenate([generate_silence(duration=1.0), generate_speech_like(2.0)])
+
+        response = await client.post(
+            "/api/v1/vad/detect",
+            files={"file": ("speech.wav", audio_to_m4a_bytes(audio), "audio/wav")},
+        )
+
+        assert response.status_code == 200
+        assert abs(response.json()["total_duration"] - 3.0) < 0.1
+
+    async def test_detect_audio_mislabelled_wav(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that a WAV named .mp3 is still read natively and extracted."""
+        response = await client.post(
+            "/api/v1/vad/detect/audio",
+            files={"file": ("test.mp3", sample_audio_bytes, "audio/mpeg")},
+        )
+
+        assert response.status_code == 200
+        assert response.content[:4] == b"RIFF"
+
+
+class TestIncrementalEndpoint:
+    """Tests for the incremental detection endpoint."""
+
+    async def test_incremental_round_trip(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test resuming detection from a checkpoint with only the tail bytes."""
+        head, tail = speech_like_wav_bytes[:50000], speech_like_wav_bytes[50000:]
+
+        first = await client.post(
+            "/api/v1/vad/detect/incremental",
+            files={"file": ("rec.wav", head, "audio/wav")},
+        )
+        assert first.status_code == 200
+        first_data = first.json()
+        assert first_data["checkpoint"]
+        assert first_data["bytes_received"] == len(head)
+
+        second = await client.post(
+            "/api/v1/vad/detect/incremental",
+            data={"checkpoint": first_data["checkpoint"], "final": "true"},
+            files={"file": ("rec.wav", tail, "audio/wav")},
+        )
+        assert second.status_code == 200
+        second_data = second.json()
+        assert second_data["checkpoint"] is None
+
+        full = await client.post(
+            "/api/v1/vad/detect",
+            files={"file": ("rec.wav", speech_like_wav_bytes, "audio/wav")},
+        )
+        assert first_data["segments"] + second_data["segments"] == full.json()["segments"]
+
+    async def test_incremental_invalid_checkpoint(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that a corrupted checkpoint is a client error."""
+        response = await client.post(
+            "/api/v1/vad/detect/incremental",
+            data={"checkpoint": "not-a-token"},
+            files={"file": ("rec.wav", speech_like_wav_bytes, "audio/wav")},
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize(
+        "payload",
+        [[1, 2, 3], {"v": 1, "params": 5}, {"v": 1, "params": [0.5]}],
+    )
+    async def test_incremental_wrong_shaped_checkpoint(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+        payload,
+    ):
+        """Test that a well-encoded token with the wrong contents is a client error."""
+        token = base64.urlsafe_b64encode(zlib.compress(json.dumps(payload).encode())).decode()
+        response = await client.post(
+            "/api/v1/vad/detect/incremental",
+            data={"checkpoint": token},
+            files={"file": ("rec.wav", speech_like_wav_bytes, "audio/wav")},
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"fmt": [16000, 0, 16, False]},
+            {"fmt": [8000, 1, 16, False]},
+            {"fmt": [16000, 1, 8, False]},
+            {"fmt": [16000, 1, 16, True]},
+            {"fmt": [16000, 1, 16]},
+            {"pending": {"x": 1}, "current_start": "abc"},
+            {"pending": {"start": 0, "end": "1"}},
+            {"current_start": -1},
+            {"bytes": -5},
+            {"bytes": "100"},
+            {"remaining": -1},
+            {"windows": 1.5},
+            {"partial": base64.urlsafe_b64encode(b"\0" * 8).decode()},
+        ],
+    )
+    async def test_incremental_tampered_checkpoint(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+        changes: dict,
+    ):
+        """Test that a real checkpoint with edited fields is a client error."""
+        first = await client.post(
+            "/api/v1/vad/detect/incremental",
+            files={"file": ("rec.wav", speech_like_wav_bytes[:50000], "audio/wav")},
+        )
+        token = first.json()["checkpoint"]
+        payload = json.loads(zlib.decompress(base64.urlsafe_b64decode(token)))
+        payload.update(changes)
+        tampered = base64.urlsafe_b64encode(zlib.compress(json.dumps(payload).encode())).decode()
+
+        response = await client.post(
+            "/api/v1/vad/detect/incremental",
+            data={"checkpoint": tampered, "final": "true"},
+            files={"file": ("rec.wav", speech_like_wav_bytes[50000:], "audio/wav")},
+        )
+
+        assert response.status_code == 400
+
+
+class TestDayStreamEndpoint:
+    """Tests for the day-stream detection endpoint."""
+
+    async def test_day_stream(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test detection across several files with wall-clock offsets."""
+        response = await client.post(
+            "/api/v1/vad/detect/day",
+            data={"offsets": "[0, 36000]"},
+            files=[
+                ("files", ("rec_00001.wav", speech_like_wav_bytes, "audio/wav")),
+                ("files", ("rec_00002.wav", speech_like_wav_bytes, "audio/wav")),
+            ],
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [f["filename"] for f in data["files"]] == ["rec_00001.wav", "rec_00002.wav"]
+        assert data["files"][1]["offset"] == 36000
+        assert data["segments"][-1]["start"] >= 36000
+        assert 0 <= data["speech_ratio"] <= 1
+
+    async def test_day_stream_offsets_mismatch(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that the number of offsets must match the number of files."""
+        response = await client.post(
+            "/api/v1/vad/detect/day",
+            data={"offsets": "[0, 10, 20]"},
+            files=[("files", ("rec.wav", speech_like_wav_bytes, "audio/wav"))],
+        )
+
+        assert response.status_code == 400
+
+    async def test_day_stream_overlapping_offsets(
+        self,
+        client: AsyncClient,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that a file starting before the previous one ends is a client error."""
+        response = await client.post(
+            "/api/v1/vad/detect/day",
+            data={"offsets": "[0, 1]"},
+            files=[
+                ("files", ("rec_00001.wav", speech_like_wav_bytes, "audio/wav")),
+                ("files", ("rec_00002.wav", speech_like_wav_bytes, "audio/wav")),
+            ],
+        )
+
+        assert response.status_code == 400
+        assert "before the previous file ends" in response.json()["detail"]
+
+
+class TestCancellationEndpoints:
+    """Tests for deadlines and explicit job cancellation."""
+
+    async def test_expired_deadline_returns_504(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that a request whose deadline has passed times out."""
+        response = await client.post(
+            "/api/v1/vad/detect",
+            headers={"X-Request-Deadline": "1"},
+            files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+        )
+
+        assert response.status_code == 504
+
+    async def test_invalid_deadline_returns_400(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that a malformed deadline header is rejected."""
+        response = await client.post(
+            "/api/v1/vad/detect",
+            headers={"X-Request-Deadline": "soon"},
+            files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+        )
+
+        assert response.status_code == 400
+
+    async def test_job_id_request_succeeds(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that a job ID is released once its request completes."""
+        for _ in range(2):
+            response = await client.post(
+                "/api/v1/vad/detect",
+                headers={"X-Job-ID": "job-1"},
+                files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+            )
+            assert response.status_code == 200
+
+        response = await client.delete("/api/v1/vad/jobs/job-1")
+        assert response.status_code == 404
+
+    async def test_cancellations_exposed_as_metrics(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that cancelled jobs are counted in the metrics endpoint."""
+        await client.post(
+            "/api/v1/vad/detect",
+            headers={"X-Request-Deadline": "1"},
+            files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+        )
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert 'vad_cancellations_total{reason="deadline"}' in response.text
+
+
+class TestInstrumentation:
+    """Tests for per-stage timings and request metrics."""
+
+    async def test_detect_sends_server_timing(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that stage timings are returned in a Server-Timing header."""
+        response = await client.post(
+            "/api/v1/vad/detect",
+            files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+        )
+
+        assert response.status_code == 200
+        timing = response.headers["Server-Timing"]
+        for stage in ("decode", "inference", "postprocess", "total"):
+            assert f"{stage};dur=" in timing
+
+    async def test_detect_audio_times_extraction(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that the audio endpoint includes the extraction stage."""
+        response = await client.post(
+            "/api/v1/vad/detect/audio",
+            files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+        )
+
+        assert response.status_code == 200
+        assert "extract;dur=" in response.headers["Server-Timing"]
+
+    async def test_request_metrics_exposed(
+        self,
+        client: AsyncClient,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that stage latency and throughput histograms are exported."""
+        await client.post(
+            "/api/v1/vad/detect",
+            files={"file": ("test.wav", sample_audio_bytes, "audio/wav")},
+        )
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        for name in (
+            'vad_stage_duration_seconds_count{endpoint="detect",stage="inference"}',
+            'vad_real_time_factor_count{endpoint="detect"}',
+            'vad_request_bytes_sum{endpoint="detect"}',
+            'vad_request_audio_seconds_count{endpoint="detect"}',
+            'vad_requests_in_flight{endpoint="detect"} 0.0',
+        ):
+            assert name in response.text
+
 
 class TestOpenAPISchema:
     """Tests for OpenAPI schema availability."""
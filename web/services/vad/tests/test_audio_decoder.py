@@ -0,0 +1,68 @@
+"""Tests for audio format detection and decoding."""
+
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from vad_service.services.audio_decoder import AudioDecoder
+from vad_service.services.audio_format import detect_format, sniff_format
+
+
+def _encode(fmt: str, subtype: str | None = None) -> bytes:
+    buffer = io.BytesIO()
+    tone = 0.1 * np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+    sf.write(buffer, tone.astype(np.float32), 16000, format=fmt, subtype=subtype)
+    return buffer.getvalue()
+
+
+class TestAudioFormat:
+    """Tests for container sniffing."""
+
+    @pytest.mark.parametrize(
+        ("fmt", "subtype", "expected"),
+        [
+            ("WAV", None, "wav"),
+            ("FLAC", None, "flac"),
+            ("OGG", "VORBIS", "ogg"),
+            ("AIFF", None, "aiff"),
+        ],
+    )
+    def test_sniffs_soundfile_containers(self, fmt, subtype, expected):
+        """Test that containers are recognised from their bytes alone."""
+        assert sniff_format(_encode(fmt, subtype)) == expected
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            (b"ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00", "mp3"),
+            (b"\xff\xfb\x90\x64\x00\x00\x00\x00\x00\x00\x00\x00", "mp3"),
+            (b"\xff\xf1\x50\x80\x00\x1f\xfc\x00\x00\x00\x00\x00", "aac"),
+            (b"\x00\x00\x00\x20ftypM4A \x00\x00", "mp4"),
+            (b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\xf7\x81", "webm"),
+            (b"not audio at all", None),
+        ],
+    )
+    def test_sniffs_compressed_containers(self, header, expected):
+        """Test the signatures of formats decoded by PyAV or FFmpeg."""
+        assert sniff_format(header) == expected
+
+    def test_bytes_win_over_extension(self):
+        """Test that a mislabelled upload is detected by its content."""
+        assert detect_format(_encode("WAV"), "recording.mp3") == "wav"
+        assert detect_format(b"\x00" * 12, "recording.m4a") == "mp4"
+        assert detect_format(b"\x00" * 12, "recording") is None
+
+
+class TestAudioDecoder:
+    """Tests for the AudioDecoder class."""
+
+    async def test_mislabelled_wav_decodes_natively(self):
+        """Test that a WAV named .mp3 is read by soundfile, not FFmpeg."""
+        decoder = AudioDecoder(decoder="ffmpeg")
+
+        audio = await decoder.decode(_encode("WAV"), filename="recording.mp3")
+
+        assert audio.dtype == np.float32
+        assert len(audio) == 16000
@@ -1,11 +1,18 @@
 """Tests for VAD processor service."""
 
+import asyncio
 import io
+import time
 
 import numpy as np
 import pytest
 import soundfile as sf
+import torch
+from silero_vad import get_speech_timestamps
 
+from vad_service.services.cancellation import CancellationToken, ProcessingCancelledError
+from vad_service.services.day_stream import DayStreamFile
+from vad_service.services.incremental_vad import CheckpointError, DetectorParams, VADCheckpoint
 from vad_service.services.vad_processor import VADProcessor
 
 
@@ -30,10 +37,10 @@ class TestVADProcessor:
         buffer.seek(0)
         audio_bytes = buffer.read()
 
-        segments = await vad_processor.process_audio_bytes(audio_bytes)
+        result = await vad_processor.process_audio_bytes(audio_bytes)
 
         # Should have no or very few segments in silence
-        assert isinstance(segments, list)
+        assert isinstance(result.segments, list)
 
     async def test_process_audio_bytes_with_tone(
         self,
@@ -46,11 +53,11 @@ class TestVADProcessor:
         tone = generate_sine_wave(frequency=440.0, duration=2.0, amplitude=0.8)
         audio_bytes = audio_to_wav_bytes(tone)
 
-        segments = await vad_processor.process_audio_bytes(audio_bytes)
+        result = await vad_processor.process_audio_bytes(audio_bytes)
 
-        assert isinstance(segments, list)
-        assert vad_processor.last_duration > 0
-        assert vad_processor.last_processing_time_ms > 0
+        assert isinstance(result.segments, list)
+        assert result.duration > 0
+        assert result.processing_time_ms > 0
 
     async def test_process_audio_bytes_mixed(
         self,
@@ -67,10 +74,10 @@ class TestVADProcessor:
         audio = np.concatenate([silence, tone, silence])
         audio_bytes = audio_to_wav_bytes(audio)
 
-        segments = await vad_processor.process_audio_bytes(audio_bytes)
+        result = await vad_processor.process_audio_bytes(audio_bytes)
 
-        assert isinstance(segments, list)
-        assert vad_processor.last_duration == pytest.approx(2.0, rel=0.1)
+        assert isinstance(result.segments, list)
+        assert result.duration == pytest.approx(2.0, rel=0.1)
 
     async def test_extract_speech_audio(
         self,
@@ -125,8 +132,8 @@ class TestVADProcessor:
         )
 
         # Both should return valid results
-        assert isinstance(segments_low, list)
-        assert isinstance(segments_high, list)
+        assert isinstance(segments_low.segments, list)
+        assert isinstance(segments_high.segments, list)
 
     async def test_not_initialized_raises(self):
         """Test that processing without initialization raises error."""
@@ -139,23 +146,35 @@ class TestVADProcessor:
 class TestVADProcessorMetrics:
     """Tests for VAD processor metrics tracking."""
 
-    async def test_metrics_updated_after_processing(
+    async def test_metrics_returned_with_result(
         self,
         vad_processor: VADProcessor,
         sample_audio_bytes: bytes,
     ):
-        """Test that metrics are updated after processing."""
-        # Initial state
-        assert vad_processor.last_duration == 0.0
-        assert vad_processor.last_processing_time_ms == 0.0
+        """Test that each result carries its own metrics and stage timings."""
+        result = await vad_processor.process_audio_bytes(sample_audio_bytes)
 
-        # Process audio
-        await vad_processor.process_audio_bytes(sample_audio_bytes)
+        assert result.duration > 0
+        assert result.processing_time_ms > 0
+        assert 0 <= result.speech_ratio <= 1
+        assert {"decode", "inference", "postprocess"} <= set(result.timer.stages)
 
-        # Metrics should be updated
-        assert vad_processor.last_duration > 0
-        assert vad_processor.last_processing_time_ms > 0
-        assert 0 <= vad_processor.last_speech_ratio <= 1
+    async def test_concurrent_requests_keep_own_metrics(
+        self,
+        vad_processor: VADProcessor,
+        generate_silence,
+        audio_to_wav_bytes,
+    ):
+        """Test that concurrent requests do not overwrite each other's metrics."""
+        short = audio_to_wav_bytes(generate_silence(duration=1.0))
+        long = audio_to_wav_bytes(generate_silence(duration=5.0))
+
+        results = await asyncio.gather(
+            vad_processor.process_audio_bytes(long),
+            vad_processor.process_audio_bytes(short),
+        )
+
+        assert [r.duration for r in results] == [pytest.approx(5.0), pytest.approx(1.0)]
 
     async def test_speech_ratio_calculation(
         self,
@@ -167,8 +186,247 @@ class TestVADProcessorMetrics:
         silence = generate_silence(duration=2.0)
         audio_bytes = audio_to_wav_bytes(silence)
 
-        await vad_processor.process_audio_bytes(audio_bytes)
+        result = await vad_processor.process_audio_bytes(audio_bytes)
 
         # For pure silence, speech ratio should be low
-        assert vad_processor.last_speech_ratio >= 0
-        assert vad_processor.last_speech_ratio <= 1
+        assert result.speech_ratio >= 0
+        assert result.speech_ratio <= 1
+
+    async def test_extraction_adds_to_request_timings(
+        self,
+        vad_processor: VADProcessor,
+        sample_audio_bytes: bytes,
+    ):
+        """Test that extraction records its stage on the detection timer."""
+        result = await vad_processor.process_audio_bytes(sample_audio_bytes)
+
+        await vad_processor.extract_speech_audio(
+            sample_audio_bytes, result.segments, timer=result.timer
+        )
+
+        assert "extract" in result.timer.stages
+        assert "extract;dur=" in result.timer.server_timing()
+
+
+class TestIncrementalVAD:
+    """Tests for resumable detection over growing recordings."""
+
+    @pytest.mark.parametrize("cuts", [[], [7000], [45, 5000, 64001, 150003]])
+    async def test_pieces_match_full_pass(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+        cuts: list[int],
+    ):
+        """Test that segments from uploaded pieces equal a single full pass."""
+        full = (await vad_processor.process_audio_bytes(speech_like_wav_bytes)).segments
+        assert len(full) > 1
+
+        bounds = [0, *cuts, len(speech_like_wav_bytes)]
+        checkpoint = None
+        segments = []
+        for i in range(len(bounds) - 1):
+            result = await vad_processor.process_incremental(
+                speech_like_wav_bytes[bounds[i] : bounds[i + 1]],
+                checkpoint=checkpoint,
+                final=i == len(bounds) - 2,
+            )
+            checkpoint = result.checkpoint
+            segments.extend(result.segments)
+
+        assert checkpoint is None
+        assert segments == full
+        assert result.bytes_received == len(speech_like_wav_bytes)
+
+    async def test_checkpoint_rejects_changed_params(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that a checkpoint cannot be resumed with different parameters."""
+        result = await vad_processor.process_incremental(speech_like_wav_bytes[:20000])
+
+        with pytest.raises(CheckpointError):
+            await vad_processor.process_incremental(
+                speech_like_wav_bytes[20000:],
+                checkpoint=result.checkpoint,
+                threshold=0.7,
+            )
+
+    @pytest.mark.parametrize("field", ["state", "context"])
+    async def test_checkpoint_rejects_wrong_model_state_size(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+        field: str,
+    ):
+        """Test that truncated model state or context in a checkpoint is rejected."""
+        result = await vad_processor.process_incremental(speech_like_wav_bytes[:20000])
+        checkpoint = VADCheckpoint.from_token(result.checkpoint, DetectorParams(0.5, 250, 100, 30))
+        detector = checkpoint.detector
+        if field == "state":
+            detector.model_state = detector.model_state.reshape(-1)[:100]
+        else:
+            detector.model_context = detector.model_context[:, :10]
+
+        with pytest.raises(CheckpointError, match="expected"):
+            await vad_processor.process_incremental(
+                speech_like_wav_bytes[20000:], checkpoint=checkpoint.to_token()
+            )
+
+    async def test_signed_checkpoint(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that a signed token only restores with the key that signed it."""
+        params = DetectorParams(0.5, 250, 100, 30)
+        result = await vad_processor.process_incremental(speech_like_wav_bytes[:20000])
+        checkpoint = VADCheckpoint.from_token(result.checkpoint, params)
+
+        signed = checkpoint.to_token("secret")
+        restored = VADCheckpoint.from_token(signed, params, "secret")
+
+        assert restored.bytes_received == checkpoint.bytes_received
+        with pytest.raises(CheckpointError, match="signature"):
+            VADCheckpoint.from_token(signed, params, "other")
+        with pytest.raises(CheckpointError, match="signature"):
+            VADCheckpoint.from_token(checkpoint.to_token(), params, "secret")
+
+    async def test_requires_pcm_wav(self, vad_processor: VADProcessor):
+        """Test that non-WAV input is rejected for incremental detection."""
+        with pytest.raises(ValueError, match="PCM WAV"):
+            await vad_processor.process_incremental(b"fLaC" + bytes(100))
+
+
+class TestDayStream:
+    """Tests for day-stream detection across consecutive files."""
+
+    async def test_split_files_match_single_file(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+        audio_to_wav_bytes,
+    ):
+        """Test that a recording split into files yields the same segments."""
+        audio, sr = sf.read(io.BytesIO(speech_like_wav_bytes), dtype="float32")
+        # Cut inside speech so a segment spans a file boundary
+        pieces = np.split(audio, [int(1.5 * sr), int(4.0 * sr), int(6.3 * sr)])
+
+        full = (await vad_processor.process_audio_bytes(speech_like_wav_bytes)).segments
+        result = await vad_processor.process_day_stream(
+            [DayStreamFile(source=audio_to_wav_bytes(piece)) for piece in pieces]
+        )
+
+        # Same segments, rounded the same way as a single-file detection
+        assert result.segments == full
+        assert result.file_offsets[1] == pytest.approx(1.5)
+        assert sum(result.file_durations) == pytest.approx(len(audio) / sr)
+
+    async def test_offsets_place_segments_on_wall_clock(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that a large gap starts a new run at the file's offset."""
+        single = await vad_processor.process_day_stream(
+            [DayStreamFile(source=speech_like_wav_bytes)]
+        )
+        result = await vad_processor.process_day_stream(
+            [
+                DayStreamFile(source=speech_like_wav_bytes, offset=100.0),
+                DayStreamFile(source=speech_like_wav_bytes, offset=3600.0),
+            ]
+        )
+
+        count = len(single.segments)
+        assert len(result.segments) == 2 * count
+        for base, segments in [(100.0, result.segments[:count]), (3600.0, result.segments[count:])]:
+            for got, want in zip(segments, single.segments):
+                assert got.start == pytest.approx(base + want.start)
+                assert got.end == pytest.approx(base + want.end)
+
+    @pytest.mark.parametrize(
+        "offsets, match",
+        [([100.0, 50.0], "chronological"), ([100.0, 101.0], "before the previous file ends")],
+    )
+    async def test_backwards_offsets_are_rejected(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+        offsets: list[float],
+        match: str,
+    ):
+        """Test that out-of-order or overlapping files are an error."""
+        with pytest.raises(ValueError, match=match):
+            await vad_processor.process_day_stream(
+                [DayStreamFile(source=speech_like_wav_bytes, offset=o) for o in offsets]
+            )
+
+
+class TestCancellation:
+    """Tests for cooperative cancellation of VAD jobs."""
+
+    async def test_expired_deadline_stops_processing(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that a job past its deadline is not processed."""
+        token = CancellationToken(deadline=time.time() - 1)
+
+        with pytest.raises(ProcessingCancelledError) as exc_info:
+            await vad_processor.process_audio_bytes(speech_like_wav_bytes, cancel_token=token)
+
+        assert exc_info.value.reason == "deadline"
+
+    async def test_cancelled_token_stops_processing(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that an explicitly cancelled job raises with its reason."""
+        token = CancellationToken()
+        token.cancel("cancelled")
+
+        with pytest.raises(ProcessingCancelledError, match="cancelled"):
+            await vad_processor.process_incremental(speech_like_wav_bytes, cancel_token=token)
+
+    async def test_live_token_matches_uncancellable_run(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that passing a live token does not change the result."""
+        expected = await vad_processor.process_audio_bytes(speech_like_wav_bytes)
+        token = CancellationToken(deadline=time.time() + 60)
+
+        result = await vad_processor.process_audio_bytes(
+            speech_like_wav_bytes, cancel_token=token
+        )
+
+        assert result.segments == expected.segments
+
+    async def test_batched_detection_matches_silero(
+        self,
+        vad_processor: VADProcessor,
+        speech_like_wav_bytes: bytes,
+    ):
+        """Test that window-batched detection matches silero's reference pass."""
+        audio, sr = sf.read(io.BytesIO(speech_like_wav_bytes), dtype="float32")
+        reference = get_speech_timestamps(
+            torch.from_numpy(audio),
+            vad_processor._model,
+            threshold=0.5,
+            sampling_rate=sr,
+            min_speech_duration_ms=250,
+            min_silence_duration_ms=100,
+        )
+
+        result = await vad_processor.process_audio_bytes(
+            speech_like_wav_bytes, return_seconds=False
+        )
+
+        assert [(s.start, s.end) for s in result.segments] == [
+            (ts["start"], ts["end"]) for ts in reference
+        ]